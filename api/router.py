@@ -1,12 +1,22 @@
 import time
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field, ConfigDict, AliasChoices
 from typing import List, Optional, Dict, Any, Union
 from core.services.text_processing_service_v2 import text_processing_service
+from core.services.batch_revision_service import batch_revision_service
 from models.request import SyntaxFixRequest, BatchSyntaxFixRequest, semanticProfileRequest, BatchSemProfileRequest
-from models.response import SyntaxFixResponse, BatchSyntaxFixResponse
+from models.response import SyntaxFixResponse, BatchSyntaxFixResponse, BatchReviseJobResponse
 from models.internal import AnalyzerRequest
 from core.analyzer import analyzer
+from core.llm.usage import usage_tracker
+from core.llm.hedging import hedge_policy
+from core.llm.token_budget import token_budgeter
+from core.llm.bulkhead import bulkhead
+from core.llm.key_pool import key_pool
+from core.llm.candidate_bandit import candidate_bandit
+from config.settings import settings
+from utils.exceptions import RequestCancelledError
+from utils.helpers import run_until_disconnected
 from utils.logging import logger
 from core.services.semantic_profile import (
 	generate_semantic_profile_for_passage,
@@ -16,6 +26,17 @@ from core.services.topic_closeness import score_topic_closeness, generate_and_sc
 
 router = APIRouter(tags=["revision"])
 
+# 클라이언트 연결 종료(타임아웃 후 재시도 등)로 취소된 요청의 응답 코드
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def _run_for_client(http_request: Request, aw):
+	"""요청 처리 코루틴 실행. 클라이언트 연결이 끊기면 진행 중인 LLM/분석기 작업을 모두 취소"""
+	if not settings.cancel_on_client_disconnect:
+		return await aw
+	return await run_until_disconnected(aw, http_request.is_disconnected, settings.client_disconnect_poll_interval)
+
+
 ### ----------------------------- Semantic Profile ----------------------------- ###
 class SemanticProfileRequest(BaseModel):
 	passage_text: str = Field(..., description="원문 passage 텍스트")
@@ -54,7 +75,7 @@ class SemanticProfileBatchRequestV2(BaseModel):
     items: List[SemanticProfileBatchItemV2]
 
 @router.post("/semantic-profile", response_model=SemanticProfileResponse)
-async def generate_semantic_profile(req: SemanticProfileRequest):
+async def generate_semantic_profile(req: SemanticProfileRequest, http_request: Request):
 	try:
 		logger.info("=" * 80)
 		logger.info("📥 [SEMANTIC PROFILE] 엔드포인트 요청 수신")
@@ -63,13 +84,16 @@ async def generate_semantic_profile(req: SemanticProfileRequest):
 		logger.info(f"📄 입력 지문 (처음 300자):\n{req.passage_text[:300]}...")
 		logger.info("=" * 80)
 		
-		result = await generate_semantic_profile_for_passage(req.passage_text)
+		result = await _run_for_client(http_request, generate_semantic_profile_for_passage(req.passage_text))
 		
 		logger.info("=" * 80)
 		logger.info("✅ [SEMANTIC PROFILE] 엔드포인트 응답 완료")
 		logger.info("=" * 80)
 		
 		return result
+	except RequestCancelledError as e:
+		logger.warning(f"[SEMANTIC PROFILE] {str(e)}")
+		raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
 	except Exception as e:
 		logger.error(f"❌ [SEMANTIC PROFILE] 오류 발생: {str(e)}", exc_info=True)
 		raise HTTPException(status_code=500, detail=str(e))
@@ -79,7 +103,7 @@ async def generate_semantic_profile(req: SemanticProfileRequest):
 	"/semantic-profile:batch",
 	response_model=Union[List[SemanticProfileResponse], List[GenSemProfileResponse]]
 )
-async def generate_semantic_profile_batch(req: Union[SemanticProfileBatchRequestV2, SemanticProfileBatchRequest]):
+async def generate_semantic_profile_batch(req: Union[SemanticProfileBatchRequestV2, SemanticProfileBatchRequest], http_request: Request):
 	try:
 		logger.info("=" * 80)
 		logger.info("📥 [SEMANTIC PROFILE BATCH] 엔드포인트 요청 수신")
@@ -90,7 +114,8 @@ async def generate_semantic_profile_batch(req: Union[SemanticProfileBatchRequest
 			logger.info(f"🔢 배치 항목 수: {len(req.passages)}개")
 			for idx, passage in enumerate(req.passages, 1):
 				logger.info(f"  [{idx}] 지문 길이: {len(passage)}자, 미리보기: {passage[:100]}...")
-			profiles = await generate_semantic_profiles_batch(req.passages)
+			with bulkhead.pool("profile_batch"):
+				profiles = await _run_for_client(http_request, generate_semantic_profiles_batch(req.passages))
 			logger.info("=" * 80)
 			logger.info("✅ [SEMANTIC PROFILE BATCH] 완료")
 			logger.info("=" * 80)
@@ -102,7 +127,10 @@ async def generate_semantic_profile_batch(req: Union[SemanticProfileBatchRequest
 			logger.info(f"  [{idx}] request_id: {item.request_id}, title: {item.title}, 지문 길이: {len(item.passage_text)}자")
 		
 		texts = [item.passage_text for item in req.items]
-		profiles = await generate_semantic_profiles_batch(texts)
+		with bulkhead.pool("profile_batch"):
+			profiles = await _run_for_client(
+				http_request, generate_semantic_profiles_batch(texts, [item.request_id for item in req.items])
+			)
 		
 		logger.info("=" * 80)
 		logger.info("✅ [SEMANTIC PROFILE BATCH] 완료")
@@ -116,6 +144,9 @@ async def generate_semantic_profile_batch(req: Union[SemanticProfileBatchRequest
 			)
 			for idx, item in enumerate(req.items)
 		]
+	except RequestCancelledError as e:
+		logger.warning(f"[SEMANTIC PROFILE BATCH] {str(e)}")
+		raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
 	except Exception as e:
 		logger.error(f"❌ [SEMANTIC PROFILE BATCH] 오류 발생: {str(e)}", exc_info=True)
 		raise HTTPException(status_code=500, detail=str(e))
@@ -176,17 +207,19 @@ class GenerateAndScoreBatchItem(BaseModel):
 
 
 @router.post("/topic-closeness:generate-and-score", response_model=TopicClosenessResponse)
-async def topic_closeness_generate_and_score(req: GenerateAndScoreRequest):
+async def topic_closeness_generate_and_score(req: GenerateAndScoreRequest, http_request: Request):
 	try:
 		orig_input = req.original_semantic_profile
 		if isinstance(orig_input, SemanticProfileIn):
 			orig = orig_input.model_dump()
 		else:
 			orig = orig_input  # str
-		result = await generate_and_score(orig, req.passage_text)
+		result = await _run_for_client(http_request, generate_and_score(orig, req.passage_text))
 		if req.request_id is not None:
 			result["request_id"] = req.request_id
 		return result
+	except RequestCancelledError as e:
+		raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
 	except Exception as e:
 		raise HTTPException(status_code=500, detail=str(e))
 
@@ -196,11 +229,14 @@ class GenerateAndScoreBatchRequest(BaseModel):
 
 
 @router.post("/topic-closeness:generate-and-score:batch", response_model=List[TopicClosenessResponse])
-async def topic_closeness_generate_and_score_batch(req: GenerateAndScoreBatchRequest):
+async def topic_closeness_generate_and_score_batch(req: GenerateAndScoreBatchRequest, http_request: Request):
 	try:
 		items = [item.model_dump() for item in req.items]
-		results = await generate_and_score_batch(items)
+		with bulkhead.pool("closeness_batch"):
+			results = await _run_for_client(http_request, generate_and_score_batch(items))
 		return results
+	except RequestCancelledError as e:
+		raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
 	except Exception as e:
 		raise HTTPException(status_code=500, detail=str(e))
 
@@ -237,7 +273,7 @@ async def analyze_text(data: AnalyzerRequest):
     summary="구문+어휘 결합 리비전 실행",
     description="구문 수정 후 결과를 분석하여 어휘 통과시 종료, 미통과시 어휘 단계로 분기합니다."
 )
-async def revise(request: SyntaxFixRequest):
+async def revise(request: SyntaxFixRequest, http_request: Request):
     logger.info("=" * 80)
     logger.info("🚀 [REVISE] 엔드포인트 요청 수신")
     logger.info("=" * 80)
@@ -247,13 +283,16 @@ async def revise(request: SyntaxFixRequest):
     logger.info("=" * 80)
     
     try:
-        result = await text_processing_service.fix_revise_single(request)
+        result = await _run_for_client(http_request, text_processing_service.fix_revise_single(request))
         
         logger.info("=" * 80)
         logger.info("✅ [REVISE] 엔드포인트 응답 완료")
         logger.info("=" * 80)
         
         return result
+    except RequestCancelledError as e:
+        logger.warning(f"[REVISE] request_id={request.request_id}: {str(e)}")
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"❌ [REVISE] 오류 발생: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"revision 중 오류: {str(e)}")
@@ -265,13 +304,16 @@ async def revise(request: SyntaxFixRequest):
     summary="배치 결합 리비전 실행",
     description="여러 텍스트를 병렬로 결합 리비전합니다."
 )
-async def batch_revise(request: BatchSyntaxFixRequest):
+async def batch_revise(request: BatchSyntaxFixRequest, http_request: Request):
     total_start_time = time.time()
     try:
         logger.info(f"배치 결합 리비전 요청 수신: request_id={request.request_id}, 항목={len(request.items)}개")
         if not request.items:
             raise HTTPException(status_code=400, detail="처리할 항목이 없습니다")
-        results = await text_processing_service.fix_revise_batch(request.items, request.max_concurrent)
+        with bulkhead.pool("revise_batch"):
+            results = await _run_for_client(
+                http_request, text_processing_service.fix_revise_batch(request.items, request.max_concurrent)
+            )
         total_time = time.time() - total_start_time
         successful_items = sum(1 for r in results if r.overall_success)
         failed_items = len(results) - successful_items
@@ -287,6 +329,9 @@ async def batch_revise(request: BatchSyntaxFixRequest):
         )
         logger.info(f"배치 결합 리비전 완료: 성공={successful_items}, 실패={failed_items}, 총시간={total_time:.2f}초")
         return response
+    except RequestCancelledError as e:
+        logger.warning(f"배치 결합 리비전 취소: request_id={request.request_id}, {str(e)}")
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
     except Exception as e:
         total_time = time.time() - total_start_time
         error_msg = str(e)
@@ -300,6 +345,53 @@ async def batch_revise(request: BatchSyntaxFixRequest):
             results=[],
             total_processing_time=total_time,
             error_message=error_msg
-        ) 
-        
-        
\ No newline at end of file
+        )
+
+
+@router.post(
+    "/batch-revise/jobs",
+    response_model=BatchReviseJobResponse,
+    summary="Batch API 결합 리비전 작업 등록",
+    description="대량 리비전을 OpenAI Batch API로 처리하는 작업을 등록합니다. 진행 상태와 결과는 GET /batch-revise/jobs/{job_id}로 조회합니다."
+)
+async def submit_batch_revise_job(request: BatchSyntaxFixRequest):
+    if not request.items:
+        raise HTTPException(status_code=400, detail="처리할 항목이 없습니다")
+    try:
+        job = batch_revision_service.submit_job(request)
+        return job.to_response()
+    except Exception as e:
+        logger.error(f"Batch API 리비전 작업 등록 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"작업 등록 중 오류: {str(e)}")
+
+
+@router.get(
+    "/batch-revise/jobs/{job_id}",
+    response_model=BatchReviseJobResponse,
+    summary="Batch API 결합 리비전 작업 조회"
+)
+async def get_batch_revise_job(job_id: str):
+    job = batch_revision_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return job.to_response()
+
+
+@router.get(
+    "/metrics/llm-usage",
+    summary="LLM 토큰 사용량 카운터",
+    description="프로세스 시작 이후 (task, model)별 누적 호출 수, 토큰 수, 비용(USD)을 반환합니다."
+)
+async def llm_usage_metrics():
+    counters = usage_tracker.snapshot()
+    return {
+        "counters": counters,
+        "total_tokens": sum(c["total_tokens"] for c in counters),
+        "cost_usd": round(sum(c["cost_usd"] for c in counters), 6),
+        "hedging": hedge_policy.stats(),
+        "token_budget": token_budgeter.stats(),
+        "bulkheads": bulkhead.stats(),
+        "cancellation": usage_tracker.cancellation_stats(),
+        "key_pool": key_pool.stats(),
+        "candidate_bandit": candidate_bandit.stats()
+    }
@@ -1,5 +1,5 @@
 import os
-from typing import Dict
+from typing import Any, Dict, List
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
@@ -24,7 +24,25 @@ class Settings(BaseSettings):
     # pydantic-settings에서 env var 이름 매핑은 `validation_alias`가 확실함
     openai_api_key: str | None = Field(default=None, validation_alias="OPENAI_API_KEY")
     openai_model: str = "gpt-4.1"
+    # OpenAI 호환 엔드포인트 (예: scripts/mock_llm_server.py 모의 서버 http://localhost:8001/v1), 미설정 시 OpenAI 기본값
+    openai_base_url: str | None = Field(default=None, validation_alias="OPENAI_BASE_URL")
     
+    # 태스크별 모델 라우팅: 태스크 → 모델 폴백 체인 (앞에서부터 시도, 미지정 태스크는 openai_model)
+    # 선택/분류 성격의 호출은 저렴한 모델, 수정(revision) 생성은 기본 모델 유지
+    llm_task_models: Dict[str, List[str]] = {
+        "select": ["gpt-4.1-mini", "gpt-4.1"],
+        "profile_subtopic2": ["gpt-4.1-mini", "gpt-4.1"],
+        "closeness": ["gpt-4.1-mini", "gpt-4.1"],
+    }
+    # 태스크별 클라이언트 설정: 태스크 → {base_url, api_key_env, timeout, max_retries}
+    llm_task_client_config: Dict[str, Dict[str, Any]] = {}
+    # API 키/프로젝트 풀 (core/llm/key_pool.py): [{name, api_key_env, organization, project, base_url, tokens_per_minute}]
+    # 비어 있으면 OPENAI_API_KEY 단일 키 사용, 환경변수 LLM_API_KEY_POOL에 JSON으로 지정 가능
+    llm_api_key_pool: List[Dict[str, Any]] = []
+    llm_key_rate_limit_cooldown: float = 10.0  # 429 응답(Retry-After 없음) 후 키를 제외하는 시간 (초)
+    llm_key_quota_cooldown: float = 600.0  # 할당량 소진/인증 실패 후 키를 제외하는 시간 (초)
+    llm_key_max_wait: float = 30.0  # 모든 키가 rate limit 휴지 중일 때 복귀를 기다리는 최대 시간 (초)
+
     # 앱 설정
     debug: bool = False
     log_level: str = "INFO"
@@ -37,7 +55,126 @@ class Settings(BaseSettings):
     # LLM 설정 - 구문 수정용 temperature (각 temperature별로 2개씩 생성)
     llm_temperatures: list = [0.2, 0.3]
     syntax_candidates_per_temperature: int = 2  # 각 temperature별 생성할 후보 수
-    llm_max_output_tokens: int = 4096
+    syntax_stop_after_passing: int = 2  # 후보를 생성되는 대로 분석하다가 통과 후보가 이 수만큼 모이면 나머지 생성/분석 취소 (0이면 전체 대기)
+    syntax_output_format: str = "passage"  # "passage": 수정 지문 전체 출력, "patch": 번호 붙인 문장 중 바꾼 문장만 JSON 패치로 출력 (core/llm/sentence_patch.py)
+    syntax_repair_max_rounds: int = 1  # 통과 후보가 없을 때 목표에 가장 가까운 후보를 소규모로 고치는 라운드 수 (0이면 사용 안 함)
+    syntax_repair_candidates: int = 2  # 수리 라운드당 생성할 후보 수
+    syntax_joint_mode: bool = True  # 평균 문장 길이와 내포절 비율이 모두 범위 밖이면 한 번의 복합 프롬프트로 함께 수정
+    syntax_focus_enabled: bool = False  # 수정에 적합한 문장과 앞뒤 문맥만 발췌해 보내고 문장 패치로 받아 원문에 적용 (core/llm/sentence_focus.py) - 문장별 절 판단이 분석기가 아닌 정규식 추정이라 기본 끔
+    syntax_focus_min_sentences: int = 12  # 이보다 문장이 적은 지문은 전체를 보냄
+    syntax_focus_pool_factor: int = 2  # 수정 수의 몇 배만큼 대상 문장을 고를지
+    syntax_focus_context: int = 1  # 대상 문장 앞뒤로 붙일 문맥 문장 수
+    syntax_focus_max_fraction: float = 0.7  # 발췌가 지문 문장의 이 비율을 넘으면 전체를 보냄
+    syntax_chunk_enabled: bool = False  # 긴 지문을 문단/문장 경계에서 청크로 나눠 동시에 수정하고 이어 붙인 전체를 검증 (core/llm/chunking.py, 발췌 프롬프트보다 우선)
+    syntax_chunk_min_words: int = 600  # 이보다 단어가 적은 지문은 나누지 않음
+    syntax_chunk_max_words: int = 300  # 청크당 최대 단어 수 (문단이 더 길면 문장 경계에서 나눔)
+    syntax_prescreen_enabled: bool = True  # 외부 분석 전 로컬 추정으로 목표 범위를 확실히 벗어난 후보 탈락 (core/prescreen.py, 통과 후보가 없으면 추정만 벗어난 후보는 분석하여 수리 기준으로 사용)
+    syntax_prescreen_avg_margin: float = 0.2  # 평균 문장 길이 추정 여유 (목표 범위 경계 대비 비율)
+    syntax_prescreen_clause_margin: float = 0.15  # 내포절 비율 추정 여유 (절대값)
+    syntax_prescreen_min_length_ratio: float = 0.7  # 후보 단어 수가 기준 지문의 이 비율 미만이면 잘린 출력으로 탈락
+    syntax_dedup_enabled: bool = True  # 공백 정규화 해시 + MinHash 유사도로 중복 후보는 분석/선택에서 제외 (core/llm/dedup.py)
+    syntax_dedup_threshold: float = 0.9  # 문장 수가 같고 추정 Jaccard 유사도가 이 값 이상이면 근사 중복
+    syntax_dedup_num_perm: int = 64  # MinHash 순열 수
+    syntax_dedup_shingle_size: int = 3  # shingle 토큰 수 (구두점 포함)
+    llm_max_output_tokens: int = 4096  # 출력 토큰 예산 상한
+    
+    # 구문 후보 수/temperature 밴딧 (core/llm/candidate_bandit.py): 맥락별 통과율·토큰 비용으로 생성 계획 결정
+    candidate_bandit_enabled: bool = False  # 켜면 기존 고정 계획(llm_temperatures × syntax_candidates_per_temperature) 대신 밴딧 계획 사용
+    candidate_bandit_stages: Dict[str, Dict[str, Any]] = {
+        "syntax": {"temperatures": [0.2, 0.3], "min_candidates": 1, "max_candidates": 4},  # 기본 팔/상한은 고정 계획과 같은 범위
+    }
+    candidate_bandit_target_pass_prob: float = 0.9  # 1개 이상 통과할 확률이 이 값에 도달할 때까지 후보 추가
+    candidate_bandit_length_buckets: List[int] = [150, 300, 500]  # 지문 단어 수 구간 경계
+    candidate_bandit_decay: float = 0.995  # 관측 감쇠율 (최근 결과 비중 유지)
+    candidate_bandit_state_path: str = "state/candidate_bandit.json"  # 빈 문자열이면 저장하지 않음
+    candidate_bandit_save_interval: float = 30.0  # 상태 저장 최소 간격 (초)
+    
+    # 태스크별 출력 토큰 예산 (max_tokens): fixed(고정) 또는 기준 텍스트 토큰 수 × ratio (최소 min)
+    llm_output_budgets: Dict[str, Dict[str, float]] = {
+        "syntax_generate": {"ratio": 1.3, "min": 256},  # 수정 지문 ≈ 원문 길이
+        "syntax_patch": {"ratio": 0.5, "min": 256},  # 수정 문장만 JSON 패치로 출력
+        "lexical": {"ratio": 2.5, "min": 512},  # 문장별 원문 + 수정 내역 JSON
+        "select": {"fixed": 4},  # 후보 번호
+        "profile": {"fixed": 1024},
+        "profile_subtopic2": {"fixed": 32},
+        "closeness": {"fixed": 256},
+    }
+    llm_truncation_budget_multiplier: float = 2.0  # 응답이 잘리면(finish_reason=length) 예산을 이 배수로 늘려 재시도
+    
+    # Predicted Outputs: 구문 수정 시 원문을 예측 출력으로 전달 (변경되지 않은 구간 생성 가속)
+    llm_predicted_outputs_enabled: bool = True
+    llm_prediction_models: List[str] = ["gpt-4o", "gpt-4.1"]  # 지원 모델 접두어 (mini/nano 포함)
+
+    # 프롬프트 컴파일: 템플릿의 탭/구분선/연속 빈 줄 정리 (core/llm/prompt_compiler.py)
+    prompt_compile_enabled: bool = True
+    prompt_compile_strip_emphasis: bool = False  # **강조**, *기울임* 표시 제거 (강조가 지시 역할을 하므로 A/B 결과 확인 전까지 끔)
+
+    # 후보 선택 설정
+    selection_mode: str = "logprobs"  # "logprobs": 단일 토큰 + 확률 분포, "text": 응답 텍스트에서 번호 추출
+    selection_min_margin: float = 0.2  # 1위/2위 확률 차이가 이보다 작으면 저확신 처리
+    selection_low_margin_policy: str = "deterministic"  # "deterministic": 근소 차 후보 중 가장 앞 번호, "second_opinion": 순서를 뒤집어 재선택
+    selection_strategy: str = "local_first"  # "llm": 항상 LLM 선택, "local_first": 휴리스틱 점수 차가 작을 때만 LLM, "local": 휴리스틱만
+    selection_heuristic_margin: float = 0.1  # 휴리스틱 1위/2위 점수 차이가 이보다 작으면 근소 차 후보만 LLM으로 선택
+    selection_heuristic_weights: Dict[str, float] = {"edit": 1.0, "center": 0.5, "lexical": 0.5}  # 원문 대비 수정량, 목표 범위 중심과의 거리, 어휘 비율 변화
+    selection_lexical_drift_scale: float = 0.05  # 어휘 비율(CEFR A1A2) 변화량 정규화 기준
+    selection_prefer_lexical_pass: bool = True  # 어휘 목표 범위가 주어지면 어휘 비율도 범위 안인 구문 통과 후보 중에서 선택 (어휘 단계 생략)
+    selection_lexical_closest_margin: float = 0.01  # 어휘 범위 안 후보가 없으면 범위와 가장 가까운 후보에서 이 거리 이내인 후보 중에서 선택
+    
+    # 스트리밍 생성 및 조기 중단(abort) 설정
+    llm_streaming_enabled: bool = False  # True면 abort 조건이 주어진 호출을 스트리밍으로 수행
+    llm_stream_check_interval_chars: int = 200  # abort 조건 검사 주기 (누적 출력 글자 수)
+    syntax_stream_max_length_ratio: float = 1.6  # 구문 후보 출력이 원문 길이의 k배를 넘으면 중단
+    lexical_stream_max_preamble_chars: int = 300  # 어휘 JSON 시작 전 허용되는 서두 글자 수
+    
+    # 엔드포인트 계열별 LLM 용량 격리 (bulkhead): 풀 → 동시 호출 수 / 분당 토큰(0이면 무제한) / 빌려주지 않는 슬롯 수
+    # 분당 토큰은 계정의 실제 TPM 한도에 맞춰 환경변수(LLM_BULKHEADS)로 지정 (기본값은 토큰 제한 없음)
+    llm_bulkhead_enabled: bool = False
+    llm_bulkheads: Dict[str, Dict[str, float]] = {
+        "interactive": {"max_concurrency": 32, "tokens_per_minute": 0, "reserve": 8},  # /revise, /semantic-profile, /topic-closeness
+        "revise_batch": {"max_concurrency": 16, "tokens_per_minute": 0, "reserve": 0},  # /batch-revise
+        "profile_batch": {"max_concurrency": 8, "tokens_per_minute": 0, "reserve": 0},  # /semantic-profile:batch
+        "closeness_batch": {"max_concurrency": 8, "tokens_per_minute": 0, "reserve": 0},  # /topic-closeness:generate-and-score:batch
+    }
+    llm_bulkhead_default_pool: str = "interactive"
+    llm_bulkhead_borrow_when_idle: bool = True  # 풀이 가득 차면 대기자 없는 다른 풀의 여유 용량 차용
+    llm_bulkhead_recheck_interval: float = 0.5  # 대기 중 토큰 버킷 재확인 주기 (초)
+    
+    # 클라이언트 연결 종료 시 요청 처리 취소 (진행 중인 LLM/분석기 호출 포함)
+    cancel_on_client_disconnect: bool = True
+    client_disconnect_poll_interval: float = 1.0  # 연결 상태 확인 주기 (초)
+    
+    # /revise 항목당 LLM 예산 (0이면 무제한, 요청의 max_tokens_budget/max_cost_usd가 우선)
+    revise_budget_max_tokens: int = 0
+    revise_budget_max_cost_usd: float = 0.0
+    revise_budget_degrade_at: float = 0.8  # 사용량이 이 비율을 넘으면 이후 단계 저하 (선택 휴리스틱, 어휘 단계 생략)
+    
+    # 요청 헤징 설정 (지연 시간 백분위 초과 시 중복 요청, 먼저 끝난 쪽 사용)
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 0.95  # 태스크별 최근 지연 시간의 이 백분위를 넘으면 헤지
+    llm_hedge_min_samples: int = 20  # 임계값 계산에 필요한 최소 표본 수
+    llm_hedge_window: int = 200  # 태스크별 보관하는 최근 지연 시간 표본 수
+    llm_hedge_min_delay: float = 1.0  # 헤지 임계값 하한 (초)
+    llm_hedge_max_fraction: float = 0.05  # 전체 호출 대비 헤지 요청 비율 상한
+    
+    # Batch API 실행 모드 (/batch-revise/jobs)
+    batch_api_backend: str = "openai"  # "openai" | "local" (오프라인 테스트용 로컬 대체 서비스)
+    batch_api_work_dir: str = "batch_jobs"  # 라운드별 JSONL 입출력 파일 저장 경로
+    batch_api_completion_window: str = "24h"
+    batch_api_poll_interval: float = 60.0  # 배치 상태 조회 주기 (초)
+    batch_api_flush_check_interval: float = 0.5  # 대기 요청 확인 주기 (초)
+    batch_api_flush_idle_seconds: float = 5.0  # 새 요청이 이 시간 동안 없으면 대기 요청을 제출
+    batch_api_max_requests_per_file: int = 50000  # Batch API 파일당 요청 수 상한
+    batch_api_cost_multiplier: float = 0.5  # Batch API 비용 할인율 (사용량 집계용)
+    batch_api_job_ttl_seconds: float = 86400.0  # 끝난(완료/실패) 작업과 결과를 보관하는 시간 (초)
+
+    # LLM 비용 단가 (USD / 1M tokens), 모델명 접두어 매칭
+    llm_model_pricing: Dict[str, Dict[str, float]] = {
+        "gpt-4.1": {"input": 2.00, "output": 8.00},
+        "gpt-4.1-mini": {"input": 0.40, "output": 1.60},
+        "gpt-4.1-nano": {"input": 0.10, "output": 0.40},
+        "gpt-4o": {"input": 2.50, "output": 10.00},
+        "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+    }
     
     # 기본 허용 오차 설정
     # Polaris Labs에서 계산한 1.5 시그마(σ) 범위 기반 허용 오차
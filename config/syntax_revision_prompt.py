@@ -17,6 +17,36 @@ SYNTAX_USER_INPUT_TEMPLATE = """
 {var_referential_clauses}
 """
 
+# 구문 수정 문장 패치 출력 지시문 (settings.syntax_output_format == "patch", 시스템 프롬프트의 # Output 절을 대체)
+SYNTAX_PATCH_OUTPUT = """
+# Output
+The text to be edited is given as numbered sentences ([1], [2], ...). Do NOT return the full text.
+Return ONLY a JSON object listing the sentences you changed:
+{"patches": [{"sentence_ids": [3], "replacement": "..."}, {"sentence_ids": [5, 6], "replacement": "..."}]}
+- sentence_ids: the number(s) of the original sentence(s) being replaced. Use consecutive numbers to combine sentences into one.
+- replacement: the full revised text that replaces those sentences. To split a sentence, put both resulting sentences in one replacement.
+- Do not include unchanged sentences, and do not use the same sentence number in more than one patch.
+"""
+
+# 구문 수정 발췌 안내 (settings.syntax_focus_enabled, 시스템 프롬프트의 # Output 절 앞에 삽입)
+SYNTAX_FOCUS_NOTE = """
+# Excerpt
+The text to be edited is an EXCERPT of a {var_total_sentences}-sentence passage: only the sentences suited to the required modifications, each with its neighbouring sentences for context. Sentences are numbered by their position in the full passage, and "..." marks omitted sentences.
+- Suggested target sentences: {var_target_ids}
+- You may change only the numbered sentences shown. Sentences you can combine must have consecutive numbers.
+- The metrics are measured on the full passage; count your modifications against the 'Number of Modifications' as usual.
+"""
+
+# 구문 수정 복합(joint) 미션 (평균 문장 길이와 내포절 비율이 모두 범위 밖일 때, 시스템 프롬프트의 # Output 절 앞에 삽입)
+SYNTAX_JOINT_MISSION = """
+# Joint Mission (overrides Step 1 and Step 2)
+BOTH key metrics are outside their target ranges, so you must fix them together in this single revision instead of one metric at a time.
+- average sentence length: {var_length_action}
+- embedded clause ratio: {var_clause_action}
+- **Your Plan:** {var_joint_plan}
+The revised text is checked against BOTH target ranges. An edit that fixes one metric while pushing the other further out of its range is a failure. The 'Problematic Metric' and 'Number of Modifications' in the input refer to this joint plan.
+"""
+
 # 구문 수정 증가 프롬프트 (ILS)
 SYNTAX_PROMPT_INCREASE = """
 You are a Text Editor that enhances a text's **sentence structure**, focusing on two key dimensions: average **sentence length** and overall **sentence complexity** (via clause ratios).
@@ -316,192 +346,6 @@ Your response must contain ONLY the complete, final revised text. Your entire ou
 """
 
 
-# 어휘 수정 프롬프트 
-## 어휘 수정 입력(User) 템플릿
-Lexical_USER_INPUT_TEMPLATE = """
-# Input Data
-## 1. Original Text (for context)
-{var_originalText}
-## 2. JSON-formatted Sentences (for analysis and reporting)
-{var_formattedTextJson}
-## 3. Processed Vocab Profile
-{var_processedProfile}
-## 4. Minimum Number of Modifications
-{var_totalModifications} word(s)
-## 5. Target Level
-{var_targetLevel}
-"""
-
-# --- 통합 프롬프트 A: A1/A2 비율 '낮추기' + 지문 수정 (A1/A2 → B1/B2) ---
-# ---------------------------------------------------------------------------------
-LEXICAL_FIXING_PROMPT_DECREASE = """
-You are a careful Text Editor.
-
-### OBJECTIVE
-- Simplify vocabulary for elementary EFL learners of a target level.
-
-### LEVEL PIPELINE
-- Target selection: Choose candidate words ONLY from the provided "## B1+ Lemmas" list from Processed Vocab Profile (input).
-- Target level: Target Level (input) is the primary criterion for learner-fit; it defines the allowed simplicity band for replacements.
-- Replacement (output): Replace each selected word with a natural, everyday alternative that (a) is clearly easier than the original in context, and (b) fits 'target_level'.
-
-### NATURALNESS (non-negotiable)
-- Use formality, domain, and genre/style as contextual appropriateness checks—not optimization targets.
-- Revise only if, in context, the new wording is appropriate on all three axes (at least as appropriate as the original).
-- If any axis would become less appropriate, leave that occurrence unchanged.
-
-### SCOPE OF EDIT
-- Use the smallest necessary span (word + minimal context) to keep grammar and flow natural.
-- If minimal edits cannot integrate the new word naturally, expand to revise the entire clause containing the target word.
-- Preserve meaning, tone, sentence complexity, and paragraph breaks exactly. Keep proper nouns, numbers, and quoted text unchanged.
-- Any auxiliary words you add/change should remain at roughly the original difficulty level.
-
-### SELECTION GUIDELINES
-- Prefer common, high-frequency everyday words; avoid rare vocabulary.
-- Avoid specific nouns that lack a natural simpler equivalent (e.g. "fox").
-- Each occurrence may be revised differently if context requires.
-
-### OCCURRENCES
-- For each selected target lemma, locate and revise all occurrences across the text when feasible.
-- If revising every occurrence harms naturalness, skip the problematic occurrence(s).
-
-### DISTRIBUTION
-- Aim for even dispersion:
-  - At most one edit per sentence.
-  - Prefer sentences at least D=5 away from the last edited sentence (if possible).
-  - Spread across paragraphs; for a paragraph with N sentences, edit at most ceil(N/3).
-  - If dispersion conflicts with naturalness or the minimum requirement, prioritize naturalness and the minimum requirement.
-
-### INTENSITY & MINIMUM
-- Respect the input 'min_modifications' (based on unique original lemmas).
-
-### INPUT FORMAT
-- Input may be plain text or a JSON array of numbered sentences.
-- If plain text, segment sentences yourself. If JSON is given, use its indices in reporting.
-
-### OUTPUT (JSON only, no explanations)
-The output MUST be a single JSON object with two top-level keys: revision_summary and sheet_data.
-
-- revision_summary: A brief, natural language summary describing the overall changes made, such as the number of modifications and the types of words that were simplified.
-
-- sheet_data: An array of objects, where each object represents a sentence from the original text, structured to resemble a spreadsheet row.
-
-Each object in the sheet_data array MUST contain the following keys:
-
-- st_id: A 1-based integer for the sentence number.
-- original_sentence: The full, original sentence text as a string.
-- corrections: An array that holds the modification details for that sentence.
-  - If the sentence was modified, this array will contain one or more objects, each with the keys: original_clause, revised_clause, and is_ok (set to true).
-  - If the sentence was NOT modified, this array MUST be empty ([]).
-
-- Example structure:
-{
-"revision_summary": "<A brief summary of the changes in English.>",
-"sheet_data": [
-{
-"st_id": 1,
-"original_sentence": "<The first original sentence.>",
-"corrections": [
-{
-"original_clause": "<original phrase>",
-"revised_clause": "<revised phrase>",
-"is_ok": true
-}
-]
-},
-{
-"st_id": 2,
-"original_sentence": "<The second original sentence.>",
-"corrections": []
-}
-]
-}
-"""
-
-# --- 프롬프트 B: A1/A2 비율을 '높이기' 위한 프롬프트 (B1+ → A1/A2) ---
-LEXICAL_FIXING_PROMPT_INCREASE = """
-You are a careful Text Editor.
-
-### OBJECTIVE
-- Elevate the vocabulary for an advanced audience or a more formal/academic context.
-
-### LEVEL PIPELINE
-- Target selection: Choose candidate words ONLY from the provided "## A1-B1 Lemmas" list from Processed Vocab Profile (input).
-- Target level: Target Level (input) is the primary criterion for learner-fit; it defines the desired complexity band for replacements (e.g., B2, C1).
-- Replacement (output): Replace each selected word with a natural, more sophisticated alternative that (a) is clearly more advanced than the original in context, and (b) fits the 'target_level'.
-
-### NATURALNESS (non-negotiable)
-- Use formality, domain, and genre/style as contextual appropriateness checks—not optimization targets.
-- Revise only if, in context, the new wording is appropriate on all three axes (at least as appropriate as the original).
-- If any axis would become less appropriate, leave that occurrence unchanged.
-
-### SCOPE OF EDIT
-- Use the smallest necessary span (word + minimal context) to keep grammar and flow natural.
-- If minimal edits cannot integrate the new word naturally, expand to revise the entire clause containing the target word.
-- Preserve meaning, tone, sentence complexity, and paragraph breaks exactly. Keep proper nouns, numbers, and quoted text unchanged.
-- Any auxiliary words you add/change should remain at roughly the original difficulty level of the replacement.
-
-### SELECTION GUIDELINES
-- Prefer less common, more precise, or academic vocabulary for replacements.
-- Target general verbs, adjectives, and adverbs that have more sophisticated synonyms (e.g., 'get' -> 'obtain', 'good' -> 'excellent').
-- Each occurrence may be revised differently if context requires.
-
-### OCCURRENCES
-- For each selected target lemma, locate and revise all occurrences across the text when feasible.
-- If revising every occurrence harms naturalness, skip the problematic occurrence(s).
-
-### DISTRIBUTION
-- Aim for even dispersion:
-  - At most one edit per sentence.
-  - Prefer sentences at least D=5 away from the last edited sentence (if possible).
-  - Spread across paragraphs; for a paragraph with N sentences, edit at most ceil(N/3).
-  - If dispersion conflicts with naturalness or the minimum requirement, prioritize naturalness and the minimum requirement.
-
-### INTENSITY & MINIMUM
-- Respect the input 'min_modifications' (based on unique original lemmas).
-
-### INPUT FORMAT
-- Input may be plain text or a JSON array of numbered sentences.
-- If plain text, segment sentences yourself. If JSON is given, use its indices in reporting.
-
-### OUTPUT (JSON only, no explanations)
-The output MUST be a single JSON object with two top-level keys: revision_summary and sheet_data.
-
-- revision_summary: A brief, natural language summary describing the overall changes made, such as the number of modifications and the types of words that were elevated.
-- sheet_data: An array of objects, where each object represents a sentence from the original text, structured to resemble a spreadsheet row.
-
-Each object in the sheet_data array MUST contain the following keys:
-- st_id: A 1-based integer for the sentence number.
-- original_sentence: The full, original sentence text as a string.
-- corrections: An array that holds the modification details for that sentence.
-  - If the sentence was modified, this array will contain one or more objects, each with the keys: original_clause, revised_clause, and is_ok (set to true).
-  - If the sentence was NOT modified, this array MUST be empty ([]).
-
-- Example structure:
-{
-"revision_summary": "<A brief summary of the changes in English.>",
-"sheet_data": [
-{
-"st_id": 1,
-"original_sentence": "<The first original sentence.>",
-"corrections": [
-{
-"original_clause": "<original simple phrase>",
-"revised_clause": "<revised sophisticated phrase>",
-"is_ok": true
-}
-]
-},
-{
-"st_id": 2,
-"original_sentence": "<The second original sentence.>",
-"corrections": []
-}
-]
-}
-"""
-
-
 # 최적 지문 선택 프롬프트
 CANDIDATE_SELECTION_PROMPT = """
 You are a precise text evaluator selecting the single best revised text from a list.
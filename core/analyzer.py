@@ -1,7 +1,9 @@
 import requests
 import asyncio
 import aiohttp
-from typing import Dict, Any
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
 from config.settings import settings
 from models.internal import AnalyzerRequest
 from utils.exceptions import AnalyzerAPIError
@@ -13,8 +15,28 @@ class TextAnalyzer:
     def __init__(self):
         self.api_url = settings.external_analyzer_api_url
         self.timeout = settings.pipeline_timeout
+        self._limit: contextvars.ContextVar[Optional[asyncio.Semaphore]] = contextvars.ContextVar(
+            "analyzer_concurrency_limit", default=None
+        )
+    
+    @contextmanager
+    def concurrency_limit(self, max_concurrent: int) -> Iterator[None]:
+        """with 블록 안에서 생성된 태스크들의 분석기 동시 호출 수를 max_concurrent로 제한"""
+        token = self._limit.set(asyncio.Semaphore(max(1, max_concurrent)))
+        try:
+            yield
+        finally:
+            self._limit.reset(token)
     
     async def analyze(self, text: str, include_syntax: bool = True, llm_model: str = "gpt-4.1") -> Dict[str, Any]:
+        """concurrency_limit 범위 안이면 동시 호출 수 제한을 지켜 _analyze 실행"""
+        limit = self._limit.get()
+        if limit is None:
+            return await self._analyze(text, include_syntax, llm_model)
+        async with limit:
+            return await self._analyze(text, include_syntax, llm_model)
+    
+    async def _analyze(self, text: str, include_syntax: bool = True, llm_model: str = "gpt-4.1") -> Dict[str, Any]:
         """
         텍스트를 외부 분석기 API로 전송하여 분석 결과를 받아옵니다.
         
@@ -0,0 +1,247 @@
+"""OpenAI Batch API 실행 모드
+
+배치 모드가 활성화된 컨텍스트(batch_mode) 안에서는 LLMClient의 chat completion 호출이
+즉시 전송되지 않고 BatchCollector에 적재된다. 적재가 잠잠해지면(또는 파일 크기 상한에 도달하면)
+대기 중인 요청을 Batch API JSONL 파일로 기록하여 제출하고, 결과가 도착하면 각 호출 지점의
+future를 완료시켜 해당 항목의 파이프라인이 이어서 진행되도록 한다.
+
+- OpenAIBatchBackend: 실제 OpenAI Files/Batches API 사용
+- LocalBatchBackend: 오프라인 테스트용 로컬 대체 서비스 (responder로 응답 생성, 기본은 모의 응답기)
+"""
+
+import asyncio
+import contextvars
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from config.settings import settings
+from core.llm.mock_responder import mock_responder
+from utils.exceptions import LLMAPIError
+from utils.logging import logger
+
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _to_namespace(value: Any) -> Any:
+    """JSON dict를 속성 접근 가능한 객체로 변환 (ChatCompletion 응답 대용)"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+def parse_batch_output(text: str) -> Dict[str, Dict[str, Any]]:
+    """Batch API 출력/에러 JSONL을 custom_id → 결과 라인 딕셔너리로 변환"""
+    results: Dict[str, Dict[str, Any]] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except Exception as e:
+            logger.warning(f"배치 결과 라인 파싱 실패: {e}")
+            continue
+        if row.get("custom_id"):
+            results[row["custom_id"]] = row
+    return results
+
+
+class OpenAIBatchBackend:
+    """OpenAI Files/Batches API 백엔드"""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def submit(self, input_path: Path) -> str:
+        with open(input_path, "rb") as f:
+            uploaded = await self.client.files.create(file=f, purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window=settings.batch_api_completion_window,
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> str:
+        batch = await self.client.batches.retrieve(batch_id)
+        return batch.status
+
+    async def fetch_results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        batch = await self.client.batches.retrieve(batch_id)
+        results: Dict[str, Dict[str, Any]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            results.update(parse_batch_output(content.text))
+        return results
+
+
+class LocalBatchBackend:
+    """오프라인 테스트용 로컬 배치 서비스 (OpenAI Batch API와 동일한 JSONL 입출력)"""
+
+    def __init__(self, responder: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.responder = responder or mock_responder
+        self._outputs: Dict[str, Path] = {}
+
+    async def submit(self, input_path: Path) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        output_lines = []
+        for line in input_path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request.get("body", {})
+            content = self.responder(body)
+            prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+            prompt_tokens = (prompt_chars + 3) // 4
+            completion_tokens = (len(content) + 3) // 4
+            output_lines.append(json.dumps({
+                "id": f"{batch_id}_{request['custom_id']}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "object": "chat.completion",
+                        "model": body.get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                },
+                "error": None,
+            }, ensure_ascii=False))
+        output_path = input_path.with_name(input_path.stem + "_output.jsonl")
+        output_path.write_text("\n".join(output_lines) + "\n", encoding="utf-8")
+        self._outputs[batch_id] = output_path
+        return batch_id
+
+    async def poll(self, batch_id: str) -> str:
+        return "completed" if batch_id in self._outputs else "failed"
+
+    async def fetch_results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        return parse_batch_output(self._outputs[batch_id].read_text(encoding="utf-8"))
+
+
+class BatchCollector:
+    """배치 모드 LLM 요청 수집기 (라운드 단위 JSONL 제출 및 결과 분배)"""
+
+    def __init__(self, job_id: str, backend: Any):
+        self.job_id = job_id
+        self.backend = backend
+        self.work_dir = Path(settings.batch_api_work_dir) / job_id
+        self._pending: List[Dict[str, Any]] = []
+        self._seq = 0
+        self._round = 0
+        self._last_enqueue = time.monotonic()
+        self._flushes: List[asyncio.Task] = []
+        self._stopped = False
+        self.batches_submitted = 0
+        self.requests_submitted = 0
+
+    async def submit(self, task: str, body: Dict[str, Any]) -> Any:
+        """요청 하나를 적재하고 배치 결과가 도착할 때까지 대기. ChatCompletion 형태의 객체 반환"""
+        self._seq += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append({
+            "custom_id": f"{self.job_id}-{self._seq}-{task}",
+            "body": {k: v for k, v in body.items() if v is not None},
+            "future": future,
+        })
+        self._last_enqueue = time.monotonic()
+        return await future
+
+    async def run(self) -> None:
+        """stop() 호출 전까지 대기 요청을 주기적으로 묶어 제출"""
+        while not self._stopped:
+            await asyncio.sleep(settings.batch_api_flush_check_interval)
+            idle = time.monotonic() - self._last_enqueue
+            if self._pending and (
+                idle >= settings.batch_api_flush_idle_seconds
+                or len(self._pending) >= settings.batch_api_max_requests_per_file
+            ):
+                entries = self._pending[:settings.batch_api_max_requests_per_file]
+                del self._pending[:len(entries)]
+                self._flushes.append(asyncio.create_task(self._flush(entries)))
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    async def _flush(self, entries: List[Dict[str, Any]]) -> None:
+        self._round += 1
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        input_path = self.work_dir / f"round_{self._round:03d}.jsonl"
+        with open(input_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps({
+                    "custom_id": entry["custom_id"],
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": entry["body"],
+                }, ensure_ascii=False) + "\n")
+
+        try:
+            batch_id = await self.backend.submit(input_path)
+            self.batches_submitted += 1
+            self.requests_submitted += len(entries)
+            logger.info(f"[batch:{self.job_id}] 라운드 {self._round} 제출: {len(entries)}개 요청, batch_id={batch_id}")
+
+            status = await self.backend.poll(batch_id)
+            while status not in _TERMINAL_STATUSES:
+                await asyncio.sleep(settings.batch_api_poll_interval)
+                status = await self.backend.poll(batch_id)
+            logger.info(f"[batch:{self.job_id}] batch_id={batch_id} 종료 상태: {status}")
+            results = await self.backend.fetch_results(batch_id)
+        except Exception as e:
+            logger.error(f"[batch:{self.job_id}] 라운드 {self._round} 처리 실패: {e}")
+            for entry in entries:
+                if not entry["future"].done():
+                    entry["future"].set_exception(LLMAPIError(f"배치 처리 실패: {e}"))
+            return
+
+        for entry in entries:
+            future = entry["future"]
+            if future.done():
+                continue
+            row = results.get(entry["custom_id"])
+            response = (row or {}).get("response") or {}
+            if row is None:
+                future.set_exception(LLMAPIError(f"배치 결과 누락: {entry['custom_id']} (status={status})"))
+            elif row.get("error") or response.get("status_code") != 200:
+                future.set_exception(LLMAPIError(f"배치 요청 실패: {row.get('error') or response.get('body')}"))
+            else:
+                future.set_result(_to_namespace(response.get("body", {})))
+
+
+_current_collector: contextvars.ContextVar[Optional[BatchCollector]] = contextvars.ContextVar(
+    "llm_batch_collector", default=None
+)
+
+
+@contextmanager
+def batch_mode(collector: BatchCollector) -> Iterator[BatchCollector]:
+    """with 블록 안에서 생성된 태스크의 LLM 호출을 collector로 보냄"""
+    token = _current_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_collector.reset(token)
+
+
+def current_collector() -> Optional[BatchCollector]:
+    return _current_collector.get()
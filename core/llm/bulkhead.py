@@ -0,0 +1,186 @@
+"""엔드포인트 계열별 LLM 용량 격리 (bulkhead)
+
+하나의 llm_client를 공유하는 엔드포인트들이 서로의 용량을 잠식하지 않도록, 풀(pool)마다
+동시 호출 수와 분당 토큰 예산(토큰 버킷)을 따로 둔다. 풀은 요청 처리 컨텍스트에서
+bulkhead.pool(name)으로 지정하며, 지정이 없으면 settings.llm_bulkhead_default_pool을 쓴다.
+
+borrow when idle: 자기 풀이 가득 찼을 때 대기자가 없는 다른 풀의 여유 용량을 빌려 쓴다.
+단, 빌려주는 풀은 reserve 만큼의 동시 호출 슬롯을 항상 남겨 두어 대화형 호출의 지연을 보호한다.
+"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from config.settings import settings
+from utils.logging import logger
+
+
+class _Pool:
+    """풀 하나의 동시 호출 슬롯 + 토큰 버킷"""
+
+    def __init__(self, name: str, config: Dict[str, float]):
+        self.name = name
+        self.max_concurrency = max(1, int(config.get("max_concurrency", 8)))
+        self.tokens_per_minute = float(config.get("tokens_per_minute", 0))  # 0이면 토큰 제한 없음
+        self.reserve = int(config.get("reserve", 0))  # 빌려주지 않는 슬롯 수
+        self.tokens = self.tokens_per_minute
+        self._refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.waiting = 0
+        self.lent = 0
+        self.borrowed = 0
+
+    def refill(self) -> None:
+        if self.tokens_per_minute <= 0:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.tokens_per_minute, self.tokens + (now - self._refilled_at) * self.tokens_per_minute / 60)
+        self._refilled_at = now
+
+    def _has_tokens(self, tokens: int) -> bool:
+        # 버킷 용량보다 큰 요청은 가득 찼을 때 허용 (영구 대기 방지)
+        return self.tokens_per_minute <= 0 or self.tokens >= min(tokens, self.tokens_per_minute)
+
+    def can_admit(self, tokens: int) -> bool:
+        self.refill()
+        return self.in_flight < self.max_concurrency and self._has_tokens(tokens)
+
+    def can_lend(self, tokens: int) -> bool:
+        self.refill()
+        return (
+            self.waiting == 0
+            and self.in_flight < self.max_concurrency - self.reserve
+            and self._has_tokens(tokens)
+        )
+
+    def take(self, tokens: int) -> None:
+        self.in_flight += 1
+        if self.tokens_per_minute > 0:
+            self.tokens -= tokens
+
+    def release(self, charged: int, actual: Optional[int]) -> None:
+        self.in_flight -= 1
+        # 실제 사용량이 추정치보다 적으면 차액 환급 (많으면 추가 차감)
+        if self.tokens_per_minute > 0 and actual is not None:
+            self.tokens = min(self.tokens_per_minute, self.tokens + charged - actual)
+
+    def stats(self) -> Dict[str, Any]:
+        self.refill()
+        return {
+            "max_concurrency": self.max_concurrency,
+            "tokens_per_minute": self.tokens_per_minute,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "available_tokens": round(self.tokens) if self.tokens_per_minute > 0 else None,
+            "lent": self.lent,
+            "borrowed": self.borrowed,
+        }
+
+
+class BulkheadLease:
+    """획득한 용량. settle()로 실제 사용 토큰을 알려주면 해제 시 토큰 버킷을 정산한다."""
+
+    def __init__(self, pool: _Pool, tokens: int):
+        self.pool = pool
+        self.tokens = tokens
+        self.actual_tokens: Optional[int] = None
+
+    def settle(self, usage: Any) -> None:
+        total = getattr(usage, "total_tokens", None) if usage is not None else None
+        if total is not None:
+            self.actual_tokens = int(total)
+
+
+class Bulkhead:
+    """풀별 LLM 용량 관리자"""
+
+    def __init__(self):
+        self._pools: Dict[str, _Pool] = {}
+        self._current: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_bulkhead_pool", default=None)
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_pool(self, name: str) -> _Pool:
+        if name not in self._pools:
+            config = settings.llm_bulkheads.get(name) or settings.llm_bulkheads.get(settings.llm_bulkhead_default_pool) or {}
+            self._pools[name] = _Pool(name, config)
+        return self._pools[name]
+
+    @contextmanager
+    def pool(self, name: str) -> Iterator[str]:
+        """with 블록 안(및 그 안에서 생성된 태스크)의 LLM 호출을 name 풀에 배정"""
+        token = self._current.set(name)
+        try:
+            yield name
+        finally:
+            self._current.reset(token)
+
+    def current_pool(self) -> str:
+        return self._current.get() or settings.llm_bulkhead_default_pool
+
+    def _find_lender(self, home: _Pool, tokens: int) -> Optional[_Pool]:
+        if not settings.llm_bulkhead_borrow_when_idle:
+            return None
+        for name in settings.llm_bulkheads:
+            other = self._get_pool(name)
+            if other is not home and other.can_lend(tokens):
+                return other
+        return None
+
+    @asynccontextmanager
+    async def lease(self, task: str, estimated_tokens: int) -> AsyncIterator[Optional[BulkheadLease]]:
+        """현재 풀에서 동시 호출 슬롯과 토큰을 확보 (여유가 없으면 대기, 유휴 풀에서 차용 가능)"""
+        if not settings.llm_bulkhead_enabled:
+            yield None
+            return
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        home = self._get_pool(self.current_pool())
+        async with self._condition:
+            home.waiting += 1
+            try:
+                while True:
+                    if home.can_admit(estimated_tokens):
+                        source = home
+                        break
+                    lender = self._find_lender(home, estimated_tokens)
+                    if lender is not None:
+                        source = lender
+                        lender.lent += 1
+                        home.borrowed += 1
+                        logger.debug(f"bulkhead 차용 (task={task}): {home.name} ← {lender.name}")
+                        break
+                    try:
+                        # 토큰 버킷은 시간에 따라 채워지므로 주기적으로 다시 확인
+                        await asyncio.wait_for(self._condition.wait(), timeout=settings.llm_bulkhead_recheck_interval)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                home.waiting -= 1
+            source.take(estimated_tokens)
+
+        lease = BulkheadLease(source, estimated_tokens)
+        try:
+            yield lease
+        finally:
+            # 반환은 락 없이 즉시 수행 (락 대기 중 다시 취소되어도 용량이 새지 않도록), 락은 대기자 깨우기에만 사용
+            # 깨우기가 취소로 생략되어도 대기자는 recheck 주기마다 다시 확인한다
+            source.release(lease.tokens, lease.actual_tokens)
+            async with self._condition:
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        names: List[str] = list(dict.fromkeys([*settings.llm_bulkheads, *self._pools]))
+        return {
+            "enabled": settings.llm_bulkhead_enabled,
+            "borrow_when_idle": settings.llm_bulkhead_borrow_when_idle,
+            "pools": {name: self._get_pool(name).stats() for name in names},
+        }
+
+
+# 전역 bulkhead 인스턴스
+bulkhead = Bulkhead()
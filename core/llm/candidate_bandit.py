@@ -0,0 +1,184 @@
+"""후보 수/temperature 온라인 밴딧 제어
+
+구문 후보를 몇 개, 어떤 temperature로 생성할지를 수정 맥락별로 관측된 통과율과 토큰 비용에서 정한다.
+- 맥락(context): (단계, 문제 지표, 프롬프트 타입, 지문 길이 구간)
+- 팔(arm): 단계별 temperature 후보 (settings.candidate_bandit_stages)
+- 팔마다 통과 여부를 Beta 사후분포로 두고 Thompson sampling으로 temperature 선택
+  (표본 통과 확률 / 상대 토큰 비용이 가장 큰 팔)
+- 선택한 후보들의 통과 확률로 "1개 이상 통과" 확률이 settings.candidate_bandit_target_pass_prob에
+  도달하는 최소 후보 수를 생성 (단계별 min/max 범위)
+
+관측 전(사전분포)에는 통과율 0.5로 보아 기존 고정 설정(2 temperature × 2개)과 비슷한 수로 시작한다.
+어휘 후보는 병합(sheet_data)되고 개별 통과 판정이 없어 보상으로 쓸 신호가 없으므로 고정 계획(0.2 × 3개)을 유지한다.
+상태는 settings.candidate_bandit_state_path에 JSON으로 저장하여 재시작 후에도 이어서 사용한다.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings
+from utils.logging import logger
+
+STAGE_SYNTAX = "syntax"
+
+
+def length_bucket(text: str) -> str:
+    """지문 단어 수 구간 (settings.candidate_bandit_length_buckets 경계 기준)"""
+    words = len(text.split())
+    lower = 0
+    for bound in settings.candidate_bandit_length_buckets:
+        if words < bound:
+            return f"{lower}-{bound}"
+        lower = bound
+    return f"{lower}+"
+
+
+class _Arm:
+    """temperature 하나의 통과/실패 관측 (지수 감쇠 적용)"""
+
+    def __init__(self, passes: float = 0.0, fails: float = 0.0, tokens: float = 0.0, observations: float = 0.0):
+        self.passes = passes
+        self.fails = fails
+        self.tokens = tokens  # 후보당 평균 토큰
+        self.observations = observations
+
+    def mean(self) -> float:
+        return (1.0 + self.passes) / (2.0 + self.passes + self.fails)
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.betavariate(1.0 + self.passes, 1.0 + self.fails)
+
+    def update(self, passed: bool, tokens: int) -> None:
+        decay = settings.candidate_bandit_decay
+        self.passes = self.passes * decay + (1.0 if passed else 0.0)
+        self.fails = self.fails * decay + (0.0 if passed else 1.0)
+        self.tokens = tokens if self.observations == 0 else self.tokens + (tokens - self.tokens) * 0.1
+        self.observations += 1
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"passes": round(self.passes, 4), "fails": round(self.fails, 4),
+                "tokens": round(self.tokens, 1), "observations": self.observations}
+
+
+class CandidateBandit:
+    """맥락별 후보 생성 계획 수립 및 결과 반영"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._arms: Optional[Dict[str, Dict[str, _Arm]]] = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.candidate_bandit_enabled
+
+    @staticmethod
+    def context_key(stage: str, metric: str, prompt_type: str, text: str) -> str:
+        return "|".join((stage, metric or "-", prompt_type or "-", length_bucket(text)))
+
+    def _context(self, key: str) -> Dict[str, _Arm]:
+        if self._arms is None:
+            self._arms = self._load()
+        stage = key.split("|", 1)[0]
+        arms = self._arms.setdefault(key, {})
+        for temp in settings.candidate_bandit_stages[stage]["temperatures"]:
+            arms.setdefault(str(temp), _Arm())
+        return arms
+
+    def plan(self, key: str, max_candidates: Optional[int] = None) -> List[Tuple[float, int]]:
+        """
+        후보 생성 계획 [(temperature, temperature 내 번호)] (temperature 순)
+
+        Args:
+            key: context_key로 만든 맥락 키
+            max_candidates: 상한 (예: 요청 예산으로 감당 가능한 수)
+        """
+        stage = key.split("|", 1)[0]
+        config = settings.candidate_bandit_stages[stage]
+        upper = int(config["max_candidates"]) if max_candidates is None else max(1, min(int(config["max_candidates"]), max_candidates))
+        lower = min(int(config["min_candidates"]), upper)
+        with self._lock:
+            # 저장된 상태에 설정에서 빠진 temperature가 남아 있어도 설정된 팔만 계획에 사용
+            temperatures = {str(temp) for temp in config["temperatures"]}
+            arms = {temp: arm for temp, arm in self._context(key).items() if temp in temperatures}
+            known = [a.tokens for a in arms.values() if a.observations]
+            mean_tokens = sum(known) / len(known) if known else 0.0
+            chosen: List[float] = []
+            fail_prob = 1.0
+            while len(chosen) < upper and (len(chosen) < lower or 1.0 - fail_prob < settings.candidate_bandit_target_pass_prob):
+                # Thompson sampling: 표본 통과 확률을 상대 토큰 비용으로 나눈 값이 가장 큰 temperature
+                temp, arm = max(arms.items(), key=lambda item: self._value(item[1], mean_tokens))
+                chosen.append(float(temp))
+                fail_prob *= 1.0 - arm.mean()
+        chosen.sort()
+        return [(temp, chosen[:i + 1].count(temp)) for i, temp in enumerate(chosen)]
+
+    def _value(self, arm: _Arm, mean_tokens: float) -> float:
+        cost = arm.tokens / mean_tokens if arm.observations and mean_tokens else 1.0
+        return arm.sample(self._rng) / max(cost, 0.1)
+
+    def record(self, key: str, temperature: float, passed: bool, tokens: int) -> None:
+        """후보 하나의 결과 반영 (조기 취소로 판정되지 않은 후보는 반영하지 않음)"""
+        with self._lock:
+            arms = self._context(key)
+            arm = arms.setdefault(str(temperature), _Arm())
+            arm.update(passed, tokens)
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= settings.candidate_bandit_save_interval:
+                self._save_locked()
+
+    def save(self) -> None:
+        """변경된 상태를 파일에 저장"""
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        self._saved_at = time.monotonic()
+        path = settings.candidate_bandit_state_path
+        if not self._dirty or not path or self._arms is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._snapshot(), f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"후보 밴딧 상태 저장 실패: {str(e)}")
+
+    def _load(self) -> Dict[str, Dict[str, _Arm]]:
+        path = settings.candidate_bandit_state_path
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            arms = {key: {temp: _Arm(**arm) for temp, arm in temps.items()} for key, temps in data.items()}
+            logger.info(f"후보 밴딧 상태 로드: {len(arms)}개 맥락 ({path})")
+            return arms
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"후보 밴딧 상태 로드 실패, 초기 상태로 시작: {str(e)}")
+            return {}
+
+    def _snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {key: {temp: arm.to_dict() for temp, arm in temps.items()} for key, temps in (self._arms or {}).items()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._arms is None:
+                self._arms = self._load()
+            contexts = {
+                key: {temp: {**arm.to_dict(), "pass_rate": round(arm.mean(), 3)} for temp, arm in temps.items()}
+                for key, temps in self._arms.items()
+            }
+        return {"enabled": self.enabled, "contexts": contexts}
+
+
+# 전역 후보 밴딧 인스턴스
+candidate_bandit = CandidateBandit()
@@ -0,0 +1,145 @@
+"""긴 지문 청크 분할 수정
+
+긴 지문은 프롬프트와 출력이 모두 길어 구문 수정 호출마다 느리고, 지문 전체 출력 시 최대 출력 토큰에 걸리기도 한다.
+지문을 문단(줄바꿈) 경계, 문단이 길면 문장 경계에서 settings.syntax_chunk_max_words 단어 이하 청크로 나누고,
+전체 수정 수를 청크별 지표 기여도에 비례해 배분한 뒤 청크들을 동시에 수정해 이어 붙인다.
+검증(외부 분석기)은 이어 붙인 지문 전체에 대해 수행하므로 지연 시간은 지문 길이가 아니라 청크 크기에 비례한다.
+- 기여도: 청크의 로컬 추정 지표(core/prescreen.py, 지문 전체 분석기 값으로 보정)가 목표 범위 중심에서
+  수정 방향 반대쪽으로 벗어난 정도 × 문장 수 (모든 청크가 0이면 문장 수 비례)
+- 배분: 최대 잔여(largest remainder) 방식으로 합이 전체 수정 수와 같도록 정수 배분
+"""
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+from core.llm.sentence_patch import split_sentences
+from core.prescreen import syntax_prescreener
+
+
+@dataclass
+class PassageChunk:
+    """지문 청크"""
+    text: str
+    gap: str  # 청크 뒤 공백/줄바꿈 (이어 붙일 때 그대로 사용, 마지막 청크는 "")
+    sentence_count: int
+    word_count: int
+
+
+@dataclass
+class ChunkJob:
+    """청크별 수정 작업 (prompt가 None이면 배분된 수정이 없어 원문 유지)"""
+    chunk: PassageChunk
+    num_modifications: int
+    problematic_metric: Optional[str] = None
+    prompt_type: Optional[str] = None
+    prompt: Optional[List[dict]] = None
+
+
+def _balanced_groups(ids: List[int], words: List[int], max_words: int) -> List[List[int]]:
+    """문장 번호 리스트를 단어 수가 고르게 max_words 이하 그룹으로 분할 (문장 경계 유지)"""
+    total = sum(words[i] for i in ids)
+    parts = max(1, math.ceil(total / max_words))
+    target = total / parts
+    groups: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for i in ids:
+        if current and size + words[i] / 2 > target and len(groups) < parts - 1:
+            groups.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += words[i]
+    groups.append(current)
+    return groups
+
+
+def split_chunks(text: str, max_words: int) -> List[PassageChunk]:
+    """
+    지문을 청크로 분할 (문단 단위로 max_words까지 묶고, 문단이 더 길면 문장 경계에서 고르게 나눔)
+
+    Returns:
+        청크 리스트 - stitch(chunks, [c.text for c in chunks])로 원문(앞뒤 공백 제외) 복원
+    """
+    sentences, gaps = split_sentences(text)
+    words = [syntax_prescreener.word_count(s) for s in sentences]
+    paragraphs: List[List[int]] = [[]]
+    for i, gap in enumerate(gaps):
+        paragraphs[-1].append(i)
+        if "\n" in gap and i + 1 < len(sentences):
+            paragraphs.append([])
+
+    groups: List[List[int]] = []
+    size = 0
+    for paragraph in paragraphs:
+        for piece in _balanced_groups(paragraph, words, max_words):
+            piece_words = sum(words[i] for i in piece)
+            if groups and size + piece_words <= max_words:
+                groups[-1].extend(piece)
+                size += piece_words
+            else:
+                groups.append(list(piece))
+                size = piece_words
+
+    return [
+        PassageChunk(
+            text="".join(sentences[i] + gaps[i] for i in ids[:-1]) + sentences[ids[-1]],
+            gap=gaps[ids[-1]],
+            sentence_count=len(ids),
+            word_count=sum(words[i] for i in ids),
+        )
+        for ids in groups
+    ]
+
+
+def stitch(chunks: List[PassageChunk], texts: List[str]) -> str:
+    """청크별 (수정) 텍스트를 원래 구분 공백으로 이어 붙임"""
+    return "".join(text.strip() + chunk.gap for chunk, text in zip(chunks, texts))
+
+
+def allocate_modifications(
+    chunks: List[PassageChunk],
+    metric: str,
+    direction: str,
+    total: int,
+    current: Optional[float],
+    target_min: float,
+    target_max: float,
+) -> List[int]:
+    """
+    전체 수정 수를 청크별 지표 기여도에 비례해 배분
+
+    Args:
+        chunks: 청크 리스트
+        metric: "avg_sentence_length" 또는 "all_embedded_clauses_ratio"
+        direction: 수정 방향 ("increase" | "decrease")
+        total: 전체 수정 수
+        current: 지문 전체의 분석기 지표 (로컬 추정 보정용, None이면 보정 없음)
+        target_min: 목표 최소값
+        target_max: 목표 최대값
+
+    Returns:
+        청크별 수정 수 (합 = total)
+    """
+    if total <= 0 or not chunks:
+        return [0] * len(chunks)
+    estimates = [syntax_prescreener.estimate(chunk.text) for chunk in chunks]
+    passage = syntax_prescreener.estimate(stitch(chunks, [chunk.text for chunk in chunks]))
+    target = (target_min + target_max) / 2
+    sign = 1.0 if direction == "increase" else -1.0
+    if "length" in metric.lower():
+        scale = current / passage.avg_sentence_length if current and passage.avg_sentence_length else 1.0
+        values = [e.avg_sentence_length * scale for e in estimates]
+    else:
+        offset = current - passage.clause_ratio if current is not None else 0.0
+        values = [e.clause_ratio + offset for e in estimates]
+    weights = [e.sentence_count * max(0.0, sign * (target - value)) for e, value in zip(estimates, values)]
+    if not any(weights):
+        weights = [float(e.sentence_count) for e in estimates]
+
+    weight_sum = sum(weights) or 1.0
+    shares = [total * w / weight_sum for w in weights]
+    counts = [int(share) for share in shares]
+    remainder = total - sum(counts)
+    for i in sorted(range(len(chunks)), key=lambda i: shares[i] - counts[i], reverse=True)[:remainder]:
+        counts[i] += 1
+    return counts
@@ -1,10 +1,22 @@
 import openai
 import asyncio
+import math
 import os
 import re
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from config.settings import settings
-from utils.exceptions import LLMAPIError
+from core.llm.tasks import TASK_DEFAULT, TASK_SELECT, TASK_SYNTAX_GENERATE
+from core.llm.usage import usage_tracker
+from core.llm.stream_guards import AbortPredicate, first_abort_reason
+from core.llm.hedging import hedge_policy
+from core.llm.batch_api import current_collector
+from core.llm.routing import model_router
+from core.llm.token_budget import token_budgeter
+from core.llm.bulkhead import BulkheadLease, bulkhead
+from core.llm.key_pool import ApiKeySlot, key_pool
+from models.internal import SelectionResult
+from utils.exceptions import LLMAPIError, LLMStreamAbortedError
+from utils.helpers import gather_in_task_group
 from utils.logging import logger
 
 _API_KEY_REDACT_RE = re.compile(r"sk-[A-Za-z0-9]{16,}")
@@ -16,6 +28,69 @@ def _sanitize_err(msg: str) -> str:
     except Exception:
         return "(unavailable)"
 
+
+def _finish_reason(response: Any) -> Optional[str]:
+    try:
+        return response.choices[0].finish_reason
+    except Exception:
+        return None
+
+
+def _message_text(response: Any) -> str:
+    try:
+        return response.choices[0].message.content or ""
+    except Exception:
+        return ""
+
+
+def _should_fallback(error: Exception) -> bool:
+    """다른 모델로 재시도할 만한 오류인지 (연결/타임아웃, 5xx, 모델 없음, rate limit)
+
+    요청 자체의 문제(잘못된 요청, 컨텍스트 길이 초과 등)나 키 풀의 LLMAPIError는 다른 모델에서도 실패하므로 제외한다.
+    """
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.NotFoundError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500 or getattr(error, "code", None) == "model_not_found"
+    return False
+
+
+def _supports_prediction(model: str) -> bool:
+    return settings.llm_predicted_outputs_enabled and any(
+        model.startswith(prefix) for prefix in settings.llm_prediction_models
+    )
+
+
+def _prediction_params(model: str, prediction: Optional[str]) -> Dict[str, Any]:
+    """Predicted Outputs 파라미터 (지원 모델이고 예측 텍스트가 있을 때만)"""
+    if prediction and _supports_prediction(model):
+        return {"prediction": {"type": "content", "content": prediction}}
+    return {}
+
+
+def _selection_distribution(response: Any, num_candidates: int) -> Dict[int, float]:
+    """첫 출력 토큰의 top_logprobs에서 후보 번호별 확률 분포 계산 (후보 번호 외 토큰은 제외 후 정규화)"""
+    try:
+        top = response.choices[0].logprobs.content[0].top_logprobs or []
+    except Exception:
+        return {}
+    probs: Dict[int, float] = {}
+    for item in top:
+        token = str(getattr(item, "token", "") or "").strip()
+        if token.isdigit() and 1 <= int(token) <= num_candidates:
+            probs[int(token)] = probs.get(int(token), 0.0) + math.exp(item.logprob)
+    total = sum(probs.values())
+    if total <= 0:
+        return {}
+    return {i: probs.get(i, 0.0) / total for i in range(1, num_candidates + 1)}
+
+
+def _margin(distribution: Dict[int, float]) -> Optional[float]:
+    ranked = sorted(distribution.values(), reverse=True)
+    if not ranked:
+        return None
+    return ranked[0] - (ranked[1] if len(ranked) > 1 else 0.0)
+
 class LLMClient:
     """통합 OpenAI LLM API 클라이언트 (AsyncOpenAI 사용)
 
@@ -28,6 +103,7 @@ class LLMClient:
         self.model = settings.openai_model
         self._client = None
         self._client_init_error: Optional[str] = None
+        self._task_clients: Dict[tuple, Any] = {}
         self.temperatures = settings.llm_temperatures
         self.candidates_per_temperature = settings.syntax_candidates_per_temperature
 
@@ -42,7 +118,7 @@ class LLMClient:
                     logger.error("OPENAI_API_KEY가 설정되지 않아 OpenAI 클라이언트를 초기화할 수 없습니다.")
                     self._client = None
                     return None
-                self._client = openai.AsyncOpenAI(api_key=api_key)
+                self._client = openai.AsyncOpenAI(api_key=api_key, base_url=settings.openai_base_url)
                 self._client_init_error = None
                 logger.info("AsyncOpenAI 클라이언트 초기화 성공")
             except Exception as e:
@@ -51,15 +127,174 @@ class LLMClient:
                 self._client = None
         return self._client
 
-    async def generate_text(self, prompt: str, temperature: Optional[float] = None, max_tokens: Optional[int] = None, output_schema: Optional[object] = None) -> str:
+    def _client_for(self, task: str):
+        """태스크별 클라이언트 설정(settings.llm_task_client_config)이 있으면 별도 클라이언트, 없으면 기본 클라이언트"""
+        config = model_router.client_config_for(task)
+        if not config:
+            return self.client
+        cache_key = tuple(sorted((k, str(v)) for k, v in config.items()))
+        if cache_key not in self._task_clients:
+            api_key_env = config.get("api_key_env")
+            api_key = (os.getenv(api_key_env) if api_key_env else None) or settings.openai_api_key or os.getenv("OPENAI_API_KEY")
+            kwargs: Dict[str, Any] = {"api_key": api_key, "base_url": settings.openai_base_url}
+            for name in ("base_url", "timeout", "max_retries"):
+                if config.get(name) is not None:
+                    kwargs[name] = config[name]
+            self._task_clients[cache_key] = openai.AsyncOpenAI(**kwargs)
+            logger.info(f"태스크 전용 AsyncOpenAI 클라이언트 초기화 (task={task}, base_url={config.get('base_url')})")
+        return self._task_clients[cache_key]
+
+    def _has_client(self) -> bool:
+        """호출에 쓸 클라이언트가 있는지 (키 풀 또는 기본 클라이언트)"""
+        return key_pool.enabled or self.client is not None
+
+    async def _create_with_key(
+        self, task: str, estimated_tokens: int, create: Callable[[Any], Awaitable[Any]],
+        selected: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Any, Optional[ApiKeySlot]]:
+        """API 호출을 보낼 클라이언트를 정해 create(client) 실행
+
+        태스크 전용 클라이언트 설정이 없고 키 풀(settings.llm_api_key_pool)이 있으면 여유 토큰이 가장 큰 키로 보내고,
+        한도 초과/할당량 소진/인증 실패 시 남은 키로 넘기고, 모두 rate limit 휴지 중이면 복귀를 기다린다.
+        selected가 주어지면 호출 중인 키 슬롯을 selected["slot"]에 기록한다 (호출이 취소될 때 정산용).
+
+        Returns:
+            (응답, 사용한 키 슬롯 - 키 풀 미사용 시 None)
+        """
+        if model_router.client_config_for(task) or not key_pool.enabled:
+            return await create(self._client_for(task)), None
+        tried: set = set()
+        last_error: Optional[Exception] = None
+        waited = 0.0
+        while True:
+            slot = key_pool.select(estimated_tokens, exclude=tried)
+            if slot is None:
+                # 모든 키가 rate limit 휴지 중이면 가장 먼저 복귀하는 키를 기다렸다가 다시 시도
+                wait = key_pool.next_recovery_in()
+                if wait is not None and waited + wait <= settings.llm_key_max_wait:
+                    await asyncio.sleep(wait)
+                    waited += wait
+                    tried.clear()
+                    continue
+                if last_error is not None:
+                    raise last_error
+                raise LLMAPIError("사용 가능한 API 키가 없습니다 (모든 키가 휴지 상태)")
+            if selected is not None:
+                selected["slot"] = slot
+            try:
+                return await create(slot.client), slot
+            except Exception as e:
+                key_pool.refund(slot, estimated_tokens)
+                if not key_pool.report_error(slot, e):
+                    raise
+                tried.add(slot.name)
+                last_error = e
+
+    async def _with_model_fallback(self, task: str, call: Callable[[str], Awaitable[Any]]) -> Any:
+        """태스크의 모델 체인을 앞에서부터 시도하고, 폴백 대상 오류(_should_fallback)면 다음 모델로 폴백"""
+        chain = model_router.chain_for(task)
+        last_error: Optional[Exception] = None
+        for i, model in enumerate(chain):
+            try:
+                return await call(model)
+            except Exception as e:
+                if not _should_fallback(e):
+                    raise
+                last_error = e
+                if i + 1 < len(chain):
+                    logger.warning(f"모델 호출 실패 (task={task}, model={model}) → {chain[i + 1]}로 폴백: {_sanitize_err(str(e))}")
+        raise last_error
+
+    async def _chat_completion(self, task: str, retry_truncated: bool = True, prediction: Optional[str] = None, **params):
+        """chat.completions.create 공통 호출 (모델 라우팅/폴백, 헤징 적용 및 사용량 기록)
+
+        응답이 max_tokens에서 잘리면(finish_reason == "length") 예산을 늘려 다시 호출한다.
+        (retry_truncated=False: 단일 토큰 선택처럼 잘림이 의도된 호출)
+        prediction: 예상 출력 텍스트 (Predicted Outputs, 지원 모델에서만 전달)
+        """
+        response = await self._chat_completion_once(task, prediction, **params)
+        max_tokens = params.get("max_tokens") if retry_truncated else None
+        while max_tokens and _finish_reason(response) == "length":
+            max_tokens = token_budgeter.next_budget(task, max_tokens)
+            if max_tokens is None:
+                break
+            params["max_tokens"] = max_tokens
+            response = await self._chat_completion_once(task, prediction, **params)
+        return response
+
+    async def _chat_completion_once(self, task: str, prediction: Optional[str] = None, **params):
+        """단일 chat completion 호출
+
+        배치 모드(core.llm.batch_api.batch_mode) 안에서는 Batch API 수집기로 보내고 결과를 기다린다.
+        (배치는 지연 시간이 무의미하므로 prediction을 보내지 않는다)
+        """
+        collector = current_collector()
+        if collector is not None:
+            model = model_router.chain_for(task)[0]
+            response = await collector.submit(task, {"model": model, **params})
+            usage_tracker.record(
+                task, model, getattr(response, "usage", None),
+                cost_multiplier=settings.batch_api_cost_multiplier,
+            )
+            return response
+
+        async def _call(model: str):
+            messages = params.get("messages") or []
+            prompt_tokens = token_budgeter.count_message_tokens(messages, model)
+            max_tokens = int(params.get("max_tokens") or 0)
+            winner: Dict[str, str] = {}  # 먼저 성공한 시도의 출력 (헤지 경쟁에서 진 시도의 사용량 추정 기준)
+
+            async def _attempt():
+                """시도(원 요청/헤지 요청)마다 별도의 bulkhead 용량과 키 슬롯으로 호출하고 각자 사용량을 정산"""
+                sent = False
+                selected: Dict[str, Any] = {}
+                try:
+                    async with bulkhead.lease(task, prompt_tokens + max_tokens) as lease:
+                        sent = True
+                        try:
+                            response, slot = await self._create_with_key(
+                                task, prompt_tokens + max_tokens, lambda client: client.chat.completions.create(
+                                    model=model, extra_headers={"X-LLM-Task": task}, **_prediction_params(model, prediction), **params
+                                ),
+                                selected,
+                            )
+                        except asyncio.CancelledError:
+                            if "text" in winner:
+                                # 헤지 경쟁에서 진 시도: 취소해도 공급자는 과금하므로 이긴 시도의 출력 길이로 추정 기록
+                                usage = usage_tracker.record_estimated(task, model, messages, winner["text"])
+                                if lease is not None:
+                                    lease.settle(usage)
+                                if selected.get("slot") is not None:
+                                    key_pool.settle(selected["slot"], prompt_tokens + max_tokens, usage)
+                            raise
+                        usage = getattr(response, "usage", None)
+                        winner.setdefault("text", _message_text(response))
+                        if lease is not None:
+                            lease.settle(usage)
+                        if slot is not None:
+                            key_pool.settle(slot, prompt_tokens + max_tokens, usage)
+                except asyncio.CancelledError:
+                    if "text" not in winner:
+                        # 요청 취소: 전송 전이면 프롬프트+출력, 전송 후면 출력 예산만큼 절감한 것으로 집계
+                        usage_tracker.record_cancelled(task, sent, 0 if sent else prompt_tokens, max_tokens)
+                    raise
+                usage_tracker.record(task, model, usage)
+                return response
+
+            return await hedge_policy.run(task, _attempt)
+
+        return await self._with_model_fallback(task, _call)
+
+    async def generate_text(self, prompt: str, temperature: Optional[float] = None, max_tokens: Optional[int] = None, output_schema: Optional[object] = None, task: str = TASK_DEFAULT) -> str:
         """
         단일 텍스트 생성 (구조화된 응답 지원)
 
         Args:
             prompt: 생성 프롬프트
             temperature: 생성 온도 (0.0~1.0), None이면 0.7 사용
-            max_tokens: 최대 토큰 수 (사용 안 함, settings에서 가져옴)
+            max_tokens: 최대 출력 토큰 수, None이면 태스크별 예산 (core.llm.token_budget)
             output_schema: JSON Schema 객체 또는 파일 경로 (구조화된 응답용)
+            task: 사용량 집계용 태스크 태그 (core.llm.tasks)
 
         Returns:
             생성된 텍스트
@@ -68,7 +303,7 @@ class LLMClient:
             LLMAPIError: LLM API 호출 실패 시
         """
         try:
-            if not self.client:
+            if current_collector() is None and not self._has_client():
                 reason = self._client_init_error
                 suffix = f": {reason}" if reason else ""
                 raise LLMAPIError(f"OpenAI 클라이언트가 초기화되지 않았습니다{suffix}")
@@ -107,11 +342,11 @@ class LLMClient:
                     logger.warning(f"response_format 준비 경고: {e_pf}")
 
             # 비동기 호출 사용 (AsyncOpenAI)
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self._chat_completion(
+                task,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
-                max_tokens=settings.llm_max_output_tokens,
+                max_tokens=max_tokens or token_budgeter.output_budget(task),
                 response_format=prepared_response_format
             )
 
@@ -123,7 +358,7 @@ class LLMClient:
             logger.error(f"텍스트 생성 실패 (temp={temperature}): {str(e)}")
             raise LLMAPIError(f"텍스트 생성 실패: {str(e)}")
     
-    async def generate_multiple(self, prompt: str, temperatures: List[float]) -> List[str]:
+    async def generate_multiple(self, prompt: str, temperatures: List[float], task: str = TASK_DEFAULT) -> List[str]:
         """
         여러 temperature로 텍스트 생성 (호환성 유지용)
         
@@ -137,7 +372,7 @@ class LLMClient:
         results = []
         for temp in temperatures:
             try:
-                text = await self.generate_text(prompt, temperature=temp)
+                text = await self.generate_text(prompt, temperature=temp, task=task)
                 results.append(text)
             except LLMAPIError as e:
                 logger.warning(f"Temperature {temp}에서 생성 실패: {str(e)}")
@@ -176,7 +411,7 @@ class LLMClient:
         
         # 병렬 실행
         try:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            results = await gather_in_task_group(*tasks, return_exceptions=True)
             
             # 결과 처리 및 로깅
             final_results = []
@@ -236,7 +471,7 @@ class LLMClient:
             LLMAPIError: LLM API 호출 실패 시
         """
         try:
-            response_text = await self.generate_text(selection_prompt, temperature)
+            response_text = await self.generate_text(selection_prompt, temperature, task=TASK_SELECT)
             selection_number = self._extract_selection_number(response_text)
             
             logger.info(f"후보 선택 완료: {selection_number}번")
@@ -246,73 +481,271 @@ class LLMClient:
             logger.error(f"후보 선택 실패: {str(e)}")
             raise LLMAPIError(f"후보 선택 실패: {str(e)}")
     
-    def _extract_selection_number(self, response: str) -> int:
-        """응답에서 선택 번호 추출"""
+    async def select_with_logprobs(self, selection_prompt: str, num_candidates: int, task: str = TASK_SELECT) -> SelectionResult:
+        """
+        단일 토큰 출력 + logprobs로 후보 선택 (후보별 확률 분포와 1/2위 확률 차이 반환)
+
+        출력은 max_tokens=1로 제한하고, 토크나이저가 있으면 logit_bias로 후보 번호 토큰만 허용한다.
+        확률 분포를 얻지 못하면 응답 텍스트에서 번호를 추출한다 (mode="text").
+
+        Raises:
+            LLMAPIError: LLM API 호출 실패 시
+        """
         try:
-            # 숫자 추출 로직
-            import re
-            numbers = re.findall(r'\d+', response)
-            if numbers:
-                return int(numbers[0])
-            else:
-                logger.warning(f"응답에서 숫자를 찾을 수 없음: {response}")
-                return 1  # 기본값
+            if current_collector() is None and not self._has_client():
+                raise LLMAPIError("OpenAI 클라이언트가 초기화되지 않았습니다")
+
+            params: Dict[str, Any] = {
+                "messages": [{"role": "user", "content": selection_prompt}],
+                "temperature": 0.0,
+                "max_tokens": 1,
+                "logprobs": True,
+                "top_logprobs": min(20, max(5, num_candidates)),
+            }
+            logit_bias = token_budgeter.logit_bias_for(
+                [str(i) for i in range(1, num_candidates + 1)], model_router.chain_for(task)[0]
+            )
+            if logit_bias:
+                params["logit_bias"] = logit_bias
+            response = await self._chat_completion(task, retry_truncated=False, **params)
+
+            distribution = _selection_distribution(response, num_candidates)
+            if not distribution:
+                content = response.choices[0].message.content or ""
+                selected = self._extract_selection_number(content)
+                if not 1 <= selected <= num_candidates:
+                    raise LLMAPIError(f"선택 번호가 후보 범위(1-{num_candidates}) 밖입니다: {content!r}")
+                logger.warning(f"선택 logprobs 없음, 텍스트 응답으로 선택: {selected}번")
+                return SelectionResult(selected_index=selected, mode="text")
+
+            selected = max(distribution, key=lambda i: (distribution[i], -i))
+            result = SelectionResult(
+                selected_index=selected,
+                mode="logprobs",
+                distribution=distribution,
+                margin=_margin(distribution),
+            )
+            logger.info(f"후보 선택 완료 (logprobs): {selected}번, margin={result.margin:.3f}")
+            return result
+
         except Exception as e:
-            logger.warning(f"선택 번호 추출 실패: {str(e)}")
-            return 1  # 기본값
+            logger.error(f"후보 선택 실패: {str(e)}")
+            raise LLMAPIError(f"후보 선택 실패: {str(e)}")
 
-    async def generate_messages(self, messages: List[dict], temperature: float = 0.7, max_tokens: Optional[int] = None) -> str:
+    def _extract_selection_number(self, response: str) -> int:
+        """응답에서 선택 번호 추출 (범위 확인은 호출하는 쪽에서 후보 수로 수행)
+
+        Raises:
+            LLMAPIError: 응답에 숫자가 없을 때
+        """
+        numbers = re.findall(r'\d+', response)
+        if not numbers:
+            logger.warning(f"응답에서 숫자를 찾을 수 없음: {response}")
+            raise LLMAPIError(f"선택 응답에 후보 번호가 없습니다: {response!r}")
+        return int(numbers[0])
+
+    async def generate_messages(
+        self,
+        messages: List[dict],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        task: str = TASK_DEFAULT,
+        abort_predicates: Optional[List[AbortPredicate]] = None,
+        budget_reference: Optional[str] = None,
+        prediction: Optional[str] = None,
+    ) -> str:
         """
         메시지(roles 포함)를 사용하는 생성 메서드
+
+        Args:
+            max_tokens: 최대 출력 토큰 수, None이면 태스크별 예산 (core.llm.token_budget)
+            task: 사용량 집계용 태스크 태그
+            budget_reference: 출력 토큰 예산 산정 기준 텍스트 (예: 수정 대상 지문)
+            prediction: 예상 출력 텍스트 (Predicted Outputs). 출력 대부분이 입력과 같은 수정 작업에서
+                원문을 넘기면 일치 구간을 빠르게 생성한다. 지원 모델(settings.llm_prediction_models)에서만 사용
+            abort_predicates: 스트리밍 조기 중단 조건 (core.llm.stream_guards).
+                settings.llm_streaming_enabled가 True이고 조건이 주어지면 스트리밍으로 생성하며,
+                조건이 충족되는 즉시 스트림을 끊고 LLMStreamAbortedError를 발생시킨다.
         """
         try:
-            if not self.client:
+            batch_collector = current_collector()
+            if batch_collector is None and not self._has_client():
                 raise LLMAPIError("OpenAI 클라이언트가 초기화되지 않았습니다")
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=settings.llm_max_output_tokens
-            )
-            generated_text = response.choices[0].message.content.strip()
+            if max_tokens is None:
+                max_tokens = token_budgeter.output_budget(task, budget_reference, model_router.chain_for(task)[0])
+
+            # 배치 모드에서는 스트리밍 불가 → 일반 호출로 적재
+            if abort_predicates and settings.llm_streaming_enabled and batch_collector is None:
+                while True:
+                    generated_text, finish_reason = await self._with_model_fallback(
+                        task,
+                        lambda model: self._stream_in_bulkhead(
+                            model, messages, temperature, task, abort_predicates, max_tokens, prediction
+                        ),
+                    )
+                    if finish_reason != "length":
+                        break
+                    max_tokens = token_budgeter.next_budget(task, max_tokens)
+                    if max_tokens is None:
+                        break
+            else:
+                response = await self._chat_completion(
+                    task,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    prediction=prediction
+                )
+                generated_text = response.choices[0].message.content.strip()
             logger.info(f"메시지 기반 텍스트 생성 성공 (temp={temperature}): {len(generated_text)} 글자")
             return generated_text
+        except LLMStreamAbortedError as e:
+            logger.warning(f"스트리밍 생성 조기 중단 (temp={temperature}, task={task}): {str(e)}")
+            raise
         except Exception as e:
             logger.error(f"메시지 기반 텍스트 생성 실패 (temp={temperature}): {str(e)}")
             raise LLMAPIError(f"텍스트 생성 실패: {str(e)}")
 
-    async def generate_multiple_messages_per_temperature(
+    async def _stream_in_bulkhead(
         self,
+        model: str,
         messages: List[dict],
-    ) -> List[str]:
-        """
-        각 temperature별로 여러 개의 후보를 메시지 기반으로 생성 (병렬)
+        temperature: float,
+        task: str,
+        abort_predicates: List[AbortPredicate],
+        max_tokens: int,
+        prediction: Optional[str] = None,
+    ) -> Tuple[str, Optional[str]]:
+        """현재 bulkhead 풀에서 용량을 확보한 뒤 스트리밍 생성"""
+        prompt_tokens = token_budgeter.count_message_tokens(messages, model)
+        sent = False
+        try:
+            async with bulkhead.lease(task, prompt_tokens + max_tokens) as lease:
+                sent = True
+                return await self._stream_messages(
+                    model, messages, temperature, task, abort_predicates, max_tokens, prediction, lease
+                )
+        except asyncio.CancelledError:
+            # 전송 후 취소는 _stream_messages에서 집계
+            if not sent:
+                usage_tracker.record_cancelled(task, False, prompt_tokens, max_tokens)
+            raise
+
+    async def _stream_messages(
+        self,
+        model: str,
+        messages: List[dict],
+        temperature: float,
+        task: str,
+        abort_predicates: List[AbortPredicate],
+        max_tokens: int,
+        prediction: Optional[str] = None,
+        lease: Optional[BulkheadLease] = None,
+    ) -> Tuple[str, Optional[str]]:
+        """스트리밍 생성. 누적 출력이 일정 글자 수 늘어날 때마다 abort 조건을 검사한다.
+
+        Returns:
+            (생성 텍스트, finish_reason)
         """
-        tasks = []
-        task_info = []
-        for temp in self.temperatures:
-            for i in range(self.candidates_per_temperature):
-                task = self.generate_messages(messages, temperature=temp)
-                tasks.append(task)
-                task_info.append((temp, i + 1, self.candidates_per_temperature))
-        total_tasks = len(tasks)
-        logger.info(f"총 {total_tasks}개 후보(메시지 기반)를 병렬로 생성 시작...")
+        estimated_tokens = token_budgeter.count_message_tokens(messages, model) + max_tokens
+        stream, slot = await self._create_with_key(
+            task, estimated_tokens, lambda client: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                extra_headers={"X-LLM-Task": task},
+                **_prediction_params(model, prediction),
+            )
+        )
+        parts: List[str] = []
+        length = 0
+        checked_length = 0
+        usage = None
+        finish_reason = None
         try:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            final_results = []
-            for i, (result, (temp, candidate_num, total_per_temp)) in enumerate(zip(results, task_info)):
-                if isinstance(result, Exception):
-                    logger.warning(f"  후보 생성 실패 (temp={temp}, {candidate_num}/{total_per_temp}): {str(result)}")
-                    final_results.append(f"[생성 실패: {str(result)}]")
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                length += len(delta)
+                if length - checked_length >= settings.llm_stream_check_interval_chars:
+                    checked_length = length
+                    reason = first_abort_reason("".join(parts), abort_predicates)
+                    if reason:
+                        raise LLMStreamAbortedError(reason)
+            generated_text = "".join(parts).strip()
+            reason = first_abort_reason(generated_text, abort_predicates)
+            if reason:
+                raise LLMStreamAbortedError(reason)
+        except asyncio.CancelledError:
+            # 요청 취소: 스트림을 닫아 생성을 멈추고, 이미 생성된 부분은 추정치로 기록
+            await stream.close()
+            partial = usage if usage is not None else usage_tracker.record_estimated(task, model, messages, "".join(parts))
+            if usage is not None:
+                usage_tracker.record(task, model, usage, aborted=True)
+            if lease is not None:
+                lease.settle(partial)
+            if slot is not None:
+                key_pool.settle(slot, estimated_tokens, partial)
+            produced = getattr(partial, "completion_tokens", 0) if partial is not None else 0
+            usage_tracker.record_cancelled(task, True, 0, max_tokens - produced)
+            raise
+        except LLMStreamAbortedError:
+            await stream.close()
+            if usage is not None:
+                usage_tracker.record(task, model, usage, aborted=True)
+            else:
+                usage = usage_tracker.record_estimated(task, model, messages, "".join(parts))
+            if lease is not None:
+                lease.settle(usage)
+            if slot is not None:
+                key_pool.settle(slot, estimated_tokens, usage)
+            raise
+        except Exception:
+            # 스트림 도중 오류(연결 끊김 등): 받은 부분만 추정 사용량으로 정산, 받은 것이 없으면 차감분 환급
+            try:
+                await stream.close()
+            except Exception:
+                pass
+            if usage is None and parts:
+                usage = usage_tracker.record_estimated(task, model, messages, "".join(parts))
+            elif usage is not None:
+                usage_tracker.record(task, model, usage, aborted=True)
+            if lease is not None:
+                lease.settle(usage)
+            if slot is not None:
+                if usage is not None:
+                    key_pool.settle(slot, estimated_tokens, usage)
                 else:
-                    logger.info(f"  후보 {i+1}: 생성 완료 (temp={temp}, {candidate_num}/{total_per_temp})")
-                    final_results.append(result)
-            logger.info(f"후보 생성 완료(메시지 기반): 총 {len(final_results)}개 후보")
-            return final_results
-        except Exception as e:
-            logger.error(f"후보 생성 중 예기치 못한 오류: {str(e)}")
-            return []
+                    key_pool.refund(slot, estimated_tokens)
+            raise
+        if lease is not None:
+            lease.settle(usage)
+        if slot is not None:
+            key_pool.settle(slot, estimated_tokens, usage)
+        usage_tracker.record(task, model, usage)
+        return generated_text, finish_reason
+
+    def candidate_plan(self, max_candidates: Optional[int] = None) -> List[Tuple[float, int]]:
+        """
+        후보 생성 계획 [(temperature, temperature 내 번호)] (temperature 순)
+        max_candidates가 주어지면 temperature를 번갈아 가며 그 수만큼만 포함
+        """
+        plan = [(temp, i + 1) for i in range(self.candidates_per_temperature) for temp in self.temperatures]
+        if max_candidates is not None:
+            plan = plan[:max(1, max_candidates)]
+        plan.sort(key=lambda p: (self.temperatures.index(p[0]), p[1]))
+        return plan
 
 
 # 전역 LLM 클라이언트 인스턴스 (통합됨)
@@ -0,0 +1,80 @@
+"""후보 정규화 및 (근사) 중복 제거
+
+낮은 temperature(0.2/0.3)에서는 후보들이 완전히 같거나 공백만 다른 경우가 많고, 생성 실패는
+"[생성 실패: ...]" 문자열로 후보 목록에 섞인다. 분석기/선택 호출은 고유하고 유효한 후보에만 수행한다.
+- 공백 정규화 후 해시가 같으면 중복
+- 문장 수가 같고 단어 shingle MinHash로 추정한 Jaccard 유사도가 settings.syntax_dedup_threshold 이상이면 근사 중복
+  (문장 수가 다르면 평균 문장 길이가 달라지므로 유사해도 별개 후보로 둔다)
+- 생성 실패 자리표시자와 빈 출력은 제외
+"""
+
+import hashlib
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings
+from core.llm.sentence_patch import split_sentences
+
+FAILED_PLACEHOLDER_PREFIX = "[생성 실패"
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize(text: str) -> str:
+    """공백/줄바꿈 정규화 (연속 공백을 하나로, 앞뒤 공백 제거)"""
+    return " ".join(text.split())
+
+
+def is_placeholder(text: Optional[str]) -> bool:
+    """빈 출력 또는 생성 실패 자리표시자"""
+    return not text or not text.strip() or text.lstrip().startswith(FAILED_PLACEHOLDER_PREFIX)
+
+
+class CandidateDeduper:
+    """후보 등록 시 기존 후보와의 (근사) 중복 여부 판정"""
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: Optional[int] = None, shingle_size: Optional[int] = None):
+        self.threshold = settings.syntax_dedup_threshold if threshold is None else threshold
+        self.shingle_size = shingle_size or settings.syntax_dedup_shingle_size
+        rng = random.Random(0)  # 고정 시드: 실행마다 같은 해시 순열
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm or settings.syntax_dedup_num_perm)
+        ]
+        self._hashes: Dict[str, int] = {}  # 정규화 해시 → 후보 키
+        self._entries: List[Tuple[int, int, Tuple[int, ...]]] = []  # (후보 키, 문장 수, MinHash 서명)
+
+    def _signature(self, normalized: str) -> Tuple[int, ...]:
+        tokens = _TOKEN.findall(normalized.lower())
+        k = min(self.shingle_size, len(tokens)) or 1
+        shingles = {" ".join(tokens[i:i + k]) for i in range(max(1, len(tokens) - k + 1))}
+        values = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+        return tuple(
+            min(((a * v + b) % _MERSENNE_PRIME) & _MAX_HASH for v in values)
+            for a, b in self._perms
+        )
+
+    def register(self, key: int, text: str) -> Optional[int]:
+        """
+        후보 등록
+
+        Returns:
+            중복이면 먼저 등록된 후보의 키 (이 후보는 등록하지 않음), 고유하면 None
+        """
+        normalized = normalize(text)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        if digest in self._hashes:
+            return self._hashes[digest]
+        sentence_count = len(split_sentences(normalized)[0])
+        signature = self._signature(normalized)
+        for other_key, other_count, other_signature in self._entries:
+            if other_count != sentence_count:
+                continue
+            similarity = sum(x == y for x, y in zip(signature, other_signature)) / len(signature)
+            if similarity >= self.threshold:
+                return other_key
+        self._hashes[digest] = key
+        self._entries.append((key, sentence_count, signature))
+        return None
@@ -0,0 +1,98 @@
+"""LLM 요청 헤징 (tail latency 완화)
+
+호출이 태스크별 최근 지연 시간의 백분위(settings.llm_hedge_percentile)를 넘기면
+동일 요청을 한 번 더 보내고, 먼저 성공한 쪽을 사용하며 나머지는 취소한다.
+헤지 요청 수는 전체 호출 대비 settings.llm_hedge_max_fraction 이하로 제한한다.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from config.settings import settings
+from utils.logging import logger
+
+
+class HedgePolicy:
+    """태스크별 적응형 지연 임계값 + 헤지 예산 관리"""
+
+    def __init__(self):
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.primary_calls = 0
+        self.hedged_calls = 0
+        self.hedge_wins = 0
+
+    def record_latency(self, task: str, seconds: float) -> None:
+        window = self._latencies.setdefault(task, deque(maxlen=settings.llm_hedge_window))
+        window.append(seconds)
+
+    def threshold(self, task: str) -> Optional[float]:
+        """헤지 발동 지연 임계값(초). 표본이 부족하면 None"""
+        window = self._latencies.get(task)
+        if not window or len(window) < settings.llm_hedge_min_samples:
+            return None
+        ordered = sorted(window)
+        idx = min(len(ordered) - 1, max(0, math.ceil(settings.llm_hedge_percentile * len(ordered)) - 1))
+        return max(settings.llm_hedge_min_delay, ordered[idx])
+
+    def _try_acquire_hedge(self) -> bool:
+        """헤지 예산 확인: hedged_calls가 primary_calls × max_fraction을 넘지 않도록 제한"""
+        if self.hedged_calls + 1 > self.primary_calls * settings.llm_hedge_max_fraction:
+            return False
+        self.hedged_calls += 1
+        return True
+
+    async def run(self, task: str, call_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """call_factory()로 만든 호출을 실행하고, 임계값 초과 시 헤지한다."""
+        self.primary_calls += 1
+        start = time.monotonic()
+        threshold = self.threshold(task) if settings.llm_hedging_enabled else None
+
+        if threshold is None:
+            result = await call_factory()
+            self.record_latency(task, time.monotonic() - start)
+            return result
+
+        primary = asyncio.ensure_future(call_factory())
+        pending = {primary}
+        hedge: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if not done and self._try_acquire_hedge():
+                logger.info(f"LLM 요청 헤징 (task={task}): {threshold:.2f}초 초과")
+                hedge = asyncio.ensure_future(call_factory())
+                pending.add(hedge)
+
+            errors = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    if fut.exception() is not None:
+                        errors.append(fut.exception())
+                        continue
+                    if fut is hedge:
+                        self.hedge_wins += 1
+                    self.record_latency(task, time.monotonic() - start)
+                    return fut.result()
+            raise errors[0]
+        finally:
+            # 진 시도는 취소하고 정리(사용량/용량 정산)가 끝날 때까지 기다린 뒤 반환
+            losers = [fut for fut in (primary, hedge) if fut is not None and not fut.done()]
+            for fut in losers:
+                fut.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.llm_hedging_enabled,
+            "primary_calls": self.primary_calls,
+            "hedged_calls": self.hedged_calls,
+            "hedge_wins": self.hedge_wins,
+            "thresholds": {task: self.threshold(task) for task in self._latencies},
+        }
+
+
+# 전역 헤징 정책 인스턴스
+hedge_policy = HedgePolicy()
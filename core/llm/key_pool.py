@@ -0,0 +1,172 @@
+"""OpenAI API 키/프로젝트 풀
+
+키 하나의 TPM/RPM 한도가 인스턴스 수와 무관하게 전체 처리량의 상한이 되므로, 여러 키(또는
+조직/프로젝트)를 풀로 묶어 호출마다 여유가 가장 큰 키로 보낸다.
+- 키마다 분당 토큰 버킷을 두고, 호출 전 예상 토큰을 차감 → 응답 usage로 정산
+- 429(rate limit)는 Retry-After(없으면 settings.llm_key_rate_limit_cooldown) 동안 휴지
+- 할당량 소진(insufficient_quota)·인증 실패는 settings.llm_key_quota_cooldown 동안 휴지
+- 휴지 중인 키는 선택에서 제외하고, 호출 실패 시 다른 키로 즉시 재시도 (LLMClient)
+- 모든 키가 rate limit 휴지 중이면 가장 먼저 복귀하는 키를 기다림 (settings.llm_key_max_wait 이내)
+
+settings.llm_api_key_pool이 비어 있으면 사용하지 않는다 (OPENAI_API_KEY 단일 키).
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+import openai
+from config.settings import settings
+from utils.logging import logger
+
+HEALTHY = "healthy"
+RATE_LIMITED = "rate_limited"
+EXHAUSTED = "exhausted"
+
+
+class ApiKeySlot:
+    """풀에 속한 키 하나 (클라이언트, 토큰 버킷, 상태)"""
+
+    def __init__(self, config: Dict[str, Any], index: int, single: bool):
+        self.name = str(config.get("name") or f"key{index}")
+        self.tokens_per_minute = float(config.get("tokens_per_minute", 0))  # 0이면 토큰 한도 추적 안 함
+        self.tokens = self.tokens_per_minute
+        self._refilled_at = time.monotonic()
+        self.state = HEALTHY
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.failovers = 0
+        self.rate_limited = 0
+        api_key = config.get("api_key") or (os.getenv(config["api_key_env"]) if config.get("api_key_env") else None)
+        kwargs: Dict[str, Any] = {
+            "api_key": api_key,
+            "base_url": config.get("base_url") or settings.openai_base_url,
+            "organization": config.get("organization"),
+            "project": config.get("project"),
+        }
+        if not single:
+            # 한도 초과 시 SDK 내부 재시도 대신 다른 키로 넘긴다
+            kwargs["max_retries"] = 0
+        self.client = openai.AsyncOpenAI(**kwargs) if api_key else None
+
+    def refill(self) -> None:
+        if self.tokens_per_minute <= 0:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.tokens_per_minute, self.tokens + (now - self._refilled_at) * self.tokens_per_minute / 60)
+        self._refilled_at = now
+
+    def available(self, now: float) -> bool:
+        if self.client is None:
+            return False
+        if self.state != HEALTHY and now >= self.cooldown_until:
+            self.state = HEALTHY
+        return self.state == HEALTHY
+
+    def headroom(self) -> float:
+        """남은 분당 토큰 (한도 미지정 키는 무한대)"""
+        self.refill()
+        return self.tokens if self.tokens_per_minute > 0 else float("inf")
+
+    def stats(self) -> Dict[str, Any]:
+        self.refill()
+        return {
+            "state": self.state,
+            "cooldown_remaining": max(0.0, round(self.cooldown_until - time.monotonic(), 1)) if self.state != HEALTHY else 0.0,
+            "tokens_per_minute": self.tokens_per_minute or None,
+            "available_tokens": round(self.tokens) if self.tokens_per_minute > 0 else None,
+            "calls": self.calls,
+            "rate_limited": self.rate_limited,
+            "failovers": self.failovers,
+        }
+
+
+class ApiKeyPool:
+    """여유 토큰 기준 키 선택 및 상태 관리"""
+
+    def __init__(self):
+        self._slots: Optional[List[ApiKeySlot]] = None
+
+    @property
+    def slots(self) -> List[ApiKeySlot]:
+        if self._slots is None:
+            configs = settings.llm_api_key_pool or []
+            self._slots = [ApiKeySlot(c, i, single=len(configs) == 1) for i, c in enumerate(configs)]
+            missing = [s.name for s in self._slots if s.client is None]
+            if missing:
+                logger.error(f"API 키 풀: 키를 찾을 수 없는 항목 제외 {missing}")
+            if self._slots:
+                logger.info(f"API 키 풀 초기화: {[s.name for s in self._slots]}")
+        return self._slots
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.llm_api_key_pool) and bool(self.slots)
+
+    def select(self, estimated_tokens: int, exclude: Optional[Set[str]] = None) -> Optional[ApiKeySlot]:
+        """정상 상태 키 중 여유 토큰이 가장 큰 키를 골라 예상 토큰을 차감 (같으면 호출 수가 적은 키)"""
+        now = time.monotonic()
+        candidates = [s for s in self.slots if s.available(now) and s.name not in (exclude or set())]
+        if not candidates:
+            return None
+        slot = max(candidates, key=lambda s: (s.headroom(), -s.calls))
+        slot.calls += 1
+        if slot.tokens_per_minute > 0:
+            slot.tokens -= estimated_tokens
+        return slot
+
+    def next_recovery_in(self) -> Optional[float]:
+        """rate limit으로 휴지 중인 키가 가장 빨리 복귀하기까지 남은 시간 (초, 없으면 None)"""
+        now = time.monotonic()
+        waits = [s.cooldown_until - now for s in self.slots if s.client is not None and s.state == RATE_LIMITED]
+        return max(0.0, min(waits)) if waits else None
+
+    def settle(self, slot: ApiKeySlot, estimated_tokens: int, usage: Any) -> None:
+        """실제 사용 토큰으로 버킷 정산"""
+        total = getattr(usage, "total_tokens", None) if usage is not None else None
+        if slot.tokens_per_minute > 0 and total is not None:
+            slot.tokens = min(slot.tokens_per_minute, slot.tokens + estimated_tokens - int(total))
+
+    def refund(self, slot: ApiKeySlot, estimated_tokens: int) -> None:
+        """실패한 호출의 차감분 환급 (사용 토큰 0으로 정산)"""
+        if slot.tokens_per_minute > 0:
+            slot.tokens = min(slot.tokens_per_minute, slot.tokens + estimated_tokens)
+
+    def report_error(self, slot: ApiKeySlot, error: Exception) -> bool:
+        """
+        호출 오류를 키 상태에 반영
+
+        Returns:
+            다른 키로 재시도할 만한 오류(한도 초과, 할당량 소진, 인증 실패)인지
+        """
+        now = time.monotonic()
+        if isinstance(error, openai.RateLimitError):
+            if getattr(error, "code", None) == "insufficient_quota":
+                slot.state, slot.cooldown_until = EXHAUSTED, now + settings.llm_key_quota_cooldown
+                logger.error(f"API 키 할당량 소진: {slot.name} ({settings.llm_key_quota_cooldown:.0f}초 제외)")
+            else:
+                slot.rate_limited += 1
+                cooldown = settings.llm_key_rate_limit_cooldown
+                try:
+                    cooldown = float(error.response.headers.get("retry-after") or cooldown)
+                except Exception:
+                    pass
+                slot.state, slot.cooldown_until = RATE_LIMITED, now + cooldown
+                logger.warning(f"API 키 rate limit: {slot.name} ({cooldown:.1f}초 제외)")
+            slot.failovers += 1
+            return True
+        if isinstance(error, (openai.AuthenticationError, openai.PermissionDeniedError)):
+            slot.state, slot.cooldown_until = EXHAUSTED, now + settings.llm_key_quota_cooldown
+            slot.failovers += 1
+            logger.error(f"API 키 인증 실패: {slot.name} ({settings.llm_key_quota_cooldown:.0f}초 제외)")
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "keys": {s.name: s.stats() for s in self.slots},
+        }
+
+
+# 전역 API 키 풀 인스턴스
+key_pool = ApiKeyPool()
@@ -3,6 +3,10 @@ import asyncio
 import math
 from typing import List, Tuple, Dict, Any, Optional
 from core.llm.client import llm_client
+from core.llm.request_budget import RequestBudget
+from core.llm.token_budget import token_budgeter
+from core.llm.tasks import TASK_LEXICAL
+from core.llm.stream_guards import json_prefix_guard, repetition_guard
 from core.llm.prompt_builder import prompt_builder
 from core.analyzer import analyzer
 from core.metrics import metrics_extractor
@@ -12,6 +16,7 @@ from config.lexical_revision_prompt import Lexical_USER_INPUT_TEMPLATE, LEXICAL_
 from models.request import MasterMetrics, ToleranceRatio
 from models.internal import LLMCandidate, LLMResponse
 from utils.exceptions import LLMAPIError
+from utils.helpers import gather_in_task_group
 from utils.logging import logger
 
 
@@ -32,6 +37,7 @@ class LexicalFixer:
         nvjd_total_lemma_count: Optional[int] = None,
         nvjd_a1a2_lemma_count: Optional[int] = None,
         cefr_breakdown: Optional[Dict[str, Any]] = None,
+        budget: Optional[RequestBudget] = None,
     ) -> Tuple[List[Dict], str, Dict, Any, int]:
         """
         어휘 수정을 수행합니다.
@@ -42,6 +48,7 @@ class LexicalFixer:
             tolerance_ratio: 비율 허용 오차
             current_cefr_ratio: 현재 CEFR A1A2 비율
             direction: "increase" (쉽게) 또는 "decrease" (어렵게)
+            budget: 요청 단위 예산 (부족하면 후보 수 축소)
             
         Returns:
             (후보 수정사항 리스트, 선택된 텍스트, 최종 지표, 최종 평가, 생성된 후보 수) 튜플
@@ -97,7 +104,16 @@ class LexicalFixer:
             logger.info("=" * 80)
             
             # LLM 호출 (temperature 0.2로 3개 후보 생성)
-            llm_candidates = await self._generate_lexical_candidates(prompt)
+            count = self.candidates_per_request
+            if budget is not None:
+                # 후보 1개 예상 토큰: 프롬프트 + 출력 예산 (문장별 원문 + 수정 내역 JSON)
+                count = budget.affordable_calls(
+                    TASK_LEXICAL, token_budgeter.count_message_tokens(prompt),
+                    token_budgeter.output_budget(TASK_LEXICAL, text), self.candidates_per_request, minimum=1,
+                )
+                if count < self.candidates_per_request:
+                    budget.degrade("lexical", "fewer_candidates", f"어휘 후보 {self.candidates_per_request}개 → {count}개")
+            llm_candidates = await self._generate_lexical_candidates(prompt, text, count)
             
             logger.info(f"LLM으로 {len(llm_candidates)}개 후보 생성 완료")
             
@@ -313,18 +329,27 @@ class LexicalFixer:
         # st_id 기준 정렬
         return sorted(merged_by_st.values(), key=lambda r: r["st_id"])
     
-    async def _generate_lexical_candidates(self, prompt: List[Dict[str, str]]) -> List[str]:
-        """어휘 수정 후보 생성 (병렬 처리)"""
+    async def _generate_lexical_candidates(self, prompt: List[Dict[str, str]], text: Optional[str] = None, count: Optional[int] = None) -> List[str]:
+        """어휘 수정 후보 생성 (병렬 처리, text는 출력 토큰 예산 산정 기준, count는 생성 수 (기본 candidates_per_request))"""
+        count = count or self.candidates_per_request
         # 병렬로 모든 후보 생성 태스크 생성
+        # 스트리밍 시 sheet_data JSON 형식이 깨지는 후보는 조기 중단
+        abort_predicates = [
+            json_prefix_guard(settings.lexical_stream_max_preamble_chars),
+            repetition_guard(),
+        ]
         tasks = [
-            llm_client.generate_messages(prompt, temperature=self.temperature)
-            for _ in range(self.candidates_per_request)
+            llm_client.generate_messages(
+                prompt, temperature=self.temperature, task=TASK_LEXICAL,
+                abort_predicates=abort_predicates, budget_reference=text,
+            )
+            for _ in range(count)
         ]
 
-        logger.debug(f"어휘 후보 {self.candidates_per_request}개를 병렬로 생성 시작...")
+        logger.debug(f"어휘 후보 {count}개를 병렬로 생성 시작...")
 
         # 병렬 실행 (예외 처리 포함)
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await gather_in_task_group(*tasks, return_exceptions=True)
 
         # 결과 처리
         candidates = []
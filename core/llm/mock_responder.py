@@ -0,0 +1,365 @@
+"""결정적(deterministic) 모의 LLM 응답기
+
+실제 API 비용 없이 /revise, /batch-revise 처리량을 벤치마크하기 위한 태스크별 모의 응답 생성기.
+같은 입력(메시지, temperature, 시드)의 k번째 요청에는 항상 같은 응답을 돌려주며, 각 태스크의 파서가
+그대로 받아들일 수 있는 형식(스키마)을 지킨다. 같은 입력을 반복 요청하면(같은 temperature의 후보 여러 개)
+요청 순번이 시드에 포함되어 서로 다른 응답이 나온다. (순번은 최근 입력 max_tracked개까지만 기억, reset()으로 초기화)
+
+- syntax_generate: 문장 병합(증가) / 분리(감소)로 만든 수정 지문
+- syntax_patch: 같은 수정을 번호 붙인 문장에 대한 JSON 문장 패치로 출력
+- lexical: revision_summary + sheet_data JSON
+- profile / profile_subtopic2: 의미 프로필 JSON / subtopic_2 이름
+- closeness: scoring JSON (루브릭 점수 범위 준수)
+- select: 후보 번호 숫자
+
+scripts/mock_llm_server.py(OpenAI 호환 서버)와 LocalBatchBackend가 사용한다.
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from core.llm.tasks import (
+    TASK_CLOSENESS,
+    TASK_DEFAULT,
+    TASK_LEXICAL,
+    TASK_PROFILE,
+    TASK_PROFILE_SUBTOPIC2,
+    TASK_SELECT,
+    TASK_SYNTAX_GENERATE,
+    TASK_SYNTAX_PATCH,
+)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[A-Za-z]+")
+_NUMBERED_SENTENCE = re.compile(r"^\[(\d+)\]\s*(.+)$", flags=re.MULTILINE)
+
+# 문장 병합 시 사용하는 접속 표현 (증가 방향)
+_MERGE_CONNECTORS = [", and ", ", because ", ", while ", ", which means that "]
+# 문장 분리 기준 → 분리 후 두 번째 문장 앞에 붙일 표현 (감소 방향)
+_SPLIT_CONNECTORS = [
+    (", which ", "It "),
+    (", because ", "This is because "),
+    (", and ", ""),
+    (", but ", "But "),
+    (", so ", "So "),
+    ("; ", ""),
+    (" that ", ""),
+]
+
+# 어휘 치환 쌍 (쉬운 단어 ↔ 어려운 단어)
+_WORD_PAIRS = [
+    ("big", "enormous"), ("small", "minuscule"), ("help", "assist"), ("use", "utilize"),
+    ("show", "demonstrate"), ("start", "commence"), ("end", "conclude"), ("get", "obtain"),
+    ("need", "require"), ("make", "construct"), ("buy", "purchase"), ("try", "attempt"),
+    ("fast", "rapid"), ("hard", "arduous"), ("important", "significant"), ("enough", "sufficient"),
+    ("find", "discover"), ("keep", "maintain"), ("about", "approximately"), ("tell", "inform"),
+]
+_SIMPLE_FALLBACK = ["good", "big", "use", "help", "make", "part", "way", "thing"]
+_ADVANCED_FALLBACK = ["remarkable", "considerable", "essential", "substantial", "notable", "particular"]
+_STOPWORDS = {
+    "about", "after", "again", "also", "because", "before", "being", "could", "every", "first",
+    "from", "have", "into", "many", "more", "most", "other", "over", "some", "such", "than",
+    "that", "their", "them", "then", "there", "these", "they", "this", "those", "very", "were",
+    "what", "when", "where", "which", "while", "with", "would", "your",
+}
+
+# closeness 루브릭 항목별 점수 범위 (config/labeling_prompt.py)
+_CLOSENESS_RANGES = {
+    "discipline_match": (0, 2),
+    "subtopic_match": (0, 2),
+    "central_focus_match": (0, 3),
+    "key_concept_overlap": (0, 3),
+    "process_parallel": (0, 2),
+    "setting_alignment": (0, 1),
+    "purpose_alignment": (0, 1),
+    "genre_alignment": (0, 1),
+}
+
+
+def _message_text(messages: List[Dict[str, Any]], role: Optional[str] = None) -> str:
+    return "\n".join(
+        str(m.get("content", "")) for m in messages if role is None or m.get("role") == role
+    )
+
+
+def _section(text: str, start: str, end: Optional[str] = None) -> str:
+    """start 마커와 end 마커 사이 텍스트 (end가 없으면 끝까지)"""
+    idx = text.find(start)
+    if idx == -1:
+        return ""
+    body = text[idx + len(start):]
+    if end:
+        end_idx = body.find(end)
+        if end_idx != -1:
+            body = body[:end_idx]
+    return body.strip()
+
+
+def _split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text.strip()) if s.strip()]
+
+
+def _lower_first(sentence: str) -> str:
+    if len(sentence) > 1 and sentence[0].isupper() and not sentence[1].isupper() and not sentence.startswith("I "):
+        return sentence[0].lower() + sentence[1:]
+    return sentence
+
+
+def _upper_first(sentence: str) -> str:
+    return sentence[:1].upper() + sentence[1:]
+
+
+def detect_task(body: Dict[str, Any]) -> str:
+    """요청 본문(chat.completions 파라미터)에서 태스크를 추정"""
+    response_format = body.get("response_format") or {}
+    schema_name = (response_format.get("json_schema") or {}).get("name") if isinstance(response_format, dict) else None
+    if schema_name == "semantic_profile":
+        return TASK_PROFILE
+    if schema_name == "closeness_scoring":
+        return TASK_CLOSENESS
+
+    messages = body.get("messages") or []
+    text = _message_text(messages)
+    if "selecting the single best revised text" in text:
+        return TASK_SELECT
+    if "sheet_data" in text and "Original Text (for context)" in text:
+        return TASK_LEXICAL
+    if "1. The text to be edited" in text:
+        return TASK_SYNTAX_GENERATE
+    if "<ar_category_data>" in text:
+        return TASK_PROFILE_SUBTOPIC2
+    if "<original_semantic_profile>" in text:
+        return TASK_CLOSENESS
+    if "<semantic_profile>" in text and "<passage>" in text:
+        return TASK_PROFILE
+    return TASK_DEFAULT
+
+
+class MockResponder:
+    """태스크별 결정적 모의 응답 생성기"""
+
+    def __init__(self, seed: int = 0, max_tracked: int = 10000):
+        self.seed = seed
+        self.max_tracked = max_tracked
+        # 입력별 요청 횟수 (같은 입력 반복 요청 구분용, 오래 쓰지 않은 입력부터 제거하는 LRU)
+        self._repeats: "OrderedDict[str, int]" = OrderedDict()
+
+    @property
+    def tracked_inputs(self) -> int:
+        return len(self._repeats)
+
+    def reset(self) -> None:
+        """입력별 요청 횟수 초기화 (이후 응답은 처음 실행할 때와 같은 순서로 재현됨)"""
+        self._repeats.clear()
+
+    def _rng(self, *parts: Any) -> random.Random:
+        digest = hashlib.sha256("|".join(str(p) for p in (self.seed, *parts)).encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def respond(self, body: Dict[str, Any], task: Optional[str] = None, index: int = 0) -> Tuple[str, str]:
+        """(태스크, 응답 텍스트) 반환. index는 같은 요청의 n개 선택지 구분용
+
+        task가 없거나 전용 응답기가 없는 태스크(TASK_DEFAULT 등)면 요청 내용으로 태스크를 추정한다.
+        """
+        handlers = {
+            TASK_SYNTAX_GENERATE: self._syntax,
+            TASK_SYNTAX_PATCH: self._syntax,
+            TASK_LEXICAL: self._lexical,
+            TASK_SELECT: self._select,
+            TASK_PROFILE: self._profile,
+            TASK_PROFILE_SUBTOPIC2: self._subtopic2,
+            TASK_CLOSENESS: self._closeness,
+        }
+        if task not in handlers:
+            task = detect_task(body)
+        messages = body.get("messages") or []
+        key = hashlib.sha256(
+            "|".join(str(p) for p in (task, body.get("temperature"), index, json.dumps(messages, ensure_ascii=False, sort_keys=True))).encode("utf-8")
+        ).hexdigest()
+        repeat = self._repeats.pop(key, 0)
+        self._repeats[key] = repeat + 1
+        if len(self._repeats) > self.max_tracked:
+            self._repeats.popitem(last=False)
+        rng = self._rng(key, repeat)
+        return task, handlers.get(task, self._echo)(messages, rng)
+
+    def logprobs(self, body: Dict[str, Any], task: str, content: str) -> Dict[str, Any]:
+        """choices[].logprobs (첫 토큰만). 선택 태스크는 후보 번호별 확률 분포를 만들어 content의 번호가 1위가 되게 한다"""
+        top_n = int(body.get("top_logprobs") or 1)
+        alternatives = [(content, 1.0)]
+        if task == TASK_SELECT and content.isdigit():
+            numbers = [int(n) for n in re.findall(r"^candidate_(\d+):", _message_text(body.get("messages") or []), flags=re.MULTILINE)]
+            rng = self._rng("logprobs", content, len(numbers))
+            weights = {str(n): rng.uniform(0.05, 1.0) for n in numbers if str(n) != content}
+            weights[content] = max(weights.values(), default=0.0) + rng.uniform(0.0, 1.0)
+            total = sum(weights.values())
+            alternatives = sorted(((t, w / total) for t, w in weights.items()), key=lambda x: -x[1])
+        top = [{"token": t, "logprob": math.log(p), "bytes": list(t.encode("utf-8"))} for t, p in alternatives[:top_n]]
+        return {"content": [{**top[0], "top_logprobs": top}]}
+
+    def __call__(self, body: Dict[str, Any]) -> str:
+        """LocalBatchBackend responder 인터페이스"""
+        return self.respond(body)[1]
+
+    def _echo(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                return str(message.get("content", ""))
+        return ""
+
+    def _syntax(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        """문장 병합(평균 문장 길이/절 비율 증가) 또는 분리(감소)로 수정 지문 생성
+
+        시스템 프롬프트가 문장 패치 출력(sentence_ids)을 요구하고 지문이 번호 붙인 문장이면 JSON 패치로 응답한다.
+        """
+        user = _message_text(messages, "user")
+        system = _message_text(messages, "system")
+        # 템플릿 컴파일 여부(**강조** 유무)와 무관하게 지문 구간 추출
+        passage = _section(user, "1. The text to be edited", "2. The problematic metric").strip("*").strip()
+        numbered = _NUMBERED_SENTENCE.findall(passage) if "sentence_ids" in system else []
+        sentences = [s.strip() for _, s in numbered] if numbered else _split_sentences(passage)
+        if not sentences:
+            return passage
+        match = re.search(r"Number of Modifications:\s*(\d+)", user)
+        count = max(1, int(match.group(1))) if match else 1
+        increase = "enhances a text's" in system
+
+        # (원문 문장 인덱스 목록, 수정 결과 문장) - 수정되지 않은 문장은 결과 그대로
+        edits: List[Tuple[List[int], str]] = []
+        if increase:
+            pair_starts = list(range(0, len(sentences) - 1, 2))
+            if numbered:
+                # 발췌 입력: 번호가 이어지는 문장끼리만 병합
+                pair_starts = [i for i in pair_starts if int(numbered[i + 1][0]) == int(numbered[i][0]) + 1]
+            chosen = set(rng.sample(pair_starts, min(count, len(pair_starts))))
+            i = 0
+            while i < len(sentences):
+                if i in chosen:
+                    first = sentences[i].rstrip(".!?")
+                    edits.append(([i, i + 1], first + rng.choice(_MERGE_CONNECTORS) + _lower_first(sentences[i + 1])))
+                    i += 2
+                else:
+                    edits.append(([i], sentences[i]))
+                    i += 1
+            return self._syntax_output(edits, sentences, numbered)
+
+        splittable = [
+            i for i, s in enumerate(sentences)
+            if any(conn in s for conn, _ in _SPLIT_CONNECTORS)
+        ]
+        chosen = set(rng.sample(splittable, min(count, len(splittable))))
+        for i, sentence in enumerate(sentences):
+            if i not in chosen:
+                edits.append(([i], sentence))
+                continue
+            for conn, prefix in _SPLIT_CONNECTORS:
+                if conn in sentence:
+                    head, tail = sentence.split(conn, 1)
+                    tail = _upper_first(prefix + tail) if prefix else _upper_first(tail)
+                    edits.append(([i], head.rstrip(",;") + ". " + tail))
+                    break
+        return self._syntax_output(edits, sentences, numbered)
+
+    @staticmethod
+    def _syntax_output(edits: List[Tuple[List[int], str]], sentences: List[str], numbered: List[Tuple[str, str]]) -> str:
+        """수정 결과를 지문 전체 또는 JSON 문장 패치(번호 붙인 입력일 때)로 직렬화"""
+        if not numbered:
+            return " ".join(result for _, result in edits)
+        patches = [
+            {"sentence_ids": [int(numbered[i][0]) for i in ids], "replacement": result}
+            for ids, result in edits
+            if len(ids) > 1 or result != sentences[ids[0]]
+        ]
+        return json.dumps({"patches": patches}, ensure_ascii=False)
+
+    def _lexical(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        """문장별 단어 치환 내역을 sheet_data JSON으로 생성"""
+        user = _message_text(messages, "user")
+        system = _message_text(messages, "system")
+        simplify = "Simplify vocabulary" in system
+
+        sentences: List[str] = []
+        try:
+            rows = json.loads(_section(user, "## Sentences (JSON format):", "## Current Metrics"))
+            sentences = [str(r.get("text", "")) for r in rows if isinstance(r, dict)]
+        except Exception:
+            sentences = _split_sentences(_section(user, "## 1. Original Text (for context)", "## 2."))
+
+        match = re.search(r"(\d+)\s+word\(s\)", user)
+        count = max(1, int(match.group(1))) if match else 1
+        pairs = {easy: hard for easy, hard in _WORD_PAIRS} if not simplify else {hard: easy for easy, hard in _WORD_PAIRS}
+        fallback = _SIMPLE_FALLBACK if simplify else _ADVANCED_FALLBACK
+
+        targets = rng.sample(range(len(sentences)), min(count, len(sentences))) if sentences else []
+        sheet_data = []
+        modified = 0
+        for idx, sentence in enumerate(sentences):
+            corrections = []
+            if idx in targets:
+                words = [w for w in _WORD.findall(sentence) if len(w) >= 3 and w.lower() not in _STOPWORDS]
+                known = [w for w in words if w.lower() in pairs]
+                if known or words:
+                    word = rng.choice(known) if known else max(words, key=len)
+                    replacement = pairs.get(word.lower()) or rng.choice(fallback)
+                    if word[0].isupper():
+                        replacement = _upper_first(replacement)
+                    alternatives = rng.sample([w for w in fallback if w != replacement.lower()], 2)
+                    corrections.append({
+                        "original_clause": word,
+                        "revised_clause": replacement,
+                        "is_ok": True,
+                        "alternatives": alternatives,
+                    })
+                    modified += 1
+            sheet_data.append({"st_id": idx + 1, "original_sentence": sentence, "corrections": corrections})
+
+        summary = f"{modified} word(s) were {'simplified' if simplify else 'replaced with more advanced vocabulary'}."
+        return json.dumps({"revision_summary": summary, "sheet_data": sheet_data}, ensure_ascii=False)
+
+    def _select(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        text = _message_text(messages)
+        numbers = [int(n) for n in re.findall(r"^candidate_(\d+):", text, flags=re.MULTILINE)]
+        return str(rng.randint(1, max(numbers))) if numbers else "1"
+
+    def _profile(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        """프롬프트에 나열된 선택지에서 고른 의미 프로필 JSON (같은 지문이면 같은 결과)"""
+        text = _message_text(messages)
+        passage = _section(text, "**<passage>:**", "---")
+        rng = self._rng(TASK_PROFILE, passage)
+        disciplines = re.findall(r"^[a-f]\. ([^(\n]+?) \(", text, flags=re.MULTILINE)
+        subtopic_line = _section(text, "**2) subtopic_1:**").split("\n")[1:2]
+        subtopics = [s.strip() for s in subtopic_line[0].split(",")] if subtopic_line else []
+
+        words = [w.lower() for w in _WORD.findall(passage) if len(w) >= 5 and w.lower() not in _STOPWORDS]
+        key_concepts = [w for w, _ in Counter(words).most_common(5)]
+        sentences = _split_sentences(passage)
+        return json.dumps({
+            "discipline": rng.choice(disciplines) if disciplines else "People, Society & Culture",
+            "subtopic_1": rng.choice(subtopics) if subtopics else "People",
+            "central_focus": [sentences[0][:120]] if sentences else [],
+            "key_concepts": key_concepts,
+            "processes_structures": f"Describes how {key_concepts[0] if key_concepts else 'the topic'} develops.",
+            "setting_context": "General, real-world context.",
+            "purpose_objective": "To inform the reader.",
+            "genre_form": "Informational text",
+        }, ensure_ascii=False)
+
+    def _subtopic2(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        text = _message_text(messages)
+        line = _section(text, "**<ar_category_data>:**", "\n\n")
+        title, _, items = line.partition(":")
+        options = [s.strip() for s in items.split(",") if s.strip()]
+        return rng.choice(options) if options else title.strip()
+
+    def _closeness(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        scoring = {name: rng.randint(max(lo, hi - 1), hi) for name, (lo, hi) in _CLOSENESS_RANGES.items()}
+        scoring["penalties"] = rng.choice([0, 0, 0, -1])
+        return json.dumps({"scoring": scoring})
+
+
+# 전역 모의 응답기 인스턴스
+mock_responder = MockResponder()
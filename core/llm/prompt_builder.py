@@ -2,12 +2,18 @@
 
 import math
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from models.request import MasterMetrics, ToleranceAbs, ToleranceRatio
-from config.syntax_revision_prompt import SYNTAX_USER_INPUT_TEMPLATE, SYNTAX_PROMPT_DECREASE, SYNTAX_PROMPT_INCREASE, CANDIDATE_SELECTION_PROMPT
+from config.syntax_revision_prompt import SYNTAX_USER_INPUT_TEMPLATE, SYNTAX_PROMPT_DECREASE, SYNTAX_PROMPT_INCREASE, SYNTAX_PATCH_OUTPUT, SYNTAX_JOINT_MISSION, SYNTAX_FOCUS_NOTE, CANDIDATE_SELECTION_PROMPT
 from config.lexical_revision_prompt import Lexical_USER_INPUT_TEMPLATE, LEXICAL_FIXING_PROMPT_DECREASE, LEXICAL_FIXING_PROMPT_INCREASE
+from core.llm.prompt_compiler import prompt_compiler
+from core.llm.sentence_focus import SentenceFocus
+from core.llm.sentence_patch import number_sentences
 from utils.logging import logger
 
+# 평균 문장 길이와 내포절 비율을 함께 수정하는 복합 계획의 지표명
+JOINT_METRIC = "avg_sentence_length+all_embedded_clauses_ratio"
+
 class PromptBuilder:
     """LLM 프롬프트 구성 클래스"""
     
@@ -57,30 +63,49 @@ class PromptBuilder:
         problematic_metric: str,
         num_modifications: int,
         referential_clauses: str = "",
-        prompt_type: str = "increase"
+        prompt_type: str = "increase",
+        output_format: str = "passage",
+        joint_mission: Optional[str] = None,
+        focus: Optional[SentenceFocus] = None
     ) -> List[Dict[str, str]]:
         """
         구문 수정용 prompt (시스템+유저) 구성
+        output_format="patch"면 지문을 번호 붙인 문장으로 넣고 출력 지시를 문장 패치(JSON)로 바꾼다
+        joint_mission(plan_joint_modifications 결과)이 있으면 # Output 절 앞에 복합 미션을 넣는다
+        focus(sentence_focus.build_focus 결과)가 있으면 지문 대신 발췌를 넣는다 (출력은 항상 문장 패치)
         """
         try:
             # 시스템 프롬프트 선택
             if prompt_type == "increase":
-                system_prompt = SYNTAX_PROMPT_INCREASE
-            elif prompt_type == "decrease":
-                system_prompt = SYNTAX_PROMPT_DECREASE
+                system_prompt = prompt_compiler.compile("SYNTAX_PROMPT_INCREASE", SYNTAX_PROMPT_INCREASE)
             else:
-                system_prompt = SYNTAX_PROMPT_DECREASE
+                system_prompt = prompt_compiler.compile("SYNTAX_PROMPT_DECREASE", SYNTAX_PROMPT_DECREASE)
+            if output_format == "patch" or focus is not None:
+                system_prompt = system_prompt.rpartition("# Output")[0].rstrip() + "\n\n" + prompt_compiler.compile("SYNTAX_PATCH_OUTPUT", SYNTAX_PATCH_OUTPUT)
+                text = focus.excerpt if focus is not None else number_sentences(text)
+            sections = []
+            if focus is not None:
+                sections.append(
+                    prompt_compiler.compile("SYNTAX_FOCUS_NOTE", SYNTAX_FOCUS_NOTE)
+                    .replace("{var_total_sentences}", str(focus.total_sentences))
+                    .replace("{var_target_ids}", ", ".join(str(i) for i in focus.targets))
+                )
+            if joint_mission:
+                sections.append(joint_mission)
+            if sections:
+                head, _, output_section = system_prompt.rpartition("# Output")
+                system_prompt = head.rstrip() + "\n\n" + "\n\n".join(x.strip() for x in sections) + "\n\n# Output" + output_section
 
             # 메시지 변수 준비 - 각 지표별로 개별 표시
             avg_current = current_metrics.get('avg_sentence_length', 0)
             clause_current = current_metrics.get('all_embedded_clauses_ratio', 0)
             
-            current_and_target_values = f"""
-            - average sentence length
-            current value: {avg_current:.3f} target range: [{avg_target_min:.3f} ~ {avg_target_max:.3f}]
-            - embedded clause ratio
-            current value: {clause_current:.3f} target range: [{clause_target_min:.3f} ~ {clause_target_max:.3f}]
-            """
+            current_and_target_values = (
+                f"- average sentence length\n"
+                f"current value: {avg_current:.3f} target range: [{avg_target_min:.3f} ~ {avg_target_max:.3f}]\n"
+                f"- embedded clause ratio\n"
+                f"current value: {clause_current:.3f} target range: [{clause_target_min:.3f} ~ {clause_target_max:.3f}]"
+            )
 
             user_vars = {
                 'var_Generated_Passage': text,
@@ -90,7 +115,7 @@ class PromptBuilder:
                 'var_current_values': current_and_target_values
             }
 
-            user_prompt = SYNTAX_USER_INPUT_TEMPLATE
+            user_prompt = prompt_compiler.compile("SYNTAX_USER_INPUT_TEMPLATE", SYNTAX_USER_INPUT_TEMPLATE)
             for var_name, var_value in user_vars.items():
                 user_prompt = user_prompt.replace(f"{{{var_name}}}", str(var_value))
             
@@ -267,6 +292,90 @@ Do not include any explanation, JSON, or additional text. Just the number betwee
             logger.error(f"문제 지표 결정 실패: {str(e)}")
             return None
     
+    def plan_joint_modifications(
+        self,
+        avg_current: float,
+        clause_current: float,
+        avg_target_min: float,
+        avg_target_max: float,
+        clause_target_min: float,
+        clause_target_max: float,
+        analysis_result: Dict[str, Any],
+        counts: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        평균 문장 길이와 내포절 비율이 모두 범위 밖일 때 두 지표를 한 번에 고치는 복합 수정 계획
+        
+        지표별 수정 수(calculate_modification_count)를 방향 조합에 맞는 하나의 방법으로 묶는다.
+        counts(길이 수정 수, 내포절 수정 수)가 주어지면 계산 대신 그 수를 사용한다 (청크별 배분 결과).
+        - 둘 다 증가: 인접 문장 k쌍을 종속절/관계절로 병합 (k = 두 수정 수 중 큰 값)
+        - 둘 다 감소: 복문 k개를 단문 두 개로 분리
+        - 방향이 다르면 길이 수정은 구(phrase)로만 하고 절 수정은 다른 문장에서 (수정 수 합)
+        
+        Returns:
+            {'problematic_metric', 'num_modifications', 'prompt_type', 'joint_mission', 'length', 'clause'}
+        """
+        length = self.calculate_modification_count(
+            "avg_sentence_length", avg_current, avg_target_min, avg_target_max, analysis_result
+        )
+        clause = self.calculate_modification_count(
+            "all_embedded_clauses_ratio", clause_current, clause_target_min, clause_target_max, analysis_result
+        )
+        l = max(1, abs(int(length['num_modifications'])))
+        c = max(1, abs(int(clause['num_modifications'])))
+        if counts is not None:
+            l, c = counts
+        length_up = length['prompt_type'] == "increase"
+        clause_up = clause['prompt_type'] == "increase"
+        
+        length_action = (
+            f"current {avg_current:.3f}, target [{avg_target_min:.3f} ~ {avg_target_max:.3f}] → "
+            + (f"INCREASE (about {l} fewer sentences)" if length_up else f"DECREASE (about {l} more sentences)")
+        )
+        clause_action = (
+            f"current {clause_current:.3f}, target [{clause_target_min:.3f} ~ {clause_target_max:.3f}] → "
+            + (f"INCREASE (about {c} more sentences with an embedded clause)" if clause_up
+               else f"DECREASE (about {c} fewer sentences with an embedded clause)")
+        )
+        if length_up and clause_up:
+            num_modifications = max(l, c)
+            plan = (f"Merge {num_modifications} pairs of adjacent sentences into single sentences joined by a subordinate "
+                    f"or relative clause (e.g., because, although, when, which, who). Each merge both lengthens the "
+                    f"average sentence and adds a sentence with an embedded clause.")
+        elif not length_up and not clause_up:
+            num_modifications = max(l, c)
+            plan = (f"Split {num_modifications} long complex sentences into two simple sentences, removing the "
+                    f"subordinate, relative or coordinate clause at the split. Each split both shortens the average "
+                    f"sentence and removes a sentence with an embedded clause.")
+        elif length_up:
+            num_modifications = l + c
+            plan = (f"Merge {l} pairs of adjacent short sentences using phrases only (participial or prepositional "
+                    f"phrases, appositives), never clauses, and reduce the clause in {c} other sentence(s) to a phrase.")
+        else:
+            num_modifications = l + c
+            plan = (f"Split {l} long sentences into two shorter sentences at phrase boundaries without adding clauses, "
+                    f"and rewrite {c} other simple sentence(s) to contain a subordinate or relative clause.")
+        
+        joint_mission = prompt_compiler.compile("SYNTAX_JOINT_MISSION", SYNTAX_JOINT_MISSION)
+        for var_name, var_value in (
+            ('var_length_action', length_action),
+            ('var_clause_action', clause_action),
+            ('var_joint_plan', plan),
+        ):
+            joint_mission = joint_mission.replace(f"{{{var_name}}}", var_value)
+        
+        # 시스템 프롬프트는 우선순위 지표(내포절 비율)의 방향을 따른다
+        result = {
+            'problematic_metric': JOINT_METRIC,
+            'num_modifications': num_modifications,
+            'prompt_type': clause['prompt_type'],
+            'joint_mission': joint_mission,
+            'length': {'num_modifications': l, 'prompt_type': length['prompt_type']},
+            'clause': {'num_modifications': c, 'prompt_type': clause['prompt_type']},
+        }
+        logger.info(f"🔀 복합 수정 계획: 길이 {length['prompt_type']} {l}, 내포절 {clause['prompt_type']} {c} → 수정수 {num_modifications}")
+        return result
+
     def calculate_modification_count(
         self,
         # text: str,
@@ -439,14 +548,17 @@ Do not include any explanation, JSON, or additional text. Just the number betwee
         cefr_breakdown: Optional[Dict[str, Any]] = None
     ) -> list:
         """어휘 수정 프롬프트 구성 (Lexical_USER_INPUT_TEMPLATE 사용)"""
-        system_prompt = LEXICAL_FIXING_PROMPT_INCREASE if direction == "increase" else LEXICAL_FIXING_PROMPT_DECREASE
+        if direction == "increase":
+            system_prompt = prompt_compiler.compile("LEXICAL_FIXING_PROMPT_INCREASE", LEXICAL_FIXING_PROMPT_INCREASE)
+        else:
+            system_prompt = prompt_compiler.compile("LEXICAL_FIXING_PROMPT_DECREASE", LEXICAL_FIXING_PROMPT_DECREASE)
         formatted_text_json = self._format_lexical_text_with_metrics(text, current_cefr_ratio, target_min, target_max)
         processed_profile = self._generate_vocab_profile(cefr_breakdown or {}, direction)
         # A1/A2 NVJD 비율이 높으면 decrease, 목표 레벨은 B1/B2
         # A1/A2 NVJD 비율이 낮으면 increase, 목표 레벨은 A1/A2
         target_level = "B1/B2" if direction == "increase" else "A1/A2"
 
-        user_prompt = Lexical_USER_INPUT_TEMPLATE.format(
+        user_prompt = prompt_compiler.compile("Lexical_USER_INPUT_TEMPLATE", Lexical_USER_INPUT_TEMPLATE).format(
             var_originalText=text,
             var_formattedTextJson=formatted_text_json,
             var_processedProfile=processed_profile,
@@ -0,0 +1,92 @@
+"""프롬프트 템플릿 컴파일러 (공백 정규화 + 비의미 서식 제거)
+
+config/*_prompt.py의 템플릿은 사람이 편집하기 좋게 탭 들여쓰기, 장식용 구분선(---),
+강조 표시(**...**), 연속 빈 줄 등을 포함한다. 한 항목을 처리할 때 같은 시스템 프롬프트가
+후보 수만큼(4~7회) 전송되므로, 모델이 읽는 의미는 그대로 두고 이런 서식만 걷어내
+토큰 수를 줄인다.
+
+- 템플릿 원문은 그대로 두고, 모듈 로드 후 처음 사용할 때 한 번 컴파일하여 캐시한다
+- 치환 변수({var_...})와 코드 블록(```) 안의 내용은 건드리지 않는다
+- 치환 후의 사용자 입력(지문 등)에는 적용하지 않는다 (템플릿에만 적용)
+
+settings.prompt_compile_enabled로 끄고 켤 수 있으며, scripts/compile_prompts.py로
+템플릿별 토큰 리포트와 원문/컴파일본 A/B 실행을 할 수 있다.
+"""
+
+import re
+from typing import Dict, List, Optional
+from config.settings import settings
+
+# 내용 없이 구분선만 있는 줄 (---, ***, ___, ===)
+_RULE_LINE = re.compile(r"^\s*([-*_=])(\s*\1){2,}\s*$")
+# **강조** / __강조__
+_BOLD = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+# *기울임* (목록 기호 "* "는 뒤가 공백이므로 해당하지 않음)
+_ITALIC = re.compile(r"(?<![*\w])\*(?=[^\s*])([^*\n]+?)(?<=[^\s*])\*(?![*\w])")
+_FENCE = re.compile(r"^\s*```")
+_TAB_WIDTH = 2
+
+
+class PromptCompiler:
+    """프롬프트 템플릿 정규화 및 캐시"""
+
+    def __init__(self):
+        self._cache: Dict[str, str] = {}
+
+    def compile_text(self, text: str, strip_emphasis: Optional[bool] = None) -> str:
+        """템플릿 문자열 하나를 컴파일 (캐시 없음)"""
+        if strip_emphasis is None:
+            strip_emphasis = settings.prompt_compile_strip_emphasis
+
+        lines: List[str] = []
+        in_fence = False
+        for raw in text.replace("\r\n", "\n").split("\n"):
+            line = raw.rstrip()
+            if _FENCE.match(line):
+                in_fence = not in_fence
+                lines.append(line.strip())
+                continue
+            if in_fence:
+                lines.append(line)
+                continue
+            if _RULE_LINE.match(line):
+                # 구분선은 빈 줄로 대체 (앞뒤 문단이 붙지 않도록)
+                line = ""
+            stripped = line.lstrip(" \t")
+            indent = line[:len(line) - len(stripped)]
+            indent = indent.replace("\t", " " * _TAB_WIDTH)
+            if strip_emphasis:
+                stripped = _BOLD.sub(r"\2", stripped)
+                stripped = _ITALIC.sub(r"\1", stripped)
+            if not stripped and lines and not lines[-1]:
+                # 연속 빈 줄은 하나로 (코드 블록 밖에서만)
+                continue
+            lines.append(indent + stripped if stripped else "")
+        return "\n".join(lines).strip("\n")
+
+    def compile(self, name: str, template: str) -> str:
+        """
+        이름 붙은 템플릿을 컴파일하여 반환 (설정에서 꺼져 있으면 원문 반환)
+
+        Args:
+            name: 캐시 및 리포트용 템플릿 이름 (예: "SYNTAX_PROMPT_INCREASE")
+            template: 템플릿 원문
+
+        Returns:
+            컴파일된 템플릿
+        """
+        if not settings.prompt_compile_enabled:
+            return template
+        key = f"{name}:{settings.prompt_compile_strip_emphasis}"
+        compiled = self._cache.get(key)
+        if compiled is None:
+            compiled = self.compile_text(template)
+            self._cache[key] = compiled
+        return compiled
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+
+# 전역 프롬프트 컴파일러 인스턴스
+prompt_compiler = PromptCompiler()
@@ -0,0 +1,109 @@
+"""요청 단위 토큰/비용 예산과 단계별 품질 저하(degradation)
+
+/revise 항목 하나가 구문 후보 생성 → 후보 선택 → 어휘 후보 생성에 걸쳐 쓸 수 있는 토큰/비용에
+상한을 두고, 상한에 가까워지면 이후 단계를 가볍게 처리한다.
+- 후보 수 축소: 남은 예산으로 감당 가능한 수만큼만 생성
+- 휴리스틱 선택: LLM 선택 호출 대신 로컬 규칙으로 선택
+- 어휘 단계 생략
+
+사용량은 RequestUsage(요청 범위 누적)에서 읽으며, 적용된 저하 내역은 응답의 degradations로 반환한다.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings
+from core.llm.routing import model_router
+from core.llm.usage import RequestUsage, usage_tracker
+from utils.logging import logger
+
+
+class RequestBudget:
+    """요청 하나의 토큰/비용 상한 (0 또는 None이면 해당 항목 무제한)"""
+
+    def __init__(
+        self,
+        usage: RequestUsage,
+        max_tokens: Optional[int] = None,
+        max_cost_usd: Optional[float] = None,
+        degrade_at: Optional[float] = None,
+    ):
+        self.usage = usage
+        self.max_tokens = int(max_tokens or 0)
+        self.max_cost_usd = float(max_cost_usd or 0.0)
+        self.degrade_at = settings.revise_budget_degrade_at if degrade_at is None else degrade_at
+        self.degradations: List[Dict[str, Any]] = []
+
+    @classmethod
+    def for_request(cls, usage: RequestUsage, max_tokens: Optional[int] = None, max_cost_usd: Optional[float] = None) -> "RequestBudget":
+        """요청 값이 없으면 settings의 기본 상한 사용"""
+        return cls(
+            usage,
+            max_tokens=settings.revise_budget_max_tokens if max_tokens is None else max_tokens,
+            max_cost_usd=settings.revise_budget_max_cost_usd if max_cost_usd is None else max_cost_usd,
+        )
+
+    @property
+    def limited(self) -> bool:
+        return self.max_tokens > 0 or self.max_cost_usd > 0
+
+    def spent(self) -> Tuple[int, float]:
+        summary = self.usage.summary()
+        return summary["total_tokens"], summary["cost_usd"]
+
+    def used_fraction(self, extra_tokens: int = 0, extra_cost: float = 0.0) -> float:
+        """현재 사용량(+추가 예상분)이 상한에서 차지하는 비율 (토큰/비용 중 큰 쪽)"""
+        tokens, cost = self.spent()
+        fractions = []
+        if self.max_tokens > 0:
+            fractions.append((tokens + extra_tokens) / self.max_tokens)
+        if self.max_cost_usd > 0:
+            fractions.append((cost + extra_cost) / self.max_cost_usd)
+        return max(fractions, default=0.0)
+
+    def near_limit(self) -> bool:
+        """사용량이 degrade_at 비율 이상인지 (이후 단계 저하 판단용)"""
+        return self.limited and self.used_fraction() >= self.degrade_at
+
+    def affordable_calls(self, task: str, prompt_tokens: int, completion_tokens: int, wanted: int, minimum: int = 0) -> int:
+        """
+        호출 1회 예상 토큰(prompt + completion) 기준으로 남은 예산에서 감당 가능한 호출 수
+
+        Args:
+            task: 비용 추정용 태스크 (모델 체인의 첫 모델 단가 사용)
+            prompt_tokens: 호출당 프롬프트 토큰
+            completion_tokens: 호출당 예상 출력 토큰
+            wanted: 원래 수행하려던 호출 수
+            minimum: 예산과 무관하게 보장할 최소 호출 수
+
+        Returns:
+            minimum 이상 wanted 이하의 호출 수
+        """
+        if not self.limited:
+            return wanted
+        model = model_router.chain_for(task)[0]
+        call_tokens = prompt_tokens + completion_tokens
+        call_cost = usage_tracker.calculate_cost(model, prompt_tokens, completion_tokens)
+        count = wanted
+        while count > minimum and self.used_fraction(count * call_tokens, count * call_cost) > 1.0:
+            count -= 1
+        return count
+
+    def degrade(self, stage: str, action: str, detail: str) -> None:
+        """적용한 품질 저하 기록"""
+        tokens, cost = self.spent()
+        self.degradations.append({
+            "stage": stage,
+            "action": action,
+            "detail": detail,
+            "spent_tokens": tokens,
+            "spent_cost_usd": round(cost, 6),
+        })
+        logger.warning(f"[budget] request_id={self.usage.request_id} {stage}: {action} ({detail})")
+
+    def summary(self) -> Dict[str, Any]:
+        tokens, cost = self.spent()
+        return {
+            "max_tokens": self.max_tokens or None,
+            "max_cost_usd": self.max_cost_usd or None,
+            "spent_tokens": tokens,
+            "spent_cost_usd": round(cost, 6),
+        }
@@ -0,0 +1,31 @@
+"""태스크별 모델 라우팅
+
+settings.llm_task_models: 태스크 → 모델 폴백 체인 (앞에서부터 시도)
+settings.llm_task_client_config: 태스크 → 클라이언트 설정 (base_url, api_key_env, timeout, max_retries)
+지정되지 않은 태스크는 settings.openai_model과 기본 클라이언트를 사용한다.
+"""
+
+from typing import Any, Dict, List
+from config.settings import settings
+
+
+class ModelRouter:
+    """태스크 → (모델 체인, 클라이언트 설정) 라우팅 테이블"""
+
+    def chain_for(self, task: str) -> List[str]:
+        chain = [m for m in (settings.llm_task_models.get(task) or []) if m]
+        return chain or [settings.openai_model]
+
+    def client_config_for(self, task: str) -> Dict[str, Any]:
+        return dict(settings.llm_task_client_config.get(task) or {})
+
+    def describe(self) -> Dict[str, Any]:
+        """라우팅 테이블 요약 (헬스 체크용, 키 값은 포함하지 않음)"""
+        return {
+            "default": settings.openai_model,
+            "tasks": {task: self.chain_for(task) for task in settings.llm_task_models},
+        }
+
+
+# 전역 모델 라우터 인스턴스
+model_router = ModelRouter()
@@ -1,54 +1,233 @@
-from typing import List
+import difflib
+from typing import Any, List, Optional, Sequence, Tuple
+from config.settings import settings
 from core.llm.client import llm_client
 from core.llm.prompt_builder import prompt_builder
+from core.llm.sentence_patch import split_sentences
+from core.llm.tasks import TASK_SELECT_SECOND_OPINION
+from models.internal import SelectionResult
 from utils.exceptions import LLMAPIError
 from utils.logging import logger
 
 
 class CandidateSelector:
     """후보 텍스트 중 최적 선택 클래스"""
-    
+
     async def select_best(self, candidates: List[str]) -> str:
         """
         후보 텍스트들 중에서 최적의 텍스트를 선택합니다.
-        
+
         Args:
             candidates: 후보 텍스트 리스트
-            
+
         Returns:
             선택된 최적 텍스트
-            
+
         Raises:
             LLMAPIError: 선택 실패 시
         """
+        selected_text, _ = await self.select_best_with_details(candidates)
+        return selected_text
+
+    async def select_best_with_details(self, candidates: List[str]) -> Tuple[str, Optional[SelectionResult]]:
+        """
+        select_best와 동일하되 선택 근거(SelectionResult: 확률 분포, margin, 결정 방식)를 함께 반환합니다.
+        후보가 1개이거나 선택에 실패한 경우 SelectionResult는 None입니다.
+        """
         try:
             if not candidates:
                 raise LLMAPIError("선택할 후보가 없습니다")
-            
+
             if len(candidates) == 1:
-                return candidates[0]
-            
+                return candidates[0], None
+
             # 선택 프롬프트 준비
             prompt = prompt_builder.build_selection_prompt(candidates)
-            
+
             # LLM으로 선택
-            selected_index = await llm_client.select_best_candidate(prompt)
-            
+            if settings.selection_mode == "logprobs":
+                selection = await llm_client.select_with_logprobs(prompt, len(candidates))
+                if selection.margin is not None and selection.margin < settings.selection_min_margin:
+                    selection = await self._resolve_low_margin(candidates, selection)
+            else:
+                selected_index = await llm_client.select_best_candidate(prompt)
+                selection = SelectionResult(selected_index=selected_index, mode="text")
+
+            if not 1 <= selection.selected_index <= len(candidates):
+                raise LLMAPIError(f"선택 번호가 후보 범위(1-{len(candidates)}) 밖입니다: {selection.selected_index}")
             # 1-based 인덱스를 0-based로 변환
-            selected_text = candidates[selected_index - 1]
-            
-            logger.info(f"후보 선택 완료: {selected_index}번 후보 선택")
-            return selected_text
-            
+            selected_text = candidates[selection.selected_index - 1]
+
+            logger.info(f"후보 선택 완료: {selection.selected_index}번 후보 선택 ({selection.decided_by})")
+            return selected_text, selection
+
         except Exception as e:
             logger.error(f"후보 선택 실패: {str(e)}")
             # 실패 시 첫 번째 후보 반환
             if candidates:
                 logger.warning("선택 실패로 첫 번째 후보 반환")
-                return candidates[0]
+                return candidates[0], None
             else:
                 raise LLMAPIError(f"후보 선택 중 오류 발생: {str(e)}")
 
+    def select_heuristic(
+        self,
+        candidates: List[str],
+        original: str,
+        metrics: Optional[Sequence[Any]] = None,
+        ranges: Optional[Tuple[float, float, float, float]] = None,
+        original_lexical: Optional[float] = None,
+    ) -> str:
+        """
+        LLM 호출 없이 휴리스틱 점수가 가장 좋은 후보를 선택합니다 (score_candidates 참고).
+        요청 예산이 부족할 때 LLM 선택 대신 사용합니다.
+        """
+        selected_text, _ = self.select_heuristic_with_details(candidates, original, metrics, ranges, original_lexical)
+        return selected_text
+
+    def select_heuristic_with_details(
+        self,
+        candidates: List[str],
+        original: str,
+        metrics: Optional[Sequence[Any]] = None,
+        ranges: Optional[Tuple[float, float, float, float]] = None,
+        original_lexical: Optional[float] = None,
+    ) -> Tuple[str, SelectionResult]:
+        """select_heuristic과 동일하되 점수와 1/2위 점수 차이(margin)를 담은 SelectionResult를 함께 반환"""
+        if not candidates:
+            raise LLMAPIError("선택할 후보가 없습니다")
+        scores = self.score_candidates(candidates, original, metrics, ranges, original_lexical)
+        # 점수가 같으면 앞 번호(낮은 temperature) 후보 우선
+        ranked = sorted(range(len(candidates)), key=lambda i: (scores[i], i))
+        best = ranked[0]
+        margin = scores[ranked[1]] - scores[best] if len(ranked) > 1 else None
+        logger.info(f"휴리스틱 후보 선택: {best + 1}번 후보 (점수 {scores[best]:.3f}, 2위와 차이 {margin if margin is None else round(margin, 3)})")
+        return candidates[best], SelectionResult(
+            selected_index=best + 1,
+            mode="heuristic",
+            margin=margin,
+            decided_by="heuristic",
+            heuristic_scores={i + 1: round(score, 4) for i, score in enumerate(scores)},
+        )
+
+    def score_candidates(
+        self,
+        candidates: List[str],
+        original: str,
+        metrics: Optional[Sequence[Any]] = None,
+        ranges: Optional[Tuple[float, float, float, float]] = None,
+        original_lexical: Optional[float] = None,
+    ) -> List[float]:
+        """
+        후보별 휴리스틱 점수 (낮을수록 좋음, settings.selection_heuristic_weights 가중합)
+        - edit: 원문 대비 수정량 (프롬프트의 'surgical' 원칙) - 문장 단위 불일치율과 단어 단위 불일치율의 평균
+        - center: 목표 범위 중심과의 거리 (평균 문장 길이, 내포절 비율을 범위 반폭으로 정규화한 평균)
+        - lexical: 구문 수정으로 인한 어휘 비율(CEFR A1A2) 변화 (settings.selection_lexical_drift_scale로 정규화)
+        metrics/ranges/original_lexical이 없으면 해당 항목은 0으로 봅니다.
+        """
+        weights = settings.selection_heuristic_weights
+        original_sentences, _ = split_sentences(original)
+        original_words = original.split()
+        scores = []
+        for i, candidate in enumerate(candidates):
+            candidate_sentences, _ = split_sentences(candidate)
+            sentence_ratio = difflib.SequenceMatcher(None, original_sentences, candidate_sentences, autojunk=False).ratio()
+            word_ratio = difflib.SequenceMatcher(None, original_words, candidate.split(), autojunk=False).ratio()
+            edit = ((1.0 - sentence_ratio) + (1.0 - word_ratio)) / 2
+            center = 0.0
+            lexical = 0.0
+            candidate_metrics = metrics[i] if metrics is not None else None
+            if candidate_metrics is not None and ranges is not None:
+                center = self._center_distance(candidate_metrics, ranges)
+            if candidate_metrics is not None and original_lexical is not None:
+                drift = abs(getattr(candidate_metrics, "CEFR_NVJD_A1A2_lemma_ratio", original_lexical) - original_lexical)
+                lexical = min(2.0, drift / max(settings.selection_lexical_drift_scale, 1e-6))
+            scores.append(
+                weights.get("edit", 0.0) * edit
+                + weights.get("center", 0.0) * center
+                + weights.get("lexical", 0.0) * lexical
+            )
+        return scores
+
+    @staticmethod
+    def _center_distance(metrics: Any, ranges: Tuple[float, float, float, float]) -> float:
+        avg_min, avg_max, clause_min, clause_max = ranges
+        distances = []
+        for value, low, high in (
+            (metrics.AVG_SENTENCE_LENGTH, avg_min, avg_max),
+            (metrics.All_Embedded_Clauses_Ratio, clause_min, clause_max),
+        ):
+            half_width = max((high - low) / 2, 1e-6)
+            distances.append(abs(value - (low + high) / 2) / half_width)
+        return sum(distances) / len(distances)
+
+    async def select_local_first(
+        self,
+        candidates: List[str],
+        original: str,
+        metrics: Optional[Sequence[Any]] = None,
+        ranges: Optional[Tuple[float, float, float, float]] = None,
+        original_lexical: Optional[float] = None,
+    ) -> Tuple[str, Optional[SelectionResult]]:
+        """
+        휴리스틱으로 먼저 선택하고, 1위와의 점수 차이가 settings.selection_heuristic_margin 미만인
+        후보가 여럿일 때만 그 후보들로 LLM 선택을 호출합니다 (settings.selection_strategy="local" 이면 호출 안 함).
+        """
+        selected_text, heuristic = self.select_heuristic_with_details(candidates, original, metrics, ranges, original_lexical)
+        if len(candidates) == 1 or settings.selection_strategy == "local":
+            return selected_text, heuristic
+        scores = heuristic.heuristic_scores
+        best = min(scores.values())
+        near_top = [i for i in sorted(scores) if scores[i] - best < settings.selection_heuristic_margin]
+        if len(near_top) < 2:
+            return selected_text, heuristic
+
+        logger.info(f"휴리스틱 점수 근소 차 후보 {near_top} → LLM 선택")
+        near_texts = [candidates[i - 1] for i in near_top]
+        llm_text, selection = await self.select_best_with_details(near_texts)
+        if selection is None:
+            # LLM 선택 실패: 휴리스틱 1위 유지
+            return selected_text, heuristic
+        # LLM 결과의 번호(근소 차 후보 내 순번)를 전체 후보 번호로 환산
+        return llm_text, selection.model_copy(update={
+            "selected_index": near_top[selection.selected_index - 1],
+            "distribution": {near_top[i - 1]: p for i, p in selection.distribution.items()},
+            "second_opinion_distribution": (
+                {near_top[i - 1]: p for i, p in selection.second_opinion_distribution.items()}
+                if selection.second_opinion_distribution else None
+            ),
+            "heuristic_scores": scores,
+        })
+
+    async def _resolve_low_margin(self, candidates: List[str], selection: SelectionResult) -> SelectionResult:
+        """1/2위 확률 차이가 selection_min_margin 미만인 선택 처리 (settings.selection_low_margin_policy)"""
+        distribution = selection.distribution
+        logger.info(f"후보 선택 확신도 낮음 (margin={selection.margin:.3f}), 정책: {settings.selection_low_margin_policy}")
+
+        if settings.selection_low_margin_policy == "second_opinion":
+            # 순서를 뒤집은 프롬프트로 다시 선택하여 위치 편향을 상쇄하고 두 분포를 평균
+            n = len(candidates)
+            prompt = prompt_builder.build_selection_prompt(list(reversed(candidates)))
+            second = await llm_client.select_with_logprobs(prompt, n, task=TASK_SELECT_SECOND_OPINION)
+            if second.distribution:
+                remapped = {n + 1 - i: p for i, p in second.distribution.items()}
+                combined = {i: (distribution.get(i, 0.0) + remapped.get(i, 0.0)) / 2 for i in range(1, n + 1)}
+                ranked = sorted(combined.values(), reverse=True)
+                return SelectionResult(
+                    selected_index=max(combined, key=lambda i: (combined[i], -i)),
+                    mode="logprobs",
+                    distribution=combined,
+                    margin=ranked[0] - ranked[1],
+                    decided_by="second_opinion",
+                    second_opinion_distribution=remapped,
+                )
+            logger.warning("재선택에서 확률 분포를 얻지 못해 결정적 규칙으로 처리")
+
+        # 결정적 규칙: 최고 확률과의 차이가 margin 이내인 후보 중 가장 앞 번호 (낮은 temperature 후보 우선)
+        top = max(distribution.values())
+        near_top = [i for i, p in distribution.items() if top - p < settings.selection_min_margin]
+        return selection.model_copy(update={"selected_index": min(near_top), "decided_by": "tie_break"})
+
 
 # 전역 선택기 인스턴스
-candidate_selector = CandidateSelector() 
\ No newline at end of file
+candidate_selector = CandidateSelector()
@@ -0,0 +1,120 @@
+"""구문 수정 대상 문장 사전 선택 (발췌 프롬프트)
+
+지문 전체를 보내고 모델이 고칠 문장을 고르게 하는 대신, 문장별 길이/절 정보로 수정 방법에 맞는
+문장을 미리 골라 그 문장과 앞뒤 문맥만 번호 붙여 보낸다. 출력은 원문 번호 기준 문장 패치이므로
+전체 지문에 그대로 적용(core/llm/sentence_patch.py)한다.
+- 길이 증가(병합): 단어 수 합이 가장 작은 인접 문장 쌍
+- 길이 감소(분리): 가장 긴 문장 (절 경계에서 나누기 쉬운 복문 우선)
+- 내포절 증가: 절이 없는 짧은 문장
+- 내포절 감소: 절이 있는 긴 문장
+수정 수의 settings.syntax_focus_pool_factor배를 대상으로 고르고, 앞뒤 settings.syntax_focus_context문장을 문맥으로 붙인다.
+
+분석기 응답은 지문 단위 집계만 제공하므로(core/metrics.py) 문장별 정보는 core/prescreen.py의 로컬 추정을 쓴다.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
+from config.settings import settings
+from core.llm.sentence_patch import split_sentences
+from core.prescreen import syntax_prescreener
+
+
+@dataclass
+class SentenceFocus:
+    """발췌 프롬프트 구성 결과"""
+    excerpt: str  # 번호 붙인 발췌 ([i] 문장, 떨어진 구간 사이는 "...")
+    targets: List[int]  # 수정 대상으로 제안한 문장 번호
+    visible_ids: Set[int]  # 발췌에 포함된 문장 번호 (패치 허용 범위)
+    total_sentences: int
+
+
+def select_targets(
+    sentences: List[str], length_direction: Optional[str], clause_direction: Optional[str], num_modifications: int
+) -> List[int]:
+    """
+    수정 대상 문장 번호 선택 (1부터)
+
+    Args:
+        sentences: 문장 리스트 (split_sentences 결과)
+        length_direction: 평균 문장 길이 수정 방향 ("increase" | "decrease" | None - 범위 안)
+        clause_direction: 내포절 비율 수정 방향 ("increase" | "decrease" | None)
+        num_modifications: 수정 수
+    """
+    pool = max(1, num_modifications) * settings.syntax_focus_pool_factor
+    words = [syntax_prescreener.word_count(s) for s in sentences]
+    clauses = [syntax_prescreener.has_clause(s) for s in sentences]
+    ids = range(len(sentences))
+    targets: Set[int] = set()
+
+    if length_direction == "increase":
+        # 병합할 인접 쌍: 단어 수 합이 작은 순 (내포절도 늘려야 하면 절 없는 쌍 우선)
+        pairs = sorted(
+            (i for i in ids if i + 1 < len(sentences)),
+            key=lambda i: ((clauses[i] or clauses[i + 1]) and clause_direction == "increase", words[i] + words[i + 1]),
+        )
+        used: Set[int] = set()
+        for i in pairs:
+            if len(used) >= pool * 2:
+                break
+            if i not in used and i + 1 not in used:
+                used.update((i, i + 1))
+        targets |= used
+    elif length_direction == "decrease":
+        # 분리할 문장: 긴 순 (절 경계가 있는 복문 우선, 내포절도 늘려야 하면 단문 우선)
+        prefer_clause = clause_direction != "increase"
+        targets |= set(sorted(ids, key=lambda i: (clauses[i] != prefer_clause, -words[i]))[:pool])
+
+    if clause_direction == "increase":
+        targets |= set(sorted((i for i in ids if not clauses[i]), key=lambda i: words[i])[:pool])
+    elif clause_direction == "decrease":
+        targets |= set(sorted((i for i in ids if clauses[i]), key=lambda i: -words[i])[:pool])
+
+    return sorted(i + 1 for i in targets)
+
+
+def build_focus(
+    text: str, length_direction: Optional[str], clause_direction: Optional[str], num_modifications: int
+) -> Optional[SentenceFocus]:
+    """
+    발췌 프롬프트 구성. 문장 수가 settings.syntax_focus_min_sentences 미만이거나 발췌가 지문 대부분이면 None
+    """
+    sentences, _ = split_sentences(text)
+    if len(sentences) < settings.syntax_focus_min_sentences:
+        return None
+    targets = select_targets(sentences, length_direction, clause_direction, num_modifications)
+    if not targets:
+        return None
+    context = settings.syntax_focus_context
+    visible = {
+        i for t in targets for i in range(max(1, t - context), min(len(sentences), t + context) + 1)
+    }
+    if len(visible) > len(sentences) * settings.syntax_focus_max_fraction:
+        # 발췌로 줄어드는 입력이 적으면 지문 전체 사용
+        return None
+
+    lines: List[str] = []
+    previous = 0
+    for i in sorted(visible):
+        if previous and i != previous + 1:
+            lines.append("...")
+        lines.append(f"[{i}] {sentences[i - 1]}")
+        previous = i
+    return SentenceFocus(
+        excerpt="\n".join(lines), targets=targets, visible_ids=visible, total_sentences=len(sentences)
+    )
+
+
+def metric_directions(
+    avg_current: float, clause_current: float, ranges: Tuple[float, float, float, float]
+) -> Tuple[Optional[str], Optional[str]]:
+    """현재 지표와 목표 범위로 (평균 문장 길이, 내포절 비율) 수정 방향 결정 (범위 안이면 None)"""
+    avg_min, avg_max, clause_min, clause_max = ranges
+
+    def _direction(value: float, low: float, high: float) -> Optional[str]:
+        if value < low:
+            return "increase"
+        if value > high:
+            return "decrease"
+        return None
+
+    return _direction(avg_current, avg_min, avg_max), _direction(clause_current, clause_min, clause_max)
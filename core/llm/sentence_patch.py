@@ -0,0 +1,127 @@
+"""문장 패치(sentence patch) 형식 구문 수정
+
+전체 지문 대신 번호 붙인 문장을 보내고, LLM은 바꾼 문장만 JSON 패치로 돌려준다.
+    {"patches": [{"sentence_ids": [3], "replacement": "..."}, {"sentence_ids": [5, 6], "replacement": "..."}]}
+- sentence_ids: 대체할 원문 문장 번호 (연속 번호면 여러 문장을 하나로 병합)
+- replacement: 해당 문장(들)을 대체할 텍스트 (문장 분리 시 두 문장 이상 포함 가능)
+
+출력 토큰이 지문 전체가 아니라 수정 문장 수에 비례하므로, 긴 지문에서 몇 문장만 고칠 때 생성 시간과 비용이 크게 준다.
+번호 매기기와 적용은 같은 문장 분할(split_sentences)을 사용하므로, 분할이 완벽하지 않아도 결과 지문은 일관된다.
+외부 분석기는 지문 단위로만 분석하므로, 패치 적용 후 검증은 여전히 수정된 지문 전체에 대해 수행한다.
+"""
+
+import json
+import re
+from typing import Any, Collection, Dict, List, Optional, Tuple
+from utils.exceptions import SentencePatchError
+
+# 문단 구분(줄바꿈) 또는 문장 부호(+닫는 따옴표/괄호) 뒤 공백 + 대문자/숫자 시작을 경계로 분할, 경계 공백은 보존
+_SPLIT = re.compile(r'(\s*\n\s*|(?:(?<=[.!?])|(?<=[.!?]["\'”’)\]]))[ \t]+(?=["\'“‘(\[]?[A-Z0-9]))')
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+# 문장 끝이 아닌 마침표로 끝나는 조각 (호칭/약어, 이니셜 - "Mr. Smith", "U.S. Army", "J. K. Rowling")
+_ABBREVIATION = re.compile(r"(?:\b(?:Mr|Mrs|Ms|Dr|Prof|St|Jr|Sr|vs|No|e\.g|i\.e)|\b[A-Z])\.$")
+
+
+def split_sentences(text: str) -> Tuple[List[str], List[str]]:
+    """
+    지문을 문장으로 분할
+
+    Returns:
+        (문장 리스트, 각 문장 뒤에 오는 공백/줄바꿈 리스트) - "".join(s + g)로 원문(앞뒤 공백 제외) 복원
+    """
+    parts = _SPLIT.split(text.strip())
+    sentences = parts[0::2]
+    gaps = parts[1::2] + [""]
+    # 약어/이니셜 뒤에서 잘린 조각은 다음 문장과 다시 합침 (문단 구분은 유지)
+    i = 0
+    while i + 1 < len(sentences):
+        if "\n" not in gaps[i] and _ABBREVIATION.search(sentences[i]):
+            sentences[i:i + 2] = [sentences[i] + gaps[i] + sentences[i + 1]]
+            del gaps[i]
+        else:
+            i += 1
+    return sentences, gaps
+
+
+def number_sentences(text: str) -> str:
+    """프롬프트용 번호 붙인 문장 목록 ([1] 문장)"""
+    sentences, _ = split_sentences(text)
+    return "\n".join(f"[{i}] {sentence}" for i, sentence in enumerate(sentences, start=1))
+
+
+def parse_patches(output: str) -> List[Dict[str, Any]]:
+    """LLM 출력에서 패치 목록 추출 ({"patches": [...]}, 패치 배열, 단일 패치 객체 허용)"""
+    raw = _CODE_FENCE.sub("", output.strip())
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        # 앞뒤 설명문이 붙은 경우 첫 JSON 객체/배열만 사용
+        match = re.search(r"[\[{].*[\]}]", raw, flags=re.DOTALL)
+        if not match:
+            raise SentencePatchError("패치 JSON을 찾을 수 없습니다")
+        try:
+            data = json.loads(match.group(0))
+        except ValueError as e:
+            raise SentencePatchError(f"패치 JSON 파싱 실패: {str(e)}")
+    if isinstance(data, dict):
+        data = data.get("patches", [data] if "sentence_ids" in data else None)
+    if not isinstance(data, list):
+        raise SentencePatchError("패치 목록 형식이 아닙니다")
+    return data
+
+
+def apply_patches(
+    text: str, patches: List[Dict[str, Any]], allowed_ids: Optional[Collection[int]] = None
+) -> Tuple[str, List[int]]:
+    """
+    패치를 검증하여 지문에 적용 (allowed_ids가 있으면 그 문장 번호만 수정 허용 - 발췌 프롬프트에 보낸 문장)
+
+    Returns:
+        (수정된 지문, 수정된 원문 문장 번호 리스트)
+
+    Raises:
+        SentencePatchError: 번호 범위/연속성/중복/허용 범위 위반, 빈 대체 텍스트, 수정 없음
+    """
+    sentences, gaps = split_sentences(text)
+    replacements: Dict[int, Tuple[int, str]] = {}  # 시작 번호 → (끝 번호, 대체 텍스트)
+    touched: List[int] = []
+    for patch in patches:
+        if not isinstance(patch, dict):
+            raise SentencePatchError(f"패치 항목 형식 오류: {patch!r}")
+        ids = patch.get("sentence_ids")
+        ids = [ids] if isinstance(ids, int) else ids
+        replacement = patch.get("replacement")
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+            raise SentencePatchError(f"sentence_ids 형식 오류: {ids!r}")
+        if not isinstance(replacement, str) or not replacement.strip():
+            raise SentencePatchError(f"대체 텍스트가 비어 있습니다 (sentence_ids={ids})")
+        ids = sorted(set(ids))
+        if ids[0] < 1 or ids[-1] > len(sentences):
+            raise SentencePatchError(f"문장 번호 범위 초과: {ids} (문장 수 {len(sentences)})")
+        if ids != list(range(ids[0], ids[-1] + 1)):
+            raise SentencePatchError(f"병합할 문장 번호가 연속되지 않습니다: {ids}")
+        if allowed_ids is not None and any(i not in allowed_ids for i in ids):
+            raise SentencePatchError(f"프롬프트에 없는 문장 번호: {ids}")
+        if any(i in touched for i in ids):
+            raise SentencePatchError(f"같은 문장을 여러 패치가 수정합니다: {ids}")
+        touched.extend(ids)
+        replacements[ids[0]] = (ids[-1], " ".join(replacement.split()))
+    if not replacements:
+        raise SentencePatchError("수정된 문장이 없습니다")
+
+    parts: List[str] = []
+    i = 1
+    while i <= len(sentences):
+        if i in replacements:
+            end, replacement = replacements[i]
+            parts.append(replacement + gaps[end - 1])
+            i = end + 1
+        else:
+            parts.append(sentences[i - 1] + gaps[i - 1])
+            i += 1
+    return "".join(parts).strip(), sorted(touched)
+
+
+def apply_output(text: str, output: str, allowed_ids: Optional[Collection[int]] = None) -> Tuple[str, List[int]]:
+    """LLM 패치 출력을 파싱하여 적용 (parse_patches + apply_patches)"""
+    return apply_patches(text, parse_patches(output), allowed_ids)
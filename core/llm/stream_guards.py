@@ -0,0 +1,96 @@
+"""스트리밍 생성 조기 중단(abort) 조건
+
+각 조건은 지금까지 누적된 출력 텍스트를 받아 중단 사유 문자열을 반환한다.
+None을 반환하면 생성을 계속한다.
+"""
+
+from typing import Callable, List, Optional
+
+AbortPredicate = Callable[[str], Optional[str]]
+
+
+def max_length_ratio(reference_text: str, ratio: float) -> AbortPredicate:
+    """출력 길이가 기준 텍스트 길이의 ratio배를 넘으면 중단 (폭주 출력 방지)"""
+    limit = max(1, int(len(reference_text or "") * ratio))
+
+    def _check(output: str) -> Optional[str]:
+        if len(output) > limit:
+            return f"output_too_long ({len(output)} > {limit} chars)"
+        return None
+
+    return _check
+
+
+def repetition_guard(ngram: int = 8, min_repeats: int = 4, window_words: int = 400) -> AbortPredicate:
+    """마지막 n-gram이 최근 window 안에서 min_repeats회 이상 반복되면 중단 (퇴화 출력 방지)"""
+
+    def _check(output: str) -> Optional[str]:
+        words = output.split()[-window_words:]
+        if len(words) < ngram * min_repeats:
+            return None
+        tail = tuple(words[-ngram:])
+        repeats = sum(
+            1 for i in range(len(words) - ngram + 1)
+            if tuple(words[i:i + ngram]) == tail
+        )
+        if repeats >= min_repeats:
+            return f"degenerate_repetition ({repeats}x '{' '.join(tail)}')"
+        return None
+
+    return _check
+
+
+def json_prefix_guard(max_preamble_chars: int = 300) -> AbortPredicate:
+    """어휘 수정 출력(JSON 객체/배열)의 접두어가 유효한지 검사
+
+    - 코드 펜스/짧은 서두 이후 '{' 또는 '['로 시작해야 함
+    - 문자열 밖의 괄호가 짝이 맞지 않으면 중단
+    최상위 JSON이 닫힌 뒤의 텍스트는 검사하지 않는다 (파서가 처리).
+    """
+
+    def _check(output: str) -> Optional[str]:
+        start = -1
+        for i, ch in enumerate(output):
+            if ch in "{[":
+                start = i
+                break
+        if start == -1:
+            if len(output.strip()) > max_preamble_chars:
+                return f"no_json_start (first {max_preamble_chars} chars)"
+            return None
+        if start > max_preamble_chars:
+            return f"json_start_too_late (offset {start})"
+
+        stack: List[str] = []
+        in_string = False
+        escape = False
+        for ch in output[start:]:
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+                continue
+            if ch == '"':
+                in_string = True
+            elif ch in "{[":
+                stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if not stack or stack.pop() != ch:
+                    return "invalid_json_prefix (unbalanced bracket)"
+                if not stack:
+                    return None
+        return None
+
+    return _check
+
+
+def first_abort_reason(output: str, predicates: List[AbortPredicate]) -> Optional[str]:
+    """predicates 중 처음으로 중단 사유를 반환하는 조건의 결과"""
+    for predicate in predicates:
+        reason = predicate(output)
+        if reason:
+            return reason
+    return None
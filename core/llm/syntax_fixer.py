@@ -1,15 +1,27 @@
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional, Set
 import asyncio
 from core.llm.client import llm_client
+from core.llm.batch_api import current_collector
+from core.llm.candidate_bandit import STAGE_SYNTAX, candidate_bandit
+from core.llm.chunking import ChunkJob, allocate_modifications, split_chunks, stitch
+from core.llm.dedup import CandidateDeduper, is_placeholder
+from core.llm.request_budget import RequestBudget
+from core.llm.tasks import TASK_SELECT, TASK_SYNTAX_GENERATE, TASK_SYNTAX_PATCH
+from core.llm.token_budget import token_budgeter
 from core.llm.selector import CandidateSelector
 from core.llm.prompt_builder import prompt_builder
+from core.llm.stream_guards import json_prefix_guard, max_length_ratio, repetition_guard
+from core.llm.sentence_focus import SentenceFocus, build_focus, metric_directions
+from core.llm.sentence_patch import apply_output
 from core.analyzer import analyzer
+from core.prescreen import Screen, syntax_prescreener
 from core.metrics import metrics_extractor
 from core.judge import judge
 from config.settings import settings
 from models.request import MasterMetrics, ToleranceAbs, ToleranceRatio
 from models.internal import LLMCandidate, LLMResponse
-from utils.exceptions import LLMAPIError
+from utils.exceptions import LLMAPIError, LLMStreamAbortedError, SentencePatchError
+from utils.helpers import gather_in_task_group
 from utils.logging import logger
 
 
@@ -33,7 +45,12 @@ class SyntaxFixer:
         num_modifications: int,
         problematic_metric: str,
         referential_clauses: str = "",
-        prompt_type: str = "decrease"
+        prompt_type: str = "decrease",
+        diagnostics: Optional[Dict[str, Any]] = None,
+        budget: Optional[RequestBudget] = None,
+        joint_mission: Optional[str] = None,
+        joint_plan: Optional[Dict[str, Any]] = None,
+        lexical_range: Optional[Tuple[float, float]] = None
     ) -> Tuple[List[str], str, Any, Any, int]:
         """
         API에서 계산된 파라미터로 구문 수정을 수행합니다.
@@ -48,6 +65,11 @@ class SyntaxFixer:
             problematic_metric: 문제가 있는 지표명 (API에서 자동 계산됨)
             referential_clauses: 참조용 절 정보
             prompt_type: 프롬프트 타입 ("increase" 또는 "decrease")
+            diagnostics: 주어지면 부가 정보(후보 선택 근거 등)를 채워 넣을 딕셔너리
+            budget: 요청 단위 예산 (부족하면 후보 수 축소, 휴리스틱 선택)
+            joint_mission: 두 지표를 함께 고치는 복합 미션 (prompt_builder.plan_joint_modifications)
+            joint_plan: 복합 수정 계획 전체 (청크 분할 시 지표별 수정 수를 청크에 배분)
+            lexical_range: 어휘 비율(CEFR A1A2) 목표 (최소, 최대) - 주어지면 어휘도 통과하는(가장 가까운) 후보 중에서 선택
             
         Returns:
             (후보 리스트, 선택된 텍스트, 최종 지표, 최종 평가, 전체 생성된 후보 수) 튜플
@@ -57,7 +79,6 @@ class SyntaxFixer:
         """
         try:
             logger.info(f"구문 수정 시작 (API 계산된 파라미터 사용): {len(text)} 글자")
-            logger.info(f"Temperature 설정: {self.temperatures}, 각 temperature별 {self.candidates_per_temperature}개 후보")
             logger.info(f"API 계산 결과 - 문제지표: {problematic_metric}, 수정수: {num_modifications}, 프롬프트타입: {prompt_type}")
             
             # current_metrics 키 이름 매핑
@@ -67,11 +88,43 @@ class SyntaxFixer:
             }
                         
             # 프롬프트 준비 (API에서 계산된 파라미터 사용)
-            prompt = prompt_builder.build_syntax_prompt(
-                text, avg_target_min, avg_target_max, clause_target_min, clause_target_max,
-                mapped_metrics,
-                problematic_metric, num_modifications, referential_clauses, prompt_type
+            ranges = (avg_target_min, avg_target_max, clause_target_min, clause_target_max)
+            output_format = settings.syntax_output_format
+            # 아주 긴 지문은 청크로 나눠 동시에 수정하고 이어 붙인 전체를 검증
+            chunk_jobs = self._plan_chunks(
+                text, current_metrics, mapped_metrics, ranges, problematic_metric, num_modifications, prompt_type,
+                referential_clauses, output_format, joint_mission, joint_plan
+            )
+            if chunk_jobs is not None and diagnostics is not None:
+                diagnostics["chunks"] = [
+                    {
+                        "sentences": job.chunk.sentence_count, "words": job.chunk.word_count,
+                        "num_modifications": job.num_modifications, "problematic_metric": job.problematic_metric,
+                    }
+                    for job in chunk_jobs
+                ]
+            # 긴 지문은 수정에 적합한 문장과 문맥만 발췌해 보내고 문장 패치로 받음
+            focus = None if chunk_jobs is not None else self._build_focus(
+                text, current_metrics.get('AVG_SENTENCE_LENGTH'), current_metrics.get('All_Embedded_Clauses_Ratio'),
+                ranges, num_modifications
             )
+            if focus is not None:
+                output_format = "patch"
+                if diagnostics is not None:
+                    diagnostics["focus"] = {
+                        "targets": focus.targets, "sent_sentences": len(focus.visible_ids), "total_sentences": focus.total_sentences,
+                    }
+            if chunk_jobs is not None:
+                # 청크 모드에서는 지문 전체 프롬프트 대신 청크별 프롬프트로 생성
+                prompt = None
+                prompts = [job.prompt for job in chunk_jobs if job.prompt is not None]
+            else:
+                prompt = prompt_builder.build_syntax_prompt(
+                    text, avg_target_min, avg_target_max, clause_target_min, clause_target_max,
+                    mapped_metrics,
+                    problematic_metric, num_modifications, referential_clauses, prompt_type, output_format, joint_mission, focus
+                )
+                prompts = [prompt]
             
             # 📋 구문 수정 프롬프트 로깅
             logger.info("=" * 80)
@@ -81,93 +134,60 @@ class SyntaxFixer:
             logger.info(f"   - 평균 문장 길이: {avg_target_min:.2f} ~ {avg_target_max:.2f}")
             logger.info(f"   - 내포절 비율: {clause_target_min:.3f} ~ {clause_target_max:.3f}")
             logger.info(f"🎯 문제 지표: {problematic_metric}, 수정 문장 수: {num_modifications}, 타입: {prompt_type}")
-            logger.info("-" * 80)
-            logger.info(f"🤖 [SYSTEM 프롬프트]:\n{prompt[0]['content']}")
-            logger.info("-" * 80)
-            logger.info(f"👤 [USER 프롬프트]:\n{prompt[1]['content']}")
+            for message in prompts:
+                logger.info("-" * 80)
+                logger.info(f"🤖 [SYSTEM 프롬프트]:\n{message[0]['content']}")
+                logger.info("-" * 80)
+                logger.info(f"👤 [USER 프롬프트]:\n{message[1]['content']}")
             logger.info("=" * 80)
             
             # 각 temperature별로 여러 후보 생성
-            candidates = await llm_client.generate_multiple_messages_per_temperature(prompt)
-            
-            total_candidates = len(self.temperatures) * self.candidates_per_temperature
-            logger.info(f"LLM으로 총 {len(candidates)}개 후보 생성 완료 (예상: {total_candidates}개)")
-            
-            # 생성된 후보들의 텍스트 내용 확인 (디버깅용)
-            for i, candidate in enumerate(candidates):
-                temp_index = i // self.candidates_per_temperature
-                candidate_index_in_temp = (i % self.candidates_per_temperature) + 1
-                temp_value = self.temperatures[temp_index] if temp_index < len(self.temperatures) else "Unknown"
-                logger.info(f"=== 후보 {i+1} (temp={temp_value}, {candidate_index_in_temp}/{self.candidates_per_temperature}) ===")
-                logger.info(f"길이: {len(candidate)}글자")
-                logger.info(f"처음 100글자: {candidate[:100]}...")
-                logger.info(f"마지막 100글자: ...{candidate[-100:]}")
-                logger.info("=" * 60)
-            
-            # 각 후보를 분석기로 검증 (병렬 처리)
-            logger.info(f"총 {len(candidates)}개 후보를 병렬로 분석 시작...")
-            
-            # 분석 태스크 생성
-            analysis_tasks = []
-            candidate_info = []
-            
-            for i, candidate in enumerate(candidates):
-                # Temperature별 정보 계산
-                temp_index = i // self.candidates_per_temperature
-                candidate_index_in_temp = (i % self.candidates_per_temperature) + 1
-                temp_value = self.temperatures[temp_index] if temp_index < len(self.temperatures) else "Unknown"
-                
-                # 분석 태스크 생성
-                task = self._analyze_candidate_with_ranges(candidate, avg_target_min, avg_target_max, clause_target_min, clause_target_max)
-                analysis_tasks.append(task)
-                candidate_info.append({
-                    'index': i + 1,
-                    'text': candidate,
-                    'temperature': temp_value,
-                    'temp_candidate_num': candidate_index_in_temp
-                })
+            abort_predicates = self._abort_predicates(text, output_format)
+            # 후보 수/temperature: 밴딧이 켜져 있으면 맥락별 통과율 기반, 아니면 고정 설정
+            bandit_key = None
+            if candidate_bandit.enabled:
+                bandit_key = candidate_bandit.context_key(STAGE_SYNTAX, problematic_metric, prompt_type, text)
+                plan = candidate_bandit.plan(bandit_key)
+            else:
+                plan = llm_client.candidate_plan()
+            total_candidates = len(plan)
+            if budget is not None:
+                # 후보 1개 예상 토큰: 프롬프트 + 출력 (원문 길이 또는 패치 출력 예산)
+                affordable = budget.affordable_calls(
+                    self._generation_task(output_format), self._prompt_tokens(prompt, chunk_jobs),
+                    self._expected_output_tokens(text, output_format, chunk_jobs), total_candidates, minimum=1,
+                )
+                if affordable < total_candidates:
+                    budget.degrade("syntax", "fewer_candidates", f"구문 후보 {total_candidates}개 → {affordable}개")
+                    plan = candidate_bandit.plan(bandit_key, affordable) if bandit_key else llm_client.candidate_plan(affordable)
+                    total_candidates = len(plan)
+            logger.info(f"후보 생성 계획 ({'밴딧' if bandit_key else '고정'}): temperature {[temp for temp, _ in plan]}")
+
+            # 후보별로 생성 → 분석을 이어서 실행하고, 통과 후보가 충분히 모이면 나머지 취소
+            # 원문의 분석기 지표로 로컬 추정을 보정하여, 범위를 확실히 벗어난 후보는 분석 전에 탈락
+            screen = syntax_prescreener.screener(
+                ranges, text, current_metrics.get('AVG_SENTENCE_LENGTH'), current_metrics.get('All_Embedded_Clauses_Ratio')
+            )
+            valid_candidates, judged, race = await self._race_candidates(
+                prompt, text, plan, abort_predicates, ranges, bandit_key, output_format=output_format, screen=screen,
+                patch_scope=focus.visible_ids if focus is not None else None, chunk_jobs=chunk_jobs,
+                lexical_range=lexical_range if settings.selection_prefer_lexical_pass else None,
+            )
+            total_candidates_generated = race["generated"]
+            if diagnostics is not None:
+                diagnostics["race"] = race
             
-            # 병렬 분석 실행
-            try:
-                analysis_results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
-                logger.info(f"병렬 분석 완료: 총 {len(analysis_results)}개 결과")
-                
-                # 결과 처리
-                valid_candidates = []
-                for i, (result, info) in enumerate(zip(analysis_results, candidate_info)):
-                    if isinstance(result, Exception):
-                        logger.warning(f"후보 {info['index']} 분석 실패: {str(result)}")
-                        continue
-                    
-                    candidate_metrics, candidate_evaluation = result
-                    
-                    # 구문 지표 통과 여부 확인
-                    if candidate_evaluation.syntax_pass == "PASS":
-                        valid_candidates.append({
-                            'text': info['text'],
-                            'index': info['index'],
-                            'temperature': info['temperature'],
-                            'temp_candidate_num': info['temp_candidate_num'],
-                            'metrics': candidate_metrics,
-                            'evaluation': candidate_evaluation
-                        })
-                        logger.info(f"후보 {info['index']}: 구문 지표 통과 ✅ (temp={info['temperature']})")
-                        logger.info(f"   - 평균 문장 길이: {candidate_metrics.AVG_SENTENCE_LENGTH:.3f}")
-                        logger.info(f"   - 내포절 비율: {candidate_metrics.All_Embedded_Clauses_Ratio:.3f}")
-                    else:
-                        logger.info(f"후보 {info['index']}: 구문 지표 실패 ❌ (temp={info['temperature']})")
-                        logger.info(f"   - 평균 문장 길이: {candidate_metrics.AVG_SENTENCE_LENGTH:.3f} (목표: {avg_target_min:.2f}-{avg_target_max:.2f})")
-                        logger.info(f"   - 내포절 비율: {candidate_metrics.All_Embedded_Clauses_Ratio:.3f} (목표: {clause_target_min:.3f}-{clause_target_max:.3f})")
-                        
-                        length_pass = avg_target_min <= candidate_metrics.AVG_SENTENCE_LENGTH <= avg_target_max
-                        clause_pass = clause_target_min <= candidate_metrics.All_Embedded_Clauses_Ratio <= clause_target_max
-                        logger.info(f"   - 문장길이 통과: {'✅' if length_pass else '❌'}, 내포절 통과: {'✅' if clause_pass else '❌'}")
-                
-            except Exception as e:
-                logger.error(f"병렬 분석 중 예기치 못한 오류: {str(e)}")
-                # 폴백: 순차 처리
-                logger.info("폴백: 순차 처리로 재시도...")
-                valid_candidates = await self._analyze_candidates_sequential(candidates, avg_target_min, avg_target_max, clause_target_min, clause_target_max)
+            # 통과 후보가 없으면 목표에 가장 가까운 후보를 기준으로 소규모 수정 재시도
+            if not valid_candidates and judged and settings.syntax_repair_max_rounds > 0:
+                if budget is not None and budget.near_limit():
+                    budget.degrade("syntax", "skip_repair", "근접 후보 수리 라운드 생략")
+                else:
+                    valid_candidates, repair = await self._repair_nearest_miss(
+                        judged, ranges, referential_clauses, len(plan) + 1, budget, settings.syntax_output_format
+                    )
+                    total_candidates_generated += repair["generated"]
+                    if diagnostics is not None:
+                        diagnostics["repair"] = repair
             
             # 통과한 후보가 없으면 실패
             if not valid_candidates:
@@ -176,28 +196,50 @@ class SyntaxFixer:
             
             logger.info(f"{len(valid_candidates)}개 후보가 구문 지표 통과")
             
+            # 어휘 비율도 목표 범위 안인(없으면 가장 가까운) 후보로 선택 범위를 좁혀 어휘 단계를 생략할 수 있게 함
+            pool = valid_candidates
+            if lexical_range is not None and settings.selection_prefer_lexical_pass:
+                pool, lexical_preference = self._prefer_lexical(valid_candidates, lexical_range)
+                if diagnostics is not None:
+                    diagnostics["lexical_preference"] = lexical_preference
+            
             # 통과한 후보들 중에서 최적 선택
-            if len(valid_candidates) == 1:
-                selected_candidate = valid_candidates[0]
-                logger.info(f"후보 {selected_candidate['index']}번만 통과하여 자동 선택 (temp={selected_candidate['temperature']})")
+            if len(pool) == 1:
+                selected_candidate = pool[0]
+                logger.info(f"후보 {selected_candidate['index']}번만 선택 대상이어서 자동 선택 (temp={selected_candidate['temperature']})")
             else:
-                # 여러 후보 중 LLM이 선택
-                candidate_texts = [item['text'] for item in valid_candidates]
-                selected_text = await self.selector.select_best(candidate_texts)
+                candidate_texts = [item['text'] for item in pool]
+                selection_args = (
+                    candidate_texts, text, [item['metrics'] for item in pool], ranges,
+                    current_metrics.get('CEFR_NVJD_A1A2_lemma_ratio'),
+                )
+                if budget is not None and self._selection_over_budget(candidate_texts, budget):
+                    # 예산 부족: LLM 선택 대신 휴리스틱 점수(원문 대비 수정량, 목표 중심 거리, 어휘 변화)가 가장 좋은 후보
+                    budget.degrade("selection", "heuristic_selection", "LLM 후보 선택 호출 생략")
+                    selected_text, selection = self.selector.select_heuristic_with_details(*selection_args)
+                elif settings.selection_strategy in ("local_first", "local"):
+                    # 휴리스틱 점수 차가 작은 경우에만 LLM 선택
+                    selected_text, selection = await self.selector.select_local_first(*selection_args)
+                else:
+                    # 여러 후보 중 LLM이 선택
+                    selected_text, selection = await self.selector.select_best_with_details(candidate_texts)
+                if diagnostics is not None and selection is not None:
+                    diagnostics["selection"] = selection.model_dump()
                 
                 # 선택된 텍스트에 해당하는 후보 찾기
                 selected_candidate = None
-                for candidate in valid_candidates:
+                for candidate in pool:
                     if candidate['text'] == selected_text:
                         selected_candidate = candidate
                         break
                 
                 if not selected_candidate:
-                    # 선택 실패 시 첫 번째 통과 후보 사용
-                    selected_candidate = valid_candidates[0]
+                    # 선택 실패 시 첫 번째 선택 대상 후보 사용
+                    selected_candidate = pool[0]
                     logger.warning("선택 실패로 첫 번째 통과 후보 사용")
                 
-                logger.info(f"LLM이 후보 {selected_candidate['index']}번 선택 (temp={selected_candidate['temperature']})")
+                decided_by = selection.decided_by if selection is not None else "fallback"
+                logger.info(f"후보 {selected_candidate['index']}번 선택 ({decided_by}, temp={selected_candidate['temperature']})")
             
             # 선택된 후보의 상세 지표 로깅
             selected_metrics = selected_candidate['metrics']
@@ -210,9 +252,6 @@ class SyntaxFixer:
             selected_metrics = selected_candidate['metrics']
             selected_evaluation = selected_candidate['evaluation']
             
-            # 전체 생성된 후보 수 계산
-            total_candidates_generated = len(self.temperatures) * self.candidates_per_temperature
-            
             logger.info(f"구문 수정 완료: {total_candidates_generated}개 생성 → {len(valid_candidates)}개 통과 → 1개 선택 (문제 지표: {problematic_metric})")
             return all_candidate_texts, selected_text, selected_metrics, selected_evaluation, total_candidates_generated
             
@@ -221,6 +260,584 @@ class SyntaxFixer:
             raise LLMAPIError(f"구문 수정 실패: {str(e)}")
     
 
+    async def _race_candidates(
+        self,
+        prompt: List[dict],
+        text: str,
+        plan: List[Tuple[float, int]],
+        abort_predicates: List[Any],
+        ranges: Tuple[float, float, float, float],
+        bandit_key: Optional[str] = None,
+        first_index: int = 1,
+        output_format: str = "passage",
+        screen: Optional[Screen] = None,
+        patch_scope: Optional[Set[int]] = None,
+        chunk_jobs: Optional[List[ChunkJob]] = None,
+        lexical_range: Optional[Tuple[float, float]] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        후보마다 생성 → 분석을 하나의 태스크로 실행하고 끝나는 순서대로 판정합니다.
+        통과 후보가 settings.syntax_stop_after_passing개 모이면 남은 생성/분석 태스크를 취소합니다.
+        lexical_range가 주어지면 어휘 비율도 범위 안인 통과 후보만 세어, 어휘 선호 선택(_prefer_lexical)이
+        고를 후보가 남도록 합니다.
+        통과 후보가 하나도 없으면 추정 지표만으로 사전 선별에서 탈락한 후보(near_miss)를 분석하여
+        통과 여부를 다시 판정하고, 근접 후보 수리의 기준 후보로도 쓸 수 있게 합니다.
+        
+        Args:
+            prompt: 구문 수정 메시지
+            text: 원문 (출력 예산 기준 및 예측 출력)
+            plan: 후보 생성 계획 [(temperature, temperature 내 번호)]
+            abort_predicates: 스트리밍 조기 중단 조건
+            ranges: (평균 문장 길이 최소, 최대, 내포절 비율 최소, 최대)
+            bandit_key: 주어지면 판정된 후보의 통과 여부를 후보 밴딧에 반영
+            first_index: 첫 후보 번호 (수리 라운드에서 번호를 이어 붙일 때)
+            output_format: "passage"(지문 전체) 또는 "patch"(문장 패치, text에 적용하여 후보 지문 구성)
+            screen: 분석 전 사전 선별 함수 (탈락 사유를 반환하면 분석하지 않고 실패 처리)
+            patch_scope: 패치로 수정할 수 있는 문장 번호 (발췌 프롬프트에 보낸 문장, None이면 제한 없음)
+            chunk_jobs: 주어지면 prompt 대신 청크별 프롬프트로 동시에 생성하여 이어 붙인 지문을 후보로 사용
+            lexical_range: 어휘 비율(CEFR A1A2) 목표 (최소, 최대) - 조기 중단 시 어휘도 범위 안인 통과 후보만 셈
+            
+        먼저 생성된 후보와 (근사) 중복인 후보는 분석하지 않고 대표 후보의 duplicates에 번호만 남깁니다.
+        
+        Returns:
+            (통과 후보 리스트 - 후보 번호 순, 분석까지 끝난 전체 후보 리스트, 진행 통계)
+        """
+        stop_after = settings.syntax_stop_after_passing
+        if current_collector() is not None:
+            # 배치 모드에서는 요청이 파일 단위로 함께 제출되어 조기 취소로 절감되는 것이 없음
+            stop_after = 0
+        
+        # 원문을 0번으로 등록하여 원문과 (거의) 같은 후보도 중복으로 처리
+        deduper = None
+        if settings.syntax_dedup_enabled:
+            deduper = CandidateDeduper()
+            deduper.register(0, text)
+        stop_label = "어휘 범위 안 통과" if lexical_range is not None else "통과"
+        logger.info(f"총 {len(plan)}개 후보 생성/분석 시작 ({stop_label} {stop_after or '전체'}개 확보 시 중단)")
+        pipelines = [
+            asyncio.create_task(self._generate_and_analyze(prompt, text, temp, num, first_index + i, abort_predicates, ranges, output_format, screen, deduper, patch_scope, chunk_jobs))
+            for i, (temp, num) in enumerate(plan)
+        ]
+        race = {
+            "planned": len(plan), "generated": 0, "duplicates": 0, "screened": 0, "analyzed": 0, "cancelled": 0,
+            "revisited": 0, "stop_after_passing": stop_after, "lexical_passing": 0,
+        }
+        provenance: Dict[int, List[int]] = {}  # 대표 후보 번호 → 중복으로 합쳐진 후보 번호
+        valid_candidates = []
+        judged = []
+        near_misses = []  # 추정 지표만으로 사전 선별 탈락한 후보
+        prompt_tokens = self._prompt_tokens(prompt, chunk_jobs)
+        try:
+            for finished in asyncio.as_completed(pipelines):
+                info = await finished
+                race["generated"] += info['text'] is not None
+                if info['duplicate_of'] is not None:
+                    race["duplicates"] += 1
+                    provenance.setdefault(info['duplicate_of'], []).append(info['index'])
+                    if bandit_key:
+                        # 중복 생성은 비용만 든 호출이므로 실패로 반영
+                        candidate_bandit.record(
+                            bandit_key, info['temperature'], False,
+                            prompt_tokens + token_budgeter.count_tokens(info['output'] or ""),
+                        )
+                    continue
+                race["screened"] += info['screened'] is not None
+                if info['screened'] is not None and info['screened'].near_miss:
+                    near_misses.append(info)
+                race["analyzed"] += info['evaluation'] is not None
+                if info['evaluation'] is not None:
+                    judged.append(info)
+                if bandit_key and (info['evaluation'] is not None or info['aborted'] or info['screened']):
+                    # 조기 중단(길이 초과/반복)되거나 사전 선별에서 탈락한 후보는 실패로 반영
+                    candidate_bandit.record(
+                        bandit_key, info['temperature'], info['passed'],
+                        prompt_tokens + token_budgeter.count_tokens(info['output'] or ""),
+                    )
+                if info['passed']:
+                    valid_candidates.append(info)
+                    stop_count = len(valid_candidates)
+                    if lexical_range is not None:
+                        race["lexical_passing"] += self._lexical_distance(info['metrics'], lexical_range) == 0.0
+                        stop_count = race["lexical_passing"]
+                    if stop_after and stop_count >= stop_after:
+                        break
+        finally:
+            # 조기 중단 또는 상위 취소: 진행 중인 생성/분석을 취소하고 정리될 때까지 대기
+            pending = [task for task in pipelines if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            race["cancelled"] = len(pending)
+            for info in judged:
+                info['duplicates'] = provenance.get(info['index'], [])
+            race["unchanged"] = provenance.get(0, [])
+        
+        if race["cancelled"]:
+            logger.info(f"통과 후보 {len(valid_candidates)}개 확보 → 남은 후보 {race['cancelled']}개 생성/분석 취소")
+        if not valid_candidates and near_misses:
+            # 로컬 추정 오차로 탈락했을 수 있으므로 분석하여 다시 판정 (통과하지 못해도 수리 기준 후보가 됨)
+            logger.info(f"통과 후보 없음 → 사전 선별 탈락 후보 {len(near_misses)}개 분석")
+            race["revisited"] = len(near_misses)
+            await asyncio.gather(*(self._analyze_info(info, ranges) for info in near_misses))
+            for info in near_misses:
+                if info['evaluation'] is not None:
+                    race["analyzed"] += 1
+                    judged.append(info)
+                if info['passed']:
+                    valid_candidates.append(info)
+        valid_candidates.sort(key=lambda item: item['index'])
+        return valid_candidates, judged, race
+
+    @staticmethod
+    def _abort_predicates(text: str, output_format: str) -> List[Any]:
+        """스트리밍 조기 중단 조건: 원문 대비 과도하게 길어지거나 반복되는 후보 (패치 형식은 JSON 시작 전 서두도 제한)"""
+        predicates = [
+            max_length_ratio(text, settings.syntax_stream_max_length_ratio),
+            repetition_guard(),
+        ]
+        if output_format == "patch":
+            predicates.append(json_prefix_guard())
+        return predicates
+
+    @staticmethod
+    def _build_focus(
+        text: str,
+        avg_current: Optional[float],
+        clause_current: Optional[float],
+        ranges: Tuple[float, float, float, float],
+        num_modifications: int,
+    ) -> Optional[SentenceFocus]:
+        """발췌 프롬프트 구성 (비활성화, 현재 지표 없음, 짧은 지문이면 None)"""
+        if not settings.syntax_focus_enabled or avg_current is None or clause_current is None:
+            return None
+        length_direction, clause_direction = metric_directions(avg_current, clause_current, ranges)
+        if length_direction is None and clause_direction is None:
+            return None
+        focus = build_focus(text, length_direction, clause_direction, abs(int(num_modifications)))
+        if focus is not None:
+            logger.info(f"발췌 프롬프트: 문장 {focus.total_sentences}개 중 {len(focus.visible_ids)}개 전송 (대상 {focus.targets})")
+        return focus
+
+    @staticmethod
+    def _plan_chunks(
+        text: str,
+        current_metrics: Dict[str, float],
+        mapped_metrics: Dict[str, float],
+        ranges: Tuple[float, float, float, float],
+        problematic_metric: str,
+        num_modifications: int,
+        prompt_type: str,
+        referential_clauses: str,
+        output_format: str,
+        joint_mission: Optional[str] = None,
+        joint_plan: Optional[Dict[str, Any]] = None,
+    ) -> Optional[List[ChunkJob]]:
+        """
+        청크 분할 수정 계획: 지문을 청크로 나누고 수정 수를 청크별 지표 기여도에 비례해 배분한 뒤 청크별 프롬프트 구성
+        (비활성화, 짧은 지문, 현재 지표 없음, 청크가 하나뿐이면 None)
+        
+        복합 수정(joint_plan)이면 길이/내포절 수정 수를 각각 배분하고, 청크마다 받은 수에 맞는 복합 미션 또는 단일 지표 프롬프트를 만든다.
+        """
+        if not settings.syntax_chunk_enabled:
+            return None
+        avg_current = current_metrics.get('AVG_SENTENCE_LENGTH')
+        clause_current = current_metrics.get('All_Embedded_Clauses_Ratio')
+        if avg_current is None or clause_current is None:
+            return None
+        if syntax_prescreener.estimate(text).word_count < settings.syntax_chunk_min_words:
+            return None
+        chunks = split_chunks(text, settings.syntax_chunk_max_words)
+        if len(chunks) < 2:
+            return None
+        avg_target_min, avg_target_max, clause_target_min, clause_target_max = ranges
+        
+        if joint_plan is not None and joint_mission is not None:
+            length_type = joint_plan['length']['prompt_type']
+            clause_type = joint_plan['clause']['prompt_type']
+            lengths = allocate_modifications(
+                chunks, "avg_sentence_length", length_type, joint_plan['length']['num_modifications'],
+                avg_current, avg_target_min, avg_target_max
+            )
+            clauses = allocate_modifications(
+                chunks, "all_embedded_clauses_ratio", clause_type, joint_plan['clause']['num_modifications'],
+                clause_current, clause_target_min, clause_target_max
+            )
+        elif 'length' in problematic_metric.lower():
+            length_type, clause_type = prompt_type, None
+            lengths = allocate_modifications(
+                chunks, problematic_metric, prompt_type, abs(int(num_modifications)), avg_current, avg_target_min, avg_target_max
+            )
+            clauses = [0] * len(chunks)
+        else:
+            length_type, clause_type = None, prompt_type
+            lengths = [0] * len(chunks)
+            clauses = allocate_modifications(
+                chunks, problematic_metric, prompt_type, abs(int(num_modifications)), clause_current, clause_target_min, clause_target_max
+            )
+        if not any(lengths) and not any(clauses):
+            return None
+        
+        jobs: List[ChunkJob] = []
+        for chunk, length_count, clause_count in zip(chunks, lengths, clauses):
+            mission = None
+            if length_count and clause_count:
+                chunk_plan = prompt_builder.plan_joint_modifications(
+                    avg_current, clause_current, *ranges, {}, counts=(length_count, clause_count)
+                )
+                metric, count, chunk_type = chunk_plan['problematic_metric'], chunk_plan['num_modifications'], chunk_plan['prompt_type']
+                mission = chunk_plan['joint_mission']
+            elif length_count:
+                metric, count, chunk_type = "avg_sentence_length", length_count, length_type
+            elif clause_count:
+                metric, count, chunk_type = "all_embedded_clauses_ratio", clause_count, clause_type
+            else:
+                jobs.append(ChunkJob(chunk=chunk, num_modifications=0))
+                continue
+            prompt = prompt_builder.build_syntax_prompt(
+                chunk.text, *ranges, mapped_metrics, metric, count, referential_clauses, chunk_type, output_format, mission
+            )
+            jobs.append(ChunkJob(chunk=chunk, num_modifications=count, problematic_metric=metric, prompt_type=chunk_type, prompt=prompt))
+        logger.info(
+            f"청크 분할 수정: {len(jobs)}개 청크 (단어 {[job.chunk.word_count for job in jobs]}, "
+            f"수정수 {[job.num_modifications for job in jobs]})"
+        )
+        return jobs
+
+    @staticmethod
+    def _prompt_tokens(prompt: Optional[List[dict]], chunk_jobs: Optional[List[ChunkJob]] = None) -> int:
+        """후보 1개 생성의 프롬프트 토큰 (청크 모드면 청크별 프롬프트 합)"""
+        if chunk_jobs is not None:
+            return sum(token_budgeter.count_message_tokens(job.prompt) for job in chunk_jobs if job.prompt is not None)
+        return token_budgeter.count_message_tokens(prompt)
+
+    @staticmethod
+    def _generation_task(output_format: str) -> str:
+        """후보 생성 태스크 (출력 예산/모델 라우팅 구분)"""
+        return TASK_SYNTAX_PATCH if output_format == "patch" else TASK_SYNTAX_GENERATE
+
+    @staticmethod
+    def _expected_output_tokens(text: str, output_format: str, chunk_jobs: Optional[List[ChunkJob]] = None) -> int:
+        """후보 1개 예상 출력 토큰 (지문 전체: 원문 길이, 패치: 패치 출력 예산, 청크 모드면 수정하는 청크별 합)"""
+        if chunk_jobs is not None:
+            return sum(
+                SyntaxFixer._expected_output_tokens(job.chunk.text, output_format)
+                for job in chunk_jobs if job.prompt is not None
+            )
+        if output_format == "patch":
+            return token_budgeter.output_budget(TASK_SYNTAX_PATCH, text)
+        return token_budgeter.count_tokens(text)
+
+    @staticmethod
+    def _prefer_lexical(
+        valid_candidates: List[Dict[str, Any]], lexical_range: Tuple[float, float]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        구문 통과 후보 중 어휘 비율(CEFR A1A2)도 목표 범위 안인 후보만 선택 대상으로 남김
+        범위 안 후보가 없으면 범위와의 거리가 가장 가까운 후보에서 settings.selection_lexical_closest_margin 이내인 후보를 남김
+        
+        Returns:
+            (선택 대상 후보 리스트, 진단 정보 - 어휘 통과 후보 번호, 선택 대상 번호, 후보별 범위 거리)
+        """
+        lexical_min, lexical_max = lexical_range
+        distances = {item['index']: SyntaxFixer._lexical_distance(item['metrics'], lexical_range) for item in valid_candidates}
+        lexical_passing = [item for item in valid_candidates if distances[item['index']] == 0.0]
+        if lexical_passing:
+            pool = lexical_passing
+        else:
+            closest = min(distances.values())
+            margin = settings.selection_lexical_closest_margin
+            pool = [item for item in valid_candidates if distances[item['index']] <= closest + margin] or valid_candidates
+        logger.info(
+            f"어휘 범위 [{lexical_min:.4f} ~ {lexical_max:.4f}] 기준 선택 대상: 후보 {[item['index'] for item in pool]} "
+            f"(어휘 통과 {[item['index'] for item in lexical_passing]})"
+        )
+        return pool, {
+            "lexical_passing": [item['index'] for item in lexical_passing],
+            "pool": [item['index'] for item in pool],
+            "distances": {index: (None if d == float("inf") else round(d, 4)) for index, d in distances.items()},
+        }
+
+    @staticmethod
+    def _lexical_distance(metrics: Any, lexical_range: Tuple[float, float]) -> float:
+        """어휘 비율(CEFR A1A2)이 목표 범위 밖으로 벗어난 거리 (범위 안이면 0, 지표가 없으면 무한대)"""
+        ratio = getattr(metrics, 'CEFR_NVJD_A1A2_lemma_ratio', None)
+        if ratio is None:
+            return float("inf")
+        lexical_min, lexical_max = lexical_range
+        return max(lexical_min - ratio, 0.0, ratio - lexical_max)
+
+    @staticmethod
+    def _range_distance(metrics: Any, ranges: Tuple[float, float, float, float]) -> float:
+        """목표 범위 밖으로 벗어난 정도 (지표별 범위 폭으로 정규화한 합, 범위 안이면 0)"""
+        avg_target_min, avg_target_max, clause_target_min, clause_target_max = ranges
+        distance = 0.0
+        for value, low, high in (
+            (metrics.AVG_SENTENCE_LENGTH, avg_target_min, avg_target_max),
+            (metrics.All_Embedded_Clauses_Ratio, clause_target_min, clause_target_max),
+        ):
+            width = max(high - low, 1e-6)
+            distance += max(low - value, 0.0, value - high) / width
+        return distance
+
+    async def _repair_nearest_miss(
+        self,
+        judged: List[Dict[str, Any]],
+        ranges: Tuple[float, float, float, float],
+        referential_clauses: str,
+        next_index: int,
+        budget: Optional[RequestBudget] = None,
+        output_format: str = "passage",
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        통과 후보가 없을 때 목표 범위에 가장 가까운 후보를 골라, 그 후보 자체의 지표로
+        수정 문장 수를 다시 계산하고 해당 후보만 소규모로 고치는 라운드를 반복합니다.
+        (최대 settings.syntax_repair_max_rounds회, 라운드당 settings.syntax_repair_candidates개)
+        
+        Args:
+            judged: 분석까지 끝난 후보 리스트 (_race_candidates 결과)
+            ranges: (평균 문장 길이 최소, 최대, 내포절 비율 최소, 최대)
+            referential_clauses: 참조용 절 정보
+            next_index: 수리 후보에 붙일 첫 번호
+            budget: 요청 단위 예산 (라운드 전 사용량이 저하 기준을 넘으면 중단)
+            output_format: 후보 출력 형식 ("passage" 또는 "patch")
+            
+        Returns:
+            (통과 후보 리스트, 수리 통계)
+        """
+        avg_target_min, avg_target_max, clause_target_min, clause_target_max = ranges
+        nearest = min(judged, key=lambda item: self._range_distance(item['metrics'], ranges))
+        repair: Dict[str, Any] = {"rounds": [], "generated": 0}
+        
+        for round_num in range(1, settings.syntax_repair_max_rounds + 1):
+            if budget is not None and budget.near_limit():
+                budget.degrade("syntax", "skip_repair", f"근접 후보 수리 {round_num}라운드 생략")
+                break
+            metrics = nearest['metrics']
+            analysis_result = {
+                'sentence_count': metrics.sentence_count or 0,
+                'lexical_tokens': metrics.lexical_tokens or 0,
+                'total_clause_sentences': metrics.total_clause_sentences or 0
+            }
+            length_fails = not (avg_target_min <= metrics.AVG_SENTENCE_LENGTH <= avg_target_max)
+            clause_fails = not (clause_target_min <= metrics.All_Embedded_Clauses_Ratio <= clause_target_max)
+            joint_mission = None
+            if settings.syntax_joint_mode and length_fails and clause_fails:
+                # 두 지표가 모두 벗어나 있으면 복합 계획으로 함께 수정
+                modification_params = prompt_builder.plan_joint_modifications(
+                    metrics.AVG_SENTENCE_LENGTH, metrics.All_Embedded_Clauses_Ratio, *ranges, analysis_result
+                )
+                problematic_metric = modification_params['problematic_metric']
+                joint_mission = modification_params['joint_mission']
+            else:
+                # 우선순위는 원문과 동일: 내포절 비율 > 평균 문장 길이
+                if clause_fails:
+                    problematic_metric, current_value = "all_embedded_clauses_ratio", metrics.All_Embedded_Clauses_Ratio
+                    target_min, target_max = clause_target_min, clause_target_max
+                else:
+                    problematic_metric, current_value = "avg_sentence_length", metrics.AVG_SENTENCE_LENGTH
+                    target_min, target_max = avg_target_min, avg_target_max
+                modification_params = prompt_builder.calculate_modification_count(
+                    problematic_metric, current_value, target_min, target_max, analysis_result
+                )
+            num_modifications = max(1, abs(int(modification_params['num_modifications'])))
+            prompt_type = modification_params['prompt_type']
+            distance = self._range_distance(metrics, ranges)
+            logger.info(f"🔁 근접 후보 수리 {round_num}라운드: 후보 {nearest['index']} 기준 "
+                        f"(거리={distance:.3f}, 문제지표={problematic_metric}, 수정수={num_modifications}, 타입={prompt_type})")
+            
+            base_text = nearest['text']
+            focus = self._build_focus(
+                base_text, metrics.AVG_SENTENCE_LENGTH, metrics.All_Embedded_Clauses_Ratio, ranges, num_modifications
+            )
+            prompt = prompt_builder.build_syntax_prompt(
+                base_text, avg_target_min, avg_target_max, clause_target_min, clause_target_max,
+                {
+                    'avg_sentence_length': metrics.AVG_SENTENCE_LENGTH,
+                    'all_embedded_clauses_ratio': metrics.All_Embedded_Clauses_Ratio
+                },
+                problematic_metric, num_modifications, referential_clauses, prompt_type, output_format, joint_mission, focus
+            )
+            round_format = "patch" if focus is not None else output_format
+            abort_predicates = self._abort_predicates(base_text, round_format)
+            screen = syntax_prescreener.screener(
+                ranges, base_text, metrics.AVG_SENTENCE_LENGTH, metrics.All_Embedded_Clauses_Ratio
+            )
+            plan = llm_client.candidate_plan(settings.syntax_repair_candidates)
+            valid_candidates, round_judged, race = await self._race_candidates(
+                prompt, base_text, plan, abort_predicates, ranges, first_index=next_index,
+                output_format=round_format, screen=screen, patch_scope=focus.visible_ids if focus is not None else None,
+            )
+            next_index += len(plan)
+            repair["generated"] += race["generated"]
+            repair["rounds"].append({
+                "round": round_num,
+                "base_candidate": nearest['index'],
+                "base_distance": round(distance, 4),
+                "problematic_metric": problematic_metric,
+                "num_modifications": num_modifications,
+                "prompt_type": prompt_type,
+                "generated": race["generated"],
+                "passed": len(valid_candidates),
+            })
+            if valid_candidates:
+                logger.info(f"근접 후보 수리 {round_num}라운드에서 {len(valid_candidates)}개 통과")
+                return valid_candidates, repair
+            # 더 가까워진 후보가 있으면 다음 라운드의 기준으로 사용
+            nearest = min([nearest] + round_judged, key=lambda item: self._range_distance(item['metrics'], ranges))
+        
+        return [], repair
+
+    async def _generate_and_analyze(
+        self,
+        prompt: List[dict],
+        text: str,
+        temperature: float,
+        temp_candidate_num: int,
+        index: int,
+        abort_predicates: List[Any],
+        ranges: Tuple[float, float, float, float],
+        output_format: str = "passage",
+        screen: Optional[Screen] = None,
+        deduper: Optional[CandidateDeduper] = None,
+        patch_scope: Optional[Set[int]] = None,
+        chunk_jobs: Optional[List[ChunkJob]] = None,
+    ) -> Dict[str, Any]:
+        """
+        후보 1개를 생성한 뒤 바로 분석합니다. (생성/분석 실패는 예외 대신 결과에 기록)
+        패치 형식이면 출력을 원문에 적용한 지문을 후보로 사용하며, 적용할 수 없는 패치는 실패로 처리합니다.
+        청크 모드(chunk_jobs)면 청크별로 동시에 생성해 이어 붙인 지문을 후보로 사용하며, 한 청크라도 실패하면 후보 실패입니다.
+        먼저 등록된 후보와 중복(deduper)이거나 screen이 탈락 사유를 반환한 후보는 외부 분석기를 호출하지 않습니다.
+        (추정 지표만 범위 밖인 탈락은 _race_candidates가 통과 후보가 없을 때 다시 분석)
+        
+        Returns:
+            후보 정보 (text, output, index, temperature, temp_candidate_num, metrics, evaluation, passed, aborted,
+            patched_sentences - 패치 형식에서 수정된 원문 문장 번호, screened - 사전 선별 탈락 사유,
+            duplicate_of - 중복인 경우 대표 후보 번호 (0이면 원문과 동일))
+        """
+        info = {
+            'text': None,
+            'output': None,
+            'index': index,
+            'temperature': temperature,
+            'temp_candidate_num': temp_candidate_num,
+            'metrics': None,
+            'evaluation': None,
+            'passed': False,
+            'aborted': False,
+            'patched_sentences': None,
+            'screened': None,
+            'duplicate_of': None
+        }
+        patch_mode = output_format == "patch"
+        try:
+            if chunk_jobs is not None:
+                candidate, output = await self._generate_chunks(chunk_jobs, temperature, output_format)
+            else:
+                # 수정은 국소적이므로 지문 전체 출력 시 원문을 예측 출력(prediction)으로 전달
+                output = await llm_client.generate_messages(
+                    prompt, temperature=temperature, task=self._generation_task(output_format),
+                    abort_predicates=abort_predicates, budget_reference=text, prediction=None if patch_mode else text
+                )
+                candidate = output
+        except Exception as e:
+            info['aborted'] = isinstance(e, (LLMStreamAbortedError, SentencePatchError))
+            logger.warning(f"후보 {index} 생성 실패 (temp={temperature}, {temp_candidate_num}/{self.candidates_per_temperature}): {str(e)}")
+            return info
+        info['output'] = output
+        if patch_mode and chunk_jobs is None:
+            try:
+                candidate, info['patched_sentences'] = apply_output(text, output, patch_scope)
+            except SentencePatchError as e:
+                info['aborted'] = True
+                logger.warning(f"후보 {index} 패치 적용 실패 (temp={temperature}): {str(e)}")
+                return info
+            logger.info(f"후보 {index} 패치 적용: 문장 {info['patched_sentences']} 수정")
+        info['text'] = candidate
+        
+        logger.info(f"=== 후보 {index} (temp={temperature}, {temp_candidate_num}/{self.candidates_per_temperature}) ===")
+        logger.info(f"길이: {len(candidate)}글자")
+        logger.info(f"처음 100글자: {candidate[:100]}...")
+        logger.info(f"마지막 100글자: ...{candidate[-100:]}")
+        
+        if deduper is not None and not is_placeholder(candidate):
+            info['duplicate_of'] = deduper.register(index, candidate)
+            if info['duplicate_of'] is not None:
+                source = "원문" if info['duplicate_of'] == 0 else f"후보 {info['duplicate_of']}"
+                logger.info(f"후보 {index}: {source}과(와) 중복, 분석 생략")
+                return info
+        
+        if screen is not None:
+            info['screened'] = screen(candidate)
+            if info['screened']:
+                logger.info(f"후보 {index}: 사전 선별 탈락, 분석 생략 ❌ ({info['screened']})")
+                return info
+        
+        await self._analyze_info(info, ranges)
+        return info
+
+    async def _analyze_info(self, info: Dict[str, Any], ranges: Tuple[float, float, float, float]) -> None:
+        """후보 정보(info['text'])를 외부 분석기로 분석하여 metrics/evaluation/passed를 채웁니다. (분석 실패 시 그대로 둠)"""
+        avg_target_min, avg_target_max, clause_target_min, clause_target_max = ranges
+        index, temperature = info['index'], info['temperature']
+        try:
+            candidate_metrics, candidate_evaluation = await self._analyze_candidate_with_ranges(
+                info['text'], avg_target_min, avg_target_max, clause_target_min, clause_target_max
+            )
+        except Exception as e:
+            logger.warning(f"후보 {index} 분석 실패: {str(e)}")
+            return
+        info['metrics'] = candidate_metrics
+        info['evaluation'] = candidate_evaluation
+        info['passed'] = candidate_evaluation.syntax_pass == "PASS"
+        
+        if info['passed']:
+            logger.info(f"후보 {index}: 구문 지표 통과 ✅ (temp={temperature})")
+            logger.info(f"   - 평균 문장 길이: {candidate_metrics.AVG_SENTENCE_LENGTH:.3f}")
+            logger.info(f"   - 내포절 비율: {candidate_metrics.All_Embedded_Clauses_Ratio:.3f}")
+        else:
+            logger.info(f"후보 {index}: 구문 지표 실패 ❌ (temp={temperature})")
+            logger.info(f"   - 평균 문장 길이: {candidate_metrics.AVG_SENTENCE_LENGTH:.3f} (목표: {avg_target_min:.2f}-{avg_target_max:.2f})")
+            logger.info(f"   - 내포절 비율: {candidate_metrics.All_Embedded_Clauses_Ratio:.3f} (목표: {clause_target_min:.3f}-{clause_target_max:.3f})")
+            
+            length_pass = avg_target_min <= candidate_metrics.AVG_SENTENCE_LENGTH <= avg_target_max
+            clause_pass = clause_target_min <= candidate_metrics.All_Embedded_Clauses_Ratio <= clause_target_max
+            logger.info(f"   - 문장길이 통과: {'✅' if length_pass else '❌'}, 내포절 통과: {'✅' if clause_pass else '❌'}")
+
+    async def _generate_chunks(self, chunk_jobs: List[ChunkJob], temperature: float, output_format: str) -> Tuple[str, str]:
+        """
+        청크별 수정을 동시에 생성하여 이어 붙입니다. (수정 수가 배분되지 않은 청크는 원문 유지)
+        한 청크라도 생성/패치 적용에 실패하면 나머지 청크 생성을 취소하고 예외를 그대로 발생시킵니다.
+        
+        Returns:
+            (이어 붙인 후보 지문, 청크별 LLM 출력을 이어 붙인 문자열)
+        """
+        patch_mode = output_format == "patch"
+        
+        async def _revise(job: ChunkJob) -> Tuple[str, str]:
+            if job.prompt is None:
+                return job.chunk.text, ""
+            output = await llm_client.generate_messages(
+                job.prompt, temperature=temperature, task=self._generation_task(output_format),
+                abort_predicates=self._abort_predicates(job.chunk.text, output_format),
+                budget_reference=job.chunk.text, prediction=None if patch_mode else job.chunk.text
+            )
+            if patch_mode:
+                revised, _ = apply_output(job.chunk.text, output)
+                return revised, output
+            return output, output
+        
+        results = await gather_in_task_group(*(_revise(job) for job in chunk_jobs))
+        candidate = stitch([job.chunk for job in chunk_jobs], [revised for revised, _ in results])
+        return candidate, "\n".join(output for _, output in results if output)
+
+    def _selection_over_budget(self, candidate_texts: List[str], budget: RequestBudget) -> bool:
+        """LLM 선택 호출을 생략해야 하는지 (예산 사용량이 저하 기준 이상이거나 선택 호출 1회를 감당할 수 없음)"""
+        if budget.near_limit():
+            return True
+        prompt_tokens = sum(token_budgeter.count_tokens(t) for t in candidate_texts) + 200  # 후보 + 지시문
+        return budget.affordable_calls(TASK_SELECT, prompt_tokens, 1, 1) == 0
+
     async def _analyze_candidate(self, candidate: str, master: MasterMetrics, tolerance_abs: ToleranceAbs, tolerance_ratio: ToleranceRatio) -> Tuple[Dict[str, float], Dict[str, str]]:
         """
         단일 후보를 분석하여 지표와 평가 결과를 반환합니다.
@@ -278,65 +895,6 @@ class SyntaxFixer:
             logger.error(f"후보 분석 실패: {str(e)}")
             raise
 
-    async def _analyze_candidates_sequential(self, candidates: List[str], avg_target_min: float, avg_target_max: float, clause_target_min: float, clause_target_max: float) -> List[Dict[str, Any]]:
-        """
-        순차적으로 후보를 분석하여 통과한 후보만 반환합니다.
-        
-        Args:
-            candidates: 분석할 후보 텍스트 리스트
-            avg_target_min: 평균 문장 길이 목표 최소값
-            avg_target_max: 평균 문장 길이 목표 최대값
-            clause_target_min: 내포절 비율 목표 최소값
-            clause_target_max: 내포절 비율 목표 최대값
-            
-        Returns:
-            통과한 후보들의 정보를 담은 리스트
-        """
-        valid_candidates = []
-        for i, candidate in enumerate(candidates):
-            try:
-                # Temperature별 정보 계산
-                temp_index = i // self.candidates_per_temperature
-                candidate_index_in_temp = (i % self.candidates_per_temperature) + 1
-                temp_value = self.temperatures[temp_index] if temp_index < len(self.temperatures) else "Unknown"
-                
-                logger.info(f"후보 {i+1} 분석 중... (temp={temp_value}, {candidate_index_in_temp}/{self.candidates_per_temperature})")
-                
-                # 후보 텍스트 분석
-                raw_analysis = await analyzer.analyze(candidate, include_syntax=True)
-                candidate_metrics = metrics_extractor.extract(raw_analysis)
-                candidate_evaluation = judge.evaluate_with_ranges(
-                    candidate_metrics.model_dump(), avg_target_min, avg_target_max,
-                    clause_target_min, clause_target_max
-                )
-                
-                # 구문 지표 통과 여부 확인
-                if candidate_evaluation.syntax_pass == "PASS":
-                    valid_candidates.append({
-                        'text': candidate,
-                        'index': i + 1,
-                        'temperature': temp_value,
-                        'temp_candidate_num': candidate_index_in_temp,
-                        'metrics': candidate_metrics,
-                        'evaluation': candidate_evaluation
-                    })
-                    logger.info(f"후보 {i+1}: 구문 지표 통과 ✅ (temp={temp_value})")
-                    logger.info(f"   - 평균 문장 길이: {candidate_metrics.AVG_SENTENCE_LENGTH:.3f}")
-                    logger.info(f"   - 내포절 비율: {candidate_metrics.All_Embedded_Clauses_Ratio:.3f}")
-                else:
-                    logger.info(f"후보 {i+1}: 구문 지표 실패 ❌ (temp={temp_value})")
-                    logger.info(f"   - 평균 문장 길이: {candidate_metrics.AVG_SENTENCE_LENGTH:.3f} (목표: {avg_target_min:.2f}-{avg_target_max:.2f})")
-                    logger.info(f"   - 내포절 비율: {candidate_metrics.All_Embedded_Clauses_Ratio:.3f} (목표: {clause_target_min:.3f}-{clause_target_max:.3f})")
-                    
-                    length_pass = avg_target_min <= candidate_metrics.AVG_SENTENCE_LENGTH <= avg_target_max
-                    clause_pass = clause_target_min <= candidate_metrics.All_Embedded_Clauses_Ratio <= clause_target_max
-                    logger.info(f"   - 문장길이 통과: {'✅' if length_pass else '❌'}, 내포절 통과: {'✅' if clause_pass else '❌'}")
-                    
-            except Exception as e:
-                logger.warning(f"후보 {i+1} 분석 실패: {str(e)}")
-                continue
-        return valid_candidates
-
 
 # 전역 구문 수정기 인스턴스
 syntax_fixer = SyntaxFixer() 
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""LLM 호출 태스크 식별자
+
+사용량 집계, 모델 라우팅 등에서 호출 종류를 구분하기 위한 태그.
+"""
+
+TASK_SYNTAX_GENERATE = "syntax_generate"   # 구문 수정 후보 생성
+TASK_SYNTAX_PATCH = "syntax_patch"         # 구문 수정 후보 생성 (문장 패치 출력)
+TASK_SELECT = "select"                     # 후보 선택
+TASK_SELECT_SECOND_OPINION = "select_second_opinion"  # 후보 선택 확신도가 낮을 때 재선택
+TASK_LEXICAL = "lexical"                   # 어휘 수정 후보 생성
+TASK_PROFILE = "profile"                   # semantic profile 1차 생성
+TASK_PROFILE_SUBTOPIC2 = "profile_subtopic2"  # semantic profile 2차(subtopic_2) 생성
+TASK_CLOSENESS = "closeness"               # topic closeness 채점
+TASK_DEFAULT = "default"
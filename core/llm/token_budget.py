@@ -0,0 +1,121 @@
+"""태스크별 출력 토큰 예산 (max_tokens) 산정
+
+모든 호출에 settings.llm_max_output_tokens(4096)를 그대로 보내면 공급자가 그만큼을 TPM에서
+선점하므로 동시 처리량이 줄어든다. 태스크별 설정(settings.llm_output_budgets)에 따라
+- fixed: 고정 예산 (선택 번호, subtopic_2 이름, 점수 JSON 등)
+- ratio/min: 기준 텍스트(수정 대상 지문) 토큰 수 × ratio, 최소 min
+으로 max_tokens를 정하고, 응답이 잘리면(finish_reason == "length") 예산을 늘려 재시도한다.
+
+토큰 수는 tiktoken이 있으면 모델 토크나이저로, 없으면 글자 수 기반 추정으로 계산한다.
+tiktoken 인코딩은 처음 로드할 때 BPE 파일을 내려받을 수 있으므로(동기 호출), 서버 시작 시 warm_up()을
+별도 스레드에서 실행해 설정된 모델의 인코딩을 미리 로드한다 (main.py).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from config.settings import settings
+from core.llm.usage import estimate_tokens
+from utils.logging import logger
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성
+    tiktoken = None
+
+# 메시지 하나당 역할/구분자 오버헤드 (대략치)
+_TOKENS_PER_MESSAGE = 4
+
+
+class TokenBudgeter:
+    """토큰 수 계산 및 태스크별 max_tokens 산정"""
+
+    def __init__(self):
+        self._encodings: Dict[str, Any] = {}
+        self._tokenizer_unavailable = tiktoken is None
+        self.truncation_retries = 0
+
+    def _encoding_for(self, model: Optional[str]):
+        if self._tokenizer_unavailable:
+            return None
+        key = model or settings.openai_model
+        if key not in self._encodings:
+            try:
+                try:
+                    self._encodings[key] = tiktoken.encoding_for_model(key)
+                except KeyError:
+                    self._encodings[key] = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                # 인코딩 파일을 받을 수 없는 환경 등: 이후에는 추정치만 사용
+                logger.warning(f"tiktoken 인코딩 로드 실패, 글자 수 기반 추정으로 대체: {e}")
+                self._tokenizer_unavailable = True
+                return None
+        return self._encodings[key]
+
+    def warm_up(self, models: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        인코딩 미리 로드 (동기 - 이벤트 루프에서는 asyncio.to_thread로 호출)
+
+        Args:
+            models: 로드할 모델 목록 (None이면 settings.openai_model과 태스크별 모델 체인 전체)
+
+        Returns:
+            인코딩을 로드한 모델 목록 (토크나이저를 쓸 수 없으면 빈 리스트)
+        """
+        if models is None:
+            models = [settings.openai_model, *(m for chain in settings.llm_task_models.values() for m in chain)]
+        loaded = [model for model in dict.fromkeys(models) if self._encoding_for(model) is not None]
+        if loaded:
+            logger.info(f"tiktoken 인코딩 로드 완료: {loaded}")
+        return loaded
+
+    def count_tokens(self, text: str, model: Optional[str] = None) -> int:
+        encoding = self._encoding_for(model)
+        if encoding is None:
+            return estimate_tokens(text)
+        return len(encoding.encode(text or "", disallowed_special=()))
+
+    def count_message_tokens(self, messages: List[dict], model: Optional[str] = None) -> int:
+        return sum(
+            _TOKENS_PER_MESSAGE + self.count_tokens(str(m.get("content", "")), model) for m in messages
+        )
+
+    def logit_bias_for(self, tokens: List[str], model: Optional[str] = None, bias: int = 100) -> Optional[Dict[str, int]]:
+        """주어진 문자열들만 출력되도록 하는 logit_bias. 토크나이저가 없거나 단일 토큰이 아닌 문자열이 있으면 None"""
+        encoding = self._encoding_for(model)
+        if encoding is None:
+            return None
+        ids = [encoding.encode(t, disallowed_special=()) for t in tokens]
+        if any(len(i) != 1 for i in ids):
+            return None
+        return {str(i[0]): bias for i in ids}
+
+    def output_budget(self, task: str, reference_text: Optional[str] = None, model: Optional[str] = None) -> int:
+        """태스크의 출력 토큰 예산. reference_text가 없으면 ratio 방식 태스크는 min 값을 사용"""
+        cap = settings.llm_max_output_tokens
+        config = settings.llm_output_budgets.get(task)
+        if not config:
+            return cap
+        if "fixed" in config:
+            return max(1, min(cap, int(config["fixed"])))
+        reference_tokens = self.count_tokens(reference_text, model) if reference_text else 0
+        budget = max(int(config.get("min", 0)), int(reference_tokens * float(config.get("ratio", 1.0))))
+        return max(1, min(cap, budget))
+
+    def next_budget(self, task: str, current: int) -> Optional[int]:
+        """잘린 응답 재시도용 예산 (current × 배수, 상한 도달 시 None)"""
+        cap = settings.llm_max_output_tokens
+        if current >= cap:
+            return None
+        self.truncation_retries += 1
+        grown = min(cap, max(current + 1, int(current * settings.llm_truncation_budget_multiplier)))
+        logger.warning(f"출력 토큰 예산 초과로 응답이 잘림 (task={task}): max_tokens {current} → {grown} 재시도")
+        return grown
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokenizer": "heuristic" if self._tokenizer_unavailable else "tiktoken",
+            "truncation_retries": self.truncation_retries,
+        }
+
+
+# 전역 토큰 예산 인스턴스
+token_budgeter = TokenBudgeter()
@@ -0,0 +1,202 @@
+"""LLM 토큰 사용량 및 비용 집계
+
+- 호출 단위로 response.usage를 기록 (task, request_id, model 태그)
+- 요청 범위(request_scope) 내 기록을 합산하여 단계별/요청별 요약 제공
+- 프로세스 전역 누적 카운터 제공 (/metrics/llm-usage)
+"""
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config.settings import settings
+from utils.logging import logger
+
+
+@dataclass
+class UsageRecord:
+    """단일 LLM 호출 사용량"""
+    task: str
+    model: str
+    request_id: Optional[str]
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    aborted: bool = False  # 스트리밍 조기 중단 (토큰 수는 추정치)
+    accepted_prediction_tokens: int = 0  # Predicted Outputs: 예측과 일치하여 채택된 토큰
+    rejected_prediction_tokens: int = 0  # Predicted Outputs: 채택되지 않은 예측 토큰 (출력 토큰으로 과금)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def _empty_summary() -> Dict[str, Any]:
+    return {
+        "calls": 0, "aborted_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0,
+        "accepted_prediction_tokens": 0, "rejected_prediction_tokens": 0, "cost_usd": 0.0,
+    }
+
+
+def _add_to_summary(summary: Dict[str, Any], record: UsageRecord) -> None:
+    summary["calls"] += 1
+    if record.aborted:
+        summary["aborted_calls"] += 1
+    summary["prompt_tokens"] += record.prompt_tokens
+    summary["completion_tokens"] += record.completion_tokens
+    summary["total_tokens"] += record.total_tokens
+    summary["accepted_prediction_tokens"] += record.accepted_prediction_tokens
+    summary["rejected_prediction_tokens"] += record.rejected_prediction_tokens
+    summary["cost_usd"] = round(summary["cost_usd"] + record.cost_usd, 6)
+
+
+def estimate_tokens(text: str) -> int:
+    """usage가 없는 경우(스트림 중단 등)를 위한 대략적인 토큰 수 추정 (영문 기준 4글자 ≈ 1토큰)"""
+    return (len(text or "") + 3) // 4
+
+
+class RequestUsage:
+    """요청 하나(request_id)에 대한 사용량 누적"""
+
+    def __init__(self, request_id: Optional[str]):
+        self.request_id = request_id
+        self.records: List[UsageRecord] = []
+
+    def mark(self) -> int:
+        """현재 기록 위치 반환 (단계별 합산 시작점으로 사용)"""
+        return len(self.records)
+
+    def summary(self, since: int = 0) -> Dict[str, Any]:
+        """since 위치 이후 기록을 합산 (task/model별 내역 포함)"""
+        total = _empty_summary()
+        by_task: Dict[str, Dict[str, Any]] = {}
+        models = set()
+        for record in self.records[since:]:
+            _add_to_summary(total, record)
+            _add_to_summary(by_task.setdefault(record.task, _empty_summary()), record)
+            models.add(record.model)
+        total["by_task"] = by_task
+        total["models"] = sorted(models)
+        return total
+
+
+class UsageTracker:
+    """LLM 사용량 기록기 (전역 카운터 + 요청 범위 누적)"""
+
+    def __init__(self):
+        self._current: contextvars.ContextVar[Optional[RequestUsage]] = contextvars.ContextVar(
+            "llm_request_usage", default=None
+        )
+        self._counters: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._cancellations: Dict[str, Dict[str, int]] = {}
+
+    @contextmanager
+    def request_scope(self, request_id: Optional[str]) -> Iterator[RequestUsage]:
+        """with 블록 안(및 그 안에서 생성된 태스크)의 LLM 호출을 request_id로 묶어 누적"""
+        usage = RequestUsage(request_id)
+        token = self._current.set(usage)
+        try:
+            yield usage
+        finally:
+            self._current.reset(token)
+
+    def current(self) -> Optional[RequestUsage]:
+        return self._current.get()
+
+    def calculate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """settings.llm_model_pricing(USD / 1M tokens) 기준 비용 계산. 모델명은 최장 접두어로 매칭"""
+        pricing = None
+        matched = ""
+        for name, price in settings.llm_model_pricing.items():
+            if model.startswith(name) and len(name) > len(matched):
+                matched, pricing = name, price
+        if not pricing:
+            return 0.0
+        return (
+            prompt_tokens * float(pricing.get("input", 0.0))
+            + completion_tokens * float(pricing.get("output", 0.0))
+        ) / 1_000_000
+
+    def record(self, task: str, model: str, usage: Any, aborted: bool = False, cost_multiplier: float = 1.0) -> Optional[UsageRecord]:
+        """OpenAI 응답의 usage 객체를 기록. usage가 없으면 무시 (cost_multiplier: Batch API 할인 등)"""
+        if usage is None:
+            return None
+        try:
+            prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+            completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+            details = getattr(usage, "completion_tokens_details", None)
+            accepted = int(getattr(details, "accepted_prediction_tokens", 0) or 0)
+            rejected = int(getattr(details, "rejected_prediction_tokens", 0) or 0)
+        except Exception as e:
+            logger.warning(f"usage 파싱 실패: {e}")
+            return None
+
+        scope = self.current()
+        record = UsageRecord(
+            task=task,
+            model=model,
+            request_id=scope.request_id if scope else None,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=self.calculate_cost(model, prompt_tokens, completion_tokens) * cost_multiplier,
+            aborted=aborted,
+            accepted_prediction_tokens=accepted,
+            rejected_prediction_tokens=rejected,
+        )
+        if scope is not None:
+            scope.records.append(record)
+        _add_to_summary(self._counters.setdefault((task, model), _empty_summary()), record)
+        logger.info(
+            f"LLM 사용량 [{task}/{model}] request_id={record.request_id}: "
+            f"prompt={prompt_tokens}, completion={completion_tokens}, cost=${record.cost_usd:.6f}"
+        )
+        return record
+
+    def record_estimated(self, task: str, model: str, messages: List[Dict[str, Any]], completion_text: str, aborted: bool = True) -> Optional[UsageRecord]:
+        """usage를 받지 못한 호출(스트림 조기 중단 등)을 글자 수 기반 추정치로 기록"""
+        prompt_text = "".join(str(m.get("content", "")) for m in messages)
+        usage = SimpleNamespace(
+            prompt_tokens=estimate_tokens(prompt_text),
+            completion_tokens=estimate_tokens(completion_text),
+        )
+        return self.record(task, model, usage, aborted=aborted)
+
+    def record_cancelled(self, task: str, sent: bool, saved_prompt_tokens: int, saved_completion_tokens: int) -> None:
+        """
+        요청 취소(클라이언트 연결 종료)로 중단된 호출 기록 (절감 토큰은 추정치)
+
+        Args:
+            sent: 공급자에 이미 전송된 호출인지 (전송 전이면 프롬프트 토큰도 절감)
+            saved_prompt_tokens: 절감된 프롬프트 토큰 (전송 전 취소 시)
+            saved_completion_tokens: 생성되지 않은 출력 토큰 (max_tokens 기준 잔여량)
+        """
+        counter = self._cancellations.setdefault(task, {
+            "cancelled_calls": 0, "cancelled_before_send": 0,
+            "saved_prompt_tokens": 0, "saved_completion_tokens": 0,
+        })
+        counter["cancelled_calls"] += 1
+        if not sent:
+            counter["cancelled_before_send"] += 1
+        counter["saved_prompt_tokens"] += max(0, int(saved_prompt_tokens))
+        counter["saved_completion_tokens"] += max(0, int(saved_completion_tokens))
+
+    def cancellation_stats(self) -> Dict[str, Any]:
+        """취소된 호출 수와 절감 토큰 추정치 (태스크별 + 합계)"""
+        total = {"cancelled_calls": 0, "cancelled_before_send": 0, "saved_prompt_tokens": 0, "saved_completion_tokens": 0}
+        for counter in self._cancellations.values():
+            for key in total:
+                total[key] += counter[key]
+        total["saved_tokens"] = total["saved_prompt_tokens"] + total["saved_completion_tokens"]
+        return {**total, "by_task": {task: dict(c) for task, c in sorted(self._cancellations.items())}}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """프로세스 시작 이후 누적 카운터 (task, model 단위)"""
+        return [
+            {"task": task, "model": model, **counter}
+            for (task, model), counter in sorted(self._counters.items())
+        ]
+
+
+# 전역 사용량 기록기 인스턴스
+usage_tracker = UsageTracker()
@@ -0,0 +1,136 @@
+"""구문 후보 로컬 사전 선별 (외부 분석기 호출 전)
+
+외부 분석기(analyzer.analyze) 호출은 후보마다 수 초가 걸리므로, 로컬 추정만으로도 목표 범위를
+확실히 벗어난 후보는 분석 없이 탈락시킨다.
+- 정규식 문장 분할 + 단어 수로 평균 문장 길이 추정
+- 접속사/관계사 표지가 있는 문장 비율로 내포절 비율 추정
+- 분석기 값을 아는 기준 지문(원문 또는 수리 기준 후보)으로 보정: 평균 문장 길이는 비율, 내포절 비율은 차이
+- 추정 오차를 감안해 목표 범위에 여유(settings.syntax_prescreen_*_margin)를 두고, 그 밖일 때만 탈락
+- 생성 실패 자리표시자("[생성 실패: ...]"), 빈 출력, 원문보다 크게 짧아진(잘린) 출력도 탈락
+- 추정 지표만 범위 밖인 탈락(near_miss)은 통과 후보가 없을 때 분석 대상으로 되살린다 (core/llm/syntax_fixer.py)
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+from config.settings import settings
+from core.llm.dedup import is_placeholder
+
+
+
+@dataclass
+class ScreenReject:
+    """사전 선별 탈락 사유"""
+    reason: str
+    near_miss: bool = False  # 추정 지표만 범위 밖 (분석하면 통과하거나 수리 기준 후보가 될 수 있음)
+
+    def __str__(self) -> str:
+        return self.reason
+
+
+Screen = Callable[[str], Optional[ScreenReject]]  # 후보 → 탈락 사유 (통과면 None)
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])["\'”’)\]]*\s+(?=["\'“‘(\[]?[A-Z0-9])|\s*\n\s*')
+_WORD = re.compile(r"[A-Za-z0-9]+(?:['’-][A-Za-z0-9]+)*")
+# 부사절/명사절/관계절 표지
+_SUBORDINATE = re.compile(
+    r"\b(?:because|although|though|while|whereas|when|whenever|if|unless|since|until|before|after|"
+    r"once|as soon as|so that|even if|whether|that|which|who|whom|whose|where|what|how|why)\b",
+    flags=re.IGNORECASE,
+)
+# 등위절 표지 (쉼표/세미콜론 뒤 등위 접속사)
+_COORDINATE = re.compile(r"(?:,\s*(?:and|but|or|so|yet)\b|;)", flags=re.IGNORECASE)
+
+
+@dataclass
+class SyntaxEstimate:
+    """로컬 구문 지표 추정값"""
+    sentence_count: int
+    word_count: int
+    avg_sentence_length: float
+    clause_ratio: float
+
+
+class SyntaxPrescreener:
+    """정규식 기반 구문 지표 추정 및 후보 사전 선별"""
+
+    @property
+    def enabled(self) -> bool:
+        return settings.syntax_prescreen_enabled
+
+    @staticmethod
+    def word_count(sentence: str) -> int:
+        return len(_WORD.findall(sentence))
+
+    @staticmethod
+    def has_clause(sentence: str) -> bool:
+        """종속절/관계절/등위절 표지가 있는 문장인지"""
+        return bool(_SUBORDINATE.search(sentence) or _COORDINATE.search(sentence))
+
+    def estimate(self, text: str) -> SyntaxEstimate:
+        sentences = [s for s in _SENTENCE_SPLIT.split(text.strip()) if _WORD.search(s)]
+        word_count = sum(self.word_count(s) for s in sentences)
+        clause_sentences = sum(1 for s in sentences if self.has_clause(s))
+        count = len(sentences)
+        return SyntaxEstimate(
+            sentence_count=count,
+            word_count=word_count,
+            avg_sentence_length=word_count / count if count else 0.0,
+            clause_ratio=clause_sentences / count if count else 0.0,
+        )
+
+    def screener(
+        self,
+        ranges: Tuple[float, float, float, float],
+        reference_text: Optional[str] = None,
+        reference_avg: Optional[float] = None,
+        reference_clause: Optional[float] = None,
+    ) -> Optional[Screen]:
+        """
+        목표 범위에 대한 사전 선별 함수 생성
+
+        Args:
+            ranges: (평균 문장 길이 최소, 최대, 내포절 비율 최소, 최대)
+            reference_text: 분석기 지표를 알고 있는 기준 지문 (보정 및 잘림 판정용)
+            reference_avg: 기준 지문의 분석기 평균 문장 길이
+            reference_clause: 기준 지문의 분석기 내포절 비율
+
+        Returns:
+            후보 → 탈락 사유(통과면 None) 함수, 비활성화 시 None
+        """
+        if not self.enabled:
+            return None
+        avg_min, avg_max, clause_min, clause_max = ranges
+        avg_scale, clause_offset, reference_words = 1.0, 0.0, 0
+        if reference_text:
+            reference = self.estimate(reference_text)
+            reference_words = reference.word_count
+            if reference_avg and reference.avg_sentence_length:
+                avg_scale = min(2.0, max(0.5, reference_avg / reference.avg_sentence_length))
+            if reference_clause is not None and reference.sentence_count:
+                clause_offset = max(-0.3, min(0.3, reference_clause - reference.clause_ratio))
+        avg_margin = settings.syntax_prescreen_avg_margin
+        clause_margin = settings.syntax_prescreen_clause_margin
+        min_length_ratio = settings.syntax_prescreen_min_length_ratio
+
+        def _screen(candidate: str) -> Optional[ScreenReject]:
+            if is_placeholder(candidate):
+                return ScreenReject("빈 출력 또는 생성 실패 자리표시자")
+            estimate = self.estimate(candidate)
+            if not estimate.sentence_count:
+                return ScreenReject("문장 없음")
+            if reference_words and estimate.word_count < reference_words * min_length_ratio:
+                return ScreenReject(f"출력 잘림 의심 (단어 {estimate.word_count}개, 기준 {reference_words}개)")
+            avg = estimate.avg_sentence_length * avg_scale
+            if avg < avg_min * (1 - avg_margin) or avg > avg_max * (1 + avg_margin):
+                return ScreenReject(f"평균 문장 길이 추정 {avg:.2f} (목표 {avg_min:.2f}-{avg_max:.2f})", near_miss=True)
+            clause = estimate.clause_ratio + clause_offset
+            if clause < clause_min - clause_margin or clause > clause_max + clause_margin:
+                return ScreenReject(f"내포절 비율 추정 {clause:.3f} (목표 {clause_min:.3f}-{clause_max:.3f})", near_miss=True)
+            return None
+
+        return _screen
+
+
+# 전역 구문 사전 선별기 인스턴스
+syntax_prescreener = SyntaxPrescreener()
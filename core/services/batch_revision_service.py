@@ -0,0 +1,154 @@
+"""Batch API 기반 오프라인 리비전 서비스
+
+대량(수천 건) 리비전을 OpenAI Batch API로 처리한다. 각 항목은 기존 fix_revise_single을 그대로
+실행하되, 배치 모드 컨텍스트 안에서 LLM 호출이 BatchCollector에 적재되어 라운드 단위로 제출된다.
+결과가 도착하면 각 항목은 멈췄던 단계(구문 생성 → 선택 → 어휘 생성)부터 이어서 진행된다.
+LLM 호출은 항목 전체를 라운드로 모아야 하므로 항목 수는 제한하지 않고, 배치로 묶이지 않는 외부 분석기
+호출만 요청의 max_concurrent개로 제한한다. 끝난 작업은 settings.batch_api_job_ttl_seconds 뒤에 삭제한다.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+from config.settings import settings
+from core.analyzer import analyzer
+from core.llm.batch_api import BatchCollector, LocalBatchBackend, OpenAIBatchBackend, batch_mode
+from core.llm.client import llm_client
+from core.services.text_processing_service_v2 import text_processing_service
+from models.request import BatchSyntaxFixRequest, SyntaxFixRequest
+from models.response import BatchSyntaxFixResponse, BatchReviseJobResponse, SyntaxFixResponse
+from utils.exceptions import LLMAPIError
+from utils.logging import logger
+
+
+class BatchRevisionJob:
+    """Batch API 리비전 작업 상태"""
+
+    def __init__(self, request: BatchSyntaxFixRequest):
+        self.job_id = f"revise_{uuid.uuid4().hex[:12]}"
+        self.request = request
+        self.status = "queued"  # queued → running → completed | failed
+        self.completed_items = 0
+        self.collector: Optional[BatchCollector] = None
+        self.result: Optional[BatchSyntaxFixResponse] = None
+        self.error_message: Optional[str] = None
+        self.finished_at: Optional[float] = None  # 완료/실패 시각 (보관 기간 기준)
+
+    def to_response(self) -> BatchReviseJobResponse:
+        return BatchReviseJobResponse(
+            job_id=self.job_id,
+            status=self.status,
+            total_items=len(self.request.items),
+            completed_items=self.completed_items,
+            batches_submitted=self.collector.batches_submitted if self.collector else 0,
+            requests_submitted=self.collector.requests_submitted if self.collector else 0,
+            result=self.result,
+            error_message=self.error_message,
+        )
+
+
+class BatchRevisionService:
+    """Batch API 리비전 작업 관리"""
+
+    def __init__(self):
+        self.jobs: Dict[str, BatchRevisionJob] = {}
+        self._tasks: Set[asyncio.Task] = set()  # 실행 중인 작업 태스크 (가비지 컬렉션 방지용 참조)
+
+    def _create_backend(self):
+        if settings.batch_api_backend == "local":
+            return LocalBatchBackend()
+        if not llm_client.client:
+            raise LLMAPIError("OpenAI 클라이언트가 초기화되지 않아 Batch API를 사용할 수 없습니다")
+        return OpenAIBatchBackend(llm_client.client)
+
+    def submit_job(self, request: BatchSyntaxFixRequest) -> BatchRevisionJob:
+        """작업을 등록하고 백그라운드에서 실행"""
+        self._evict_expired()
+        job = BatchRevisionJob(request)
+        self.jobs[job.job_id] = job
+        task = asyncio.create_task(self._run_job(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"[batch:{job.job_id}] 작업 등록: {len(request.items)}개 항목")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[BatchRevisionJob]:
+        self._evict_expired()
+        return self.jobs.get(job_id)
+
+    def _evict_expired(self) -> None:
+        """보관 기간이 지난 끝난 작업 삭제"""
+        cutoff = time.time() - settings.batch_api_job_ttl_seconds
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+        if expired:
+            logger.info(f"[batch] 보관 기간이 지난 작업 {len(expired)}개 삭제")
+
+    async def _run_job(self, job: BatchRevisionJob) -> None:
+        start = time.time()
+        job.status = "running"
+        try:
+            results = await self.run_items(job, job.request.items)
+            successful_items = sum(1 for r in results if r.overall_success)
+            job.result = BatchSyntaxFixResponse(
+                request_id=job.request.request_id,
+                overall_success=successful_items == len(results),
+                total_items=len(results),
+                successful_items=successful_items,
+                failed_items=len(results) - successful_items,
+                results=results,
+                total_processing_time=time.time() - start,
+            )
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"[batch:{job.job_id}] 작업 실패: {e}")
+            job.status = "failed"
+            job.error_message = str(e)
+        finally:
+            job.finished_at = time.time()
+
+    async def run_items(self, job: BatchRevisionJob, items: List[SyntaxFixRequest]) -> List[SyntaxFixResponse]:
+        """모든 항목을 배치 모드로 동시에 진행시키고, 수집기가 라운드별로 LLM 요청을 제출한다.
+        (항목마다 호출하는 외부 분석기는 배치되지 않으므로 동시 호출 수를 요청의 max_concurrent로 제한)"""
+        collector = BatchCollector(job.job_id, self._create_backend())
+        job.collector = collector
+
+        def _on_done(_task: asyncio.Task) -> None:
+            job.completed_items += 1
+
+        max_concurrent = job.request.max_concurrent or text_processing_service.max_concurrent
+        with batch_mode(collector), analyzer.concurrency_limit(max_concurrent):
+            item_tasks = [asyncio.create_task(text_processing_service.fix_revise_single(item)) for item in items]
+        for task in item_tasks:
+            task.add_done_callback(_on_done)
+
+        flusher = asyncio.create_task(collector.run())
+        try:
+            results = await asyncio.gather(*item_tasks, return_exceptions=True)
+        finally:
+            collector.stop()
+            await flusher
+
+        processed: List[SyntaxFixResponse] = []
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                logger.error(f"[batch:{job.job_id}] 항목 {item.request_id} 실패: {result}")
+                processed.append(SyntaxFixResponse(
+                    request_id=item.request_id,
+                    overall_success=False,
+                    original_text=item.text,
+                    final_text=None,
+                    revision_success=False,
+                    step_results=[],
+                    total_processing_time=0.0,
+                    error_message=str(result)
+                ))
+            else:
+                processed.append(result)
+        return processed
+
+
+# 전역 Batch API 리비전 서비스 인스턴스
+batch_revision_service = BatchRevisionService()
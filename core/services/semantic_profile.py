@@ -6,7 +6,10 @@ from typing import Dict, List, Any, Optional
 import yaml
 import re
 from core.llm.client import llm_client_for_profile
+from core.llm.tasks import TASK_PROFILE, TASK_PROFILE_SUBTOPIC2
+from core.llm.usage import usage_tracker
 from config.profile_gen_prompt import SEMANTIC_PROFILE_GEN_TEMPLATE, SUBTOPIC2_GEN_TEMPLATE
+from utils.helpers import gather_in_task_group
 from utils.logging import logger
 
 
@@ -34,7 +37,7 @@ async def generate_semantic_profile_for_passage(passage_text: str) -> Dict[str,
 	logger.info(f"📝 1차 프롬프트:\n{prompt_1}")
 	logger.info("=" * 80)
 	# ------------------------------------------------------------
-	first_pass_text = await llm_client_for_profile.generate_text(prompt_1, output_schema=_OUTPUT_SCHEMA)
+	first_pass_text = await llm_client_for_profile.generate_text(prompt_1, output_schema=_OUTPUT_SCHEMA, task=TASK_PROFILE)
 	profile = _parse_first_pass_profile(first_pass_text)
 	print("first_pass_text", first_pass_text)
 	# print("profile", profile)
@@ -63,7 +66,7 @@ async def generate_semantic_profile_for_passage(passage_text: str) -> Dict[str,
 	logger.info("=" * 80)
 	# ------------------------------------------------------------
 	# print("prompt_2", prompt_2)
-	subtopic_2 = (await llm_client_for_profile.generate_text(prompt_2)).strip()
+	subtopic_2 = (await llm_client_for_profile.generate_text(prompt_2, task=TASK_PROFILE_SUBTOPIC2)).strip()
 	print("subtopic_2", subtopic_2)
 
 	# 4) 결합
@@ -79,12 +82,18 @@ async def generate_semantic_profile_for_passage(passage_text: str) -> Dict[str,
 	return profile
 
 
-async def generate_semantic_profiles_batch(passages: List[str]) -> List[Dict[str, Any]]:
+async def generate_semantic_profiles_batch(passages: List[str], request_ids: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
 	"""
 	여러 지문에 대해 병렬로 의미 프로필을 생성한다.
+	request_ids가 주어지면 지문별 LLM 사용량을 해당 request_id로 집계한다.
 	"""
-	tasks = [generate_semantic_profile_for_passage(p) for p in passages]
-	results = await asyncio.gather(*tasks, return_exceptions=True)
+	async def _one(passage: str, request_id: Optional[str]) -> Dict[str, Any]:
+		with usage_tracker.request_scope(request_id):
+			return await generate_semantic_profile_for_passage(passage)
+
+	ids = request_ids or [None] * len(passages)
+	tasks = [_one(p, rid) for p, rid in zip(passages, ids)]
+	results = await gather_in_task_group(*tasks, return_exceptions=True)
 	final: List[Dict[str, Any]] = []
 	for res in results:
 		if isinstance(res, Exception):
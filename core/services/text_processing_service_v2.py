@@ -9,6 +9,10 @@ from core.judge import judge
 from core.llm.syntax_fixer import syntax_fixer
 from core.llm.lexical_fixer import lexical_fixer
 from core.llm.prompt_builder import prompt_builder
+from core.llm.usage import usage_tracker, RequestUsage
+from config.settings import settings
+from core.llm.request_budget import RequestBudget
+from utils.helpers import gather_in_task_group
 from utils.logging import logger
 # import nltk
 # nltk.download('punkt')
@@ -22,7 +26,23 @@ class TextProcessingService:
     async def fix_revise_single(self, request: SyntaxFixRequest) -> SyntaxFixResponse:
         """
         결합 리비전: 구문 수정 → 구문 결과 분석 → 어휘 통과 여부 확인 → 필요 시 어휘 단계로 분기
+        요청 단위 LLM 토큰 사용량/비용을 응답의 token_usage에 합산하고,
+        항목 예산(RequestBudget)에 따라 적용된 품질 저하를 degradations에 기록한다.
         """
+        with usage_tracker.request_scope(request.request_id) as usage:
+            budget = RequestBudget.for_request(usage, request.max_tokens_budget, request.max_cost_usd)
+            response = await self._fix_revise_single(request, usage, budget)
+        response.token_usage = usage.summary()
+        response.token_usage["budget"] = budget.summary()
+        response.degradations = budget.degradations
+        logger.info(
+            f"[revise] LLM 사용량 request_id={request.request_id}: "
+            f"{response.token_usage['total_tokens']} tokens, ${response.token_usage['cost_usd']:.6f}"
+        )
+        return response
+
+    async def _fix_revise_single(self, request: SyntaxFixRequest, usage: RequestUsage, budget: RequestBudget) -> SyntaxFixResponse:
+        """fix_revise_single 본체 (usage: 단계별 사용량 합산용 요청 범위 누적기, budget: 항목 예산)"""
         total_start_time = time.time()
         step_results = []
         try:
@@ -164,6 +184,7 @@ class TextProcessingService:
 
                 # 구문 수정 시작 시간 측정
                 syntax_fix_start_time = time.time()
+                syntax_usage_mark = usage.mark()
                 try:
                     # 문제 지표 계산
                     problematic_metric = prompt_builder.determine_problematic_metric(
@@ -201,6 +222,24 @@ class TextProcessingService:
                     clause_target_min = request.master.All_Embedded_Clauses_Ratio - tolerance_ratio.All_Embedded_Clauses_Ratio
                     clause_target_max = request.master.All_Embedded_Clauses_Ratio + tolerance_ratio.All_Embedded_Clauses_Ratio
 
+                    # 두 지표가 모두 범위 밖이면 한 번의 복합 수정으로 함께 고침
+                    joint_plan = None
+                    length_fails = not (avg_target_min <= original_metrics.AVG_SENTENCE_LENGTH <= avg_target_max)
+                    clause_fails = not (clause_target_min <= original_metrics.All_Embedded_Clauses_Ratio <= clause_target_max)
+                    if settings.syntax_joint_mode and length_fails and clause_fails:
+                        joint_plan = prompt_builder.plan_joint_modifications(
+                            original_metrics.AVG_SENTENCE_LENGTH, original_metrics.All_Embedded_Clauses_Ratio,
+                            avg_target_min, avg_target_max, clause_target_min, clause_target_max, analysis_result
+                        )
+                        problematic_metric = joint_plan['problematic_metric']
+                        num_modifications = joint_plan['num_modifications']
+                        prompt_type = joint_plan['prompt_type']
+
+                    # 어휘 목표 범위: 구문 통과 후보 중 어휘도 통과하는 후보를 우선 선택하여 어휘 단계를 생략
+                    lex_target_min = request.master.CEFR_NVJD_A1A2_lemma_ratio - tolerance_ratio.CEFR_NVJD_A1A2_lemma_ratio
+                    lex_target_max = request.master.CEFR_NVJD_A1A2_lemma_ratio + tolerance_ratio.CEFR_NVJD_A1A2_lemma_ratio
+
+                    syntax_diagnostics: Dict[str, Any] = {}
                     candidates, selected_text, final_metrics, final_evaluation, total_candidates_generated = await syntax_fixer.fix_syntax_with_params(
                         text=request.text,
                         avg_target_min=avg_target_min,
@@ -211,14 +250,17 @@ class TextProcessingService:
                         num_modifications=num_modifications,
                         problematic_metric=problematic_metric,
                         referential_clauses=referential_clauses,
-                        prompt_type=prompt_type
+                        prompt_type=prompt_type,
+                        diagnostics=syntax_diagnostics,
+                        budget=budget,
+                        joint_mission=joint_plan['joint_mission'] if joint_plan else None,
+                        joint_plan=joint_plan,
+                        lexical_range=(lex_target_min, lex_target_max)
                     )
                     candidates_generated = total_candidates_generated
                     candidates_passed = len(candidates)
 
                     # 최종 선택된 후보의 어휘 통과 여부는 final_metrics에서 직접 계산하여 재분석을 피함
-                    lex_target_min = request.master.CEFR_NVJD_A1A2_lemma_ratio - tolerance_ratio.CEFR_NVJD_A1A2_lemma_ratio
-                    lex_target_max = request.master.CEFR_NVJD_A1A2_lemma_ratio + tolerance_ratio.CEFR_NVJD_A1A2_lemma_ratio
                     lex_current = final_metrics.CEFR_NVJD_A1A2_lemma_ratio
                     selected_candidate_lexical_pass = "PASS" if lex_target_min <= lex_current <= lex_target_max else "FAIL"
 
@@ -243,12 +285,21 @@ class TextProcessingService:
                             "skipped": False,
                             "candidates_generated": candidates_generated,
                             "candidates_passed": candidates_passed,
+                            "problematic_metric": problematic_metric,
+                            "joint_plan": {k: joint_plan[k] for k in ("num_modifications", "prompt_type", "length", "clause")} if joint_plan else None,
                             "selected_candidate_lexical": {
                                 "lexical_pass": selected_candidate_lexical_pass,
                                 "cefr_a1a2_ratio": lex_current,
                                 "target_min": lex_target_min,
                                 "target_max": lex_target_max
-                            }
+                            },
+                            "selection": syntax_diagnostics.get("selection"),
+                            "lexical_preference": syntax_diagnostics.get("lexical_preference"),
+                            "race": syntax_diagnostics.get("race"),
+                            "repair": syntax_diagnostics.get("repair"),
+                            "chunks": syntax_diagnostics.get("chunks"),
+                            "focus": syntax_diagnostics.get("focus"),
+                            "token_usage": usage.summary(since=syntax_usage_mark)
                         }
                     ))
                     
@@ -274,6 +325,7 @@ class TextProcessingService:
                         status=f"[revise] syntax revision FAIL - {str(e)}",
                         success=False,
                         processing_time=time.time() - syntax_fix_start_time,
+                        details={"token_usage": usage.summary(since=syntax_usage_mark)},
                         error_message=str(e)
                     ))
                     # 구문 수정 실패 시 조기 반환
@@ -328,12 +380,42 @@ class TextProcessingService:
                     total_processing_time=total_time
                 )
 
-            # 7) 어휘 수정 단계 (lexical_fixer 연동)
+            # 7) 예산 사용량이 저하 기준을 넘었으면 어휘 단계 생략 (구문 결과로 종료)
+            if budget.near_limit():
+                budget.degrade("lexical", "skip_lexical", "예산 사용량이 저하 기준을 넘어 어휘 수정 단계 생략")
+                step_results.append(StepResult(
+                    step_name="어휘 수정",
+                    status="[revise] vocab revision skipped (budget)",
+                    success=False,
+                    processing_time=0.0,
+                    details={
+                        "skipped": True,
+                        "reason": "항목 예산 부족으로 스킵",
+                        "budget": budget.summary()
+                    }
+                ))
+                total_time = time.time() - total_start_time
+                return SyntaxFixResponse(
+                    request_id=request.request_id,
+                    overall_success=True,
+                    original_text=request.text,
+                    final_text=selected_text,
+                    revision_success=False,
+                    step_results=step_results,
+                    original_metrics=original_metrics_dict,
+                    final_metrics=final_metrics_dict,
+                    candidates_generated=candidates_generated,
+                    candidates_passed=candidates_passed,
+                    total_processing_time=total_time
+                )
+
+            # 8) 어휘 수정 단계 (lexical_fixer 연동)
             logger.info("=" * 80)
             logger.info("📚 [REVISE] 어휘 수정 단계 시작")
             logger.info("=" * 80)
             
             t3=time.time()
+            lexical_usage_mark = usage.mark()
             try:
                 # 분기별 텍스트 및 지표 소스 결정
                 if original_evaluation.syntax_pass == "PASS":
@@ -385,7 +467,8 @@ class TextProcessingService:
                     direction=lex_direction,
                     nvjd_total_lemma_count=nvjd_total,
                     nvjd_a1a2_lemma_count=nvjd_a1a2,
-                    cefr_breakdown=src_metrics.cefr_breakdown
+                    cefr_breakdown=src_metrics.cefr_breakdown,
+                    budget=budget
                 )
 
                 logger.info("=" * 80)
@@ -411,7 +494,8 @@ class TextProcessingService:
                         "direction": lex_direction,
                         "lexical_candidates_generated": lex_candidates_generated,
                         "lexical_candidates": lex_metrics.get('lexical_candidates'),
-                        "lexical_sheet_data_merged": lex_metrics.get('lexical_sheet_data_merged')
+                        "lexical_sheet_data_merged": lex_metrics.get('lexical_sheet_data_merged'),
+                        "token_usage": usage.summary(since=lexical_usage_mark)
                     }
                 ))
 
@@ -436,6 +520,7 @@ class TextProcessingService:
                     status=f"[revise] vocab revision FAIL - {str(e)}",
                     success=False,
                     processing_time=time.time() - t3,
+                    details={"token_usage": usage.summary(since=lexical_usage_mark)},
                     error_message=str(e)
                 ))
 
@@ -487,7 +572,7 @@ class TextProcessingService:
                 return await self.fix_revise_single(item)
 
         tasks = [process_item(item) for item in items]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await gather_in_task_group(*tasks, return_exceptions=True)
 
         processed: List[SyntaxFixResponse] = []
         for i, r in enumerate(results):
@@ -3,6 +3,8 @@ from pathlib import Path
 from typing import Dict, Any, List, Union
 
 from core.llm.client import llm_client_for_profile
+from core.llm.tasks import TASK_CLOSENESS
+from core.llm.usage import usage_tracker
 from config.labeling_prompt import TOPIC_LABELING_PROMPT
 from core.services.semantic_profile import generate_semantic_profile_for_passage
 
@@ -22,7 +24,7 @@ async def score_topic_closeness(original_profile: Dict[str, Any], generated_prof
 	)
 	print("prompt", prompt)
 	# LLM에는 점수만(JSON) 받도록 response_format 사용
-	llm_result = await llm_client_for_profile.generate_text(prompt, output_schema=_CLOSENESS_SCHEMA)
+	llm_result = await llm_client_for_profile.generate_text(prompt, output_schema=_CLOSENESS_SCHEMA, task=TASK_CLOSENESS)
 	
 	print("llm_result", llm_result)
 	def _parse_scoring_json(s: str) -> Dict[str, Any]:
@@ -177,7 +179,8 @@ async def generate_and_score_batch(items: List[Dict[str, Any]]) -> List[Dict[str
 			orig = item.get("original_semantic_profile", {}) or {}
 			passage = item.get("passage_text", "") or ""
 			request_id = item.get("request_id")
-			res = await generate_and_score(orig, passage)
+			with usage_tracker.request_scope(request_id):
+				res = await generate_and_score(orig, passage)
 			if request_id is not None:
 				res["request_id"] = request_id
 			return res
@@ -1,8 +1,12 @@
+import asyncio
 from fastapi import FastAPI
 from api.router import router as pipeline_router
 from api.analyzer import router as analyzer_router
 from utils.logging import setup_logging
 from config.settings import settings
+from core.llm.routing import model_router
+from core.llm.candidate_bandit import candidate_bandit
+from core.llm.token_budget import token_budgeter
 import os
 
 # 로깅 초기화
@@ -19,6 +23,18 @@ app.include_router(pipeline_router)
 # app.include_router(analyzer_router)
 
 
+@app.on_event("startup")
+async def warm_up_tokenizer():
+    """tiktoken 인코딩 미리 로드 (첫 요청에서 BPE 파일 다운로드로 이벤트 루프가 멈추지 않도록 스레드에서 실행)"""
+    await asyncio.to_thread(token_budgeter.warm_up)
+
+
+@app.on_event("shutdown")
+async def save_runtime_state():
+    """종료 시 후보 밴딧 상태 저장 (재시작 후 이어서 사용)"""
+    candidate_bandit.save()
+
+
 @app.get("/", include_in_schema=False)
 async def read_root():
     return {
@@ -38,6 +54,7 @@ async def health_check():
             "debug": settings.debug,
             "external_api": settings.external_analyzer_api_url,
             "llm_model": settings.openai_model,
+            "llm_task_models": model_router.describe()["tasks"],
             # 키 값은 절대 노출하지 않고, 설정 여부만 반환
             "openai_api_key_configured": bool((settings.openai_api_key or os.getenv("OPENAI_API_KEY") or "").strip())
         }
@@ -52,6 +52,17 @@ class LLMCandidate(BaseModel):
     index: int
 
 
+class SelectionResult(BaseModel):
+    """후보 선택 결과 (logprobs 기반 선택 시 후보별 확률 분포 포함)"""
+    selected_index: int  # 1부터 시작
+    mode: str  # "logprobs", "text" 또는 "heuristic"
+    distribution: Dict[int, float] = {}  # 후보 번호 → 확률
+    margin: Optional[float] = None  # 1위와 2위 확률 차이 (heuristic: 점수 차이)
+    decided_by: str = "llm"  # "llm" | "tie_break" | "second_opinion" | "heuristic"
+    second_opinion_distribution: Optional[Dict[int, float]] = None
+    heuristic_scores: Optional[Dict[int, float]] = None  # 후보 번호 → 휴리스틱 점수 (낮을수록 좋음)
+
+
 class LLMResponse(BaseModel):
     """LLM 응답 모델"""
     candidates: List[LLMCandidate]
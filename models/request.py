@@ -39,6 +39,8 @@ class SyntaxFixRequest(BaseModel):
     text: str = Field(description="수정할 텍스트") 
     master: MasterMetrics = Field(description="마스터 지표")
     referential_clauses: str = Field(default="", description="참조용 절 정보")
+    max_tokens_budget: Optional[int] = Field(default=None, description="항목당 LLM 토큰 상한 (미지정 시 서버 기본값, 0이면 무제한)")
+    max_cost_usd: Optional[float] = Field(default=None, description="항목당 LLM 비용 상한 USD (미지정 시 서버 기본값, 0이면 무제한)")
 
 
 
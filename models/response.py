@@ -78,6 +78,12 @@ class SyntaxFixResponse(BaseModel):
     candidates_passed: int = Field(default=0, description="통과한 후보 수")
     total_processing_time: float = Field(description="총 처리 시간 (초)")
     
+    # LLM 사용량 (calls, prompt/completion/total tokens, cost_usd, by_task)
+    token_usage: Optional[Dict[str, Any]] = Field(default=None, description="LLM 토큰 사용량 및 비용 합계")
+    
+    # 예산 초과 방지를 위해 적용된 품질 저하 (stage, action, detail)
+    degradations: List[Dict[str, Any]] = Field(default_factory=list, description="적용된 품질 저하 내역")
+    
     # 에러 정보
     error_message: Optional[str] = Field(default=None, description="전체 에러 메시지")
     
@@ -125,4 +131,15 @@ class BatchSyntaxFixResponse(BaseModel):
     failed_items: int = Field(description="실패한 항목 수")
     results: List[SyntaxFixResponse] = Field(description="각 항목별 처리 결과")
     total_processing_time: float = Field(description="총 처리 시간 (초)")
-    error_message: Optional[str] = Field(default=None, description="전체 에러 메시지") 
\ No newline at end of file
+    error_message: Optional[str] = Field(default=None, description="전체 에러 메시지") 
+
+class BatchReviseJobResponse(BaseModel):
+    """Batch API 리비전 작업 상태 응답 모델"""
+    job_id: str = Field(description="작업 ID")
+    status: str = Field(description="작업 상태 (queued, running, completed, failed)")
+    total_items: int = Field(description="총 항목 수")
+    completed_items: int = Field(default=0, description="처리 완료된 항목 수")
+    batches_submitted: int = Field(default=0, description="제출된 Batch API 배치 수")
+    requests_submitted: int = Field(default=0, description="배치로 제출된 LLM 요청 수")
+    result: Optional[BatchSyntaxFixResponse] = Field(default=None, description="완료 시 배치 리비전 결과")
+    error_message: Optional[str] = Field(default=None, description="작업 에러 메시지")
@@ -0,0 +1,145 @@
+"""프롬프트 템플릿 컴파일 리포트 및 A/B 실행
+
+템플릿별로 원문/컴파일본 토큰 수를 비교하고, 필요하면 컴파일본을 파일로 내보내거나
+같은 입력을 원문/컴파일본 프롬프트로 각각 처리하여 통과율과 프롬프트 토큰을 비교한다.
+
+실행:
+    # 템플릿별 토큰 리포트
+    python scripts/compile_prompts.py
+
+    # 컴파일된 템플릿을 디렉터리에 저장 (리뷰/diff 용)
+    python scripts/compile_prompts.py --write build/prompts
+
+    # A/B: /revise 입력(SyntaxFixRequest) 목록을 원문/컴파일본으로 각각 처리
+    #   모의 서버 사용 시 OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=mock
+    #   지표 계산에는 EXTERNAL_ANALYZER_API_URL의 분석기가 필요
+    python scripts/compile_prompts.py --ab items.json --limit 20
+"""
+
+import sys, os
+# Ensure project root is on sys.path when running as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from config.settings import settings
+from config.syntax_revision_prompt import SYNTAX_USER_INPUT_TEMPLATE, SYNTAX_PROMPT_INCREASE, SYNTAX_PROMPT_DECREASE
+from config.lexical_revision_prompt import Lexical_USER_INPUT_TEMPLATE, LEXICAL_FIXING_PROMPT_INCREASE, LEXICAL_FIXING_PROMPT_DECREASE
+from core.llm.prompt_compiler import prompt_compiler
+from core.llm.token_budget import token_budgeter
+
+# prompt_builder에서 컴파일하여 사용하는 템플릿
+TEMPLATES: Dict[str, str] = {
+    "SYNTAX_PROMPT_INCREASE": SYNTAX_PROMPT_INCREASE,
+    "SYNTAX_PROMPT_DECREASE": SYNTAX_PROMPT_DECREASE,
+    "SYNTAX_USER_INPUT_TEMPLATE": SYNTAX_USER_INPUT_TEMPLATE,
+    "LEXICAL_FIXING_PROMPT_INCREASE": LEXICAL_FIXING_PROMPT_INCREASE,
+    "LEXICAL_FIXING_PROMPT_DECREASE": LEXICAL_FIXING_PROMPT_DECREASE,
+    "Lexical_USER_INPUT_TEMPLATE": Lexical_USER_INPUT_TEMPLATE,
+}
+
+
+def token_report() -> List[Dict[str, Any]]:
+    rows = []
+    for name, template in TEMPLATES.items():
+        raw = token_budgeter.count_tokens(template)
+        compiled = token_budgeter.count_tokens(prompt_compiler.compile_text(template))
+        rows.append({
+            "template": name,
+            "raw_tokens": raw,
+            "compiled_tokens": compiled,
+            "saved": raw - compiled,
+            "saved_pct": round((raw - compiled) / raw * 100, 1) if raw else 0.0,
+        })
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    print(f"tokenizer: {token_budgeter.stats()['tokenizer']}")
+    print(f"{'template':<34}{'raw':>8}{'compiled':>10}{'saved':>8}{'%':>7}")
+    for row in rows:
+        print(f"{row['template']:<34}{row['raw_tokens']:>8}{row['compiled_tokens']:>10}{row['saved']:>8}{row['saved_pct']:>7}")
+    raw_total = sum(r["raw_tokens"] for r in rows)
+    saved_total = sum(r["saved"] for r in rows)
+    print(f"{'TOTAL':<34}{raw_total:>8}{raw_total - saved_total:>10}{saved_total:>8}"
+          f"{round(saved_total / raw_total * 100, 1) if raw_total else 0.0:>7}")
+
+
+def write_compiled(directory: str) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for name, template in TEMPLATES.items():
+        with open(os.path.join(directory, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write(prompt_compiler.compile_text(template) + "\n")
+    print(f"{len(TEMPLATES)}개 템플릿 저장: {directory}")
+
+
+async def _run_variant(items: List[Any], compiled: bool) -> Dict[str, Any]:
+    from core.services.text_processing_service_v2 import text_processing_service
+
+    settings.prompt_compile_enabled = compiled
+    prompt_compiler.clear_cache()
+    results = await text_processing_service.fix_revise_batch(items)
+    usages = [r.token_usage or {} for r in results]
+    return {
+        "items": len(results),
+        "passed": sum(1 for r in results if r.revision_success),
+        "candidates_passed": sum(r.candidates_passed for r in results),
+        "candidates_generated": sum(r.candidates_generated for r in results),
+        "prompt_tokens": sum(u.get("prompt_tokens", 0) for u in usages),
+        "total_tokens": sum(u.get("total_tokens", 0) for u in usages),
+        "cost_usd": round(sum(u.get("cost_usd", 0.0) for u in usages), 6),
+    }
+
+
+async def run_ab(path: str, limit: int = None) -> None:
+    from models.request import SyntaxFixRequest
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    raw_items = data.get("items", data) if isinstance(data, dict) else data
+    items = [SyntaxFixRequest(**item) for item in raw_items][:limit]
+
+    original_setting = settings.prompt_compile_enabled
+    try:
+        results = {
+            "raw": await _run_variant(items, compiled=False),
+            "compiled": await _run_variant(items, compiled=True),
+        }
+    finally:
+        settings.prompt_compile_enabled = original_setting
+        prompt_compiler.clear_cache()
+
+    print(f"{'':<22}{'raw':>12}{'compiled':>12}")
+    for key in results["raw"]:
+        print(f"{key:<22}{results['raw'][key]:>12}{results['compiled'][key]:>12}")
+    for name, r in results.items():
+        rate = r["passed"] / r["items"] * 100 if r["items"] else 0.0
+        print(f"{name} pass rate: {rate:.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="프롬프트 템플릿 컴파일 리포트 / A/B 실행")
+    parser.add_argument("--json", action="store_true", help="토큰 리포트를 JSON으로 출력")
+    parser.add_argument("--write", metavar="DIR", help="컴파일된 템플릿을 DIR에 저장")
+    parser.add_argument("--ab", metavar="ITEMS_JSON", help="SyntaxFixRequest 목록(또는 {\"items\": [...]})으로 A/B 실행")
+    parser.add_argument("--limit", type=int, default=None, help="A/B 실행 항목 수 제한")
+    args = parser.parse_args()
+
+    rows = token_report()
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print_report(rows)
+    if args.write:
+        write_compiled(args.write)
+    if args.ab:
+        asyncio.run(run_ab(args.ab, args.limit))
+
+
+if __name__ == "__main__":
+    main()
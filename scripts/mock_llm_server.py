@@ -0,0 +1,218 @@
+"""OpenAI 호환 모의 LLM 서버 (오프라인 벤치마크용)
+
+core.llm.mock_responder로 태스크별 결정적 응답을 생성한다. 서버 쪽 .env에
+OPENAI_BASE_URL=http://localhost:8001/v1 (OPENAI_API_KEY는 아무 값) 을 설정하면
+LLMClient가 이 서버를 사용한다.
+
+실행:
+    python scripts/mock_llm_server.py --port 8001
+
+환경 변수로 동작 조정:
+    MOCK_LLM_SEED                응답 시드 (기본 0)
+    MOCK_LLM_LATENCY_MS          응답 기본 지연 (기본 300)
+    MOCK_LLM_LATENCY_JITTER_MS   지연 무작위 편차 상한 (기본 200)
+    MOCK_LLM_TOKENS_PER_SEC      출력 토큰 생성 속도, 0이면 무시 (기본 80)
+    MOCK_LLM_ERROR_RATE          500 오류 비율 (기본 0)
+    MOCK_LLM_RATE_LIMIT_RATE     429 오류 비율 (기본 0)
+    MOCK_LLM_RETRY_AFTER         429 응답의 Retry-After 초 (기본 1)
+    MOCK_LLM_EXHAUSTED_KEYS      할당량 소진(insufficient_quota)으로 응답할 API 키 목록, 쉼표 구분 (기본 없음)
+    MOCK_LLM_MAX_TRACKED_INPUTS  반복 요청 순번을 기억할 최근 입력 수 (기본 10000)
+
+GET /stats로 요청 통계를 보고, DELETE /stats로 통계와 반복 요청 순번을 초기화한다 (부하 테스트 실행 사이).
+"""
+
+import sys, os
+# Ensure project root is on sys.path when running as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import argparse
+import asyncio
+import difflib
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from core.llm.mock_responder import MockResponder
+from core.llm.usage import estimate_tokens
+
+SEED = int(os.getenv("MOCK_LLM_SEED", "0"))
+LATENCY_MS = float(os.getenv("MOCK_LLM_LATENCY_MS", "300"))
+LATENCY_JITTER_MS = float(os.getenv("MOCK_LLM_LATENCY_JITTER_MS", "200"))
+TOKENS_PER_SEC = float(os.getenv("MOCK_LLM_TOKENS_PER_SEC", "80"))
+ERROR_RATE = float(os.getenv("MOCK_LLM_ERROR_RATE", "0"))
+RATE_LIMIT_RATE = float(os.getenv("MOCK_LLM_RATE_LIMIT_RATE", "0"))
+RETRY_AFTER = os.getenv("MOCK_LLM_RETRY_AFTER", "1")
+EXHAUSTED_KEYS = {k.strip() for k in os.getenv("MOCK_LLM_EXHAUSTED_KEYS", "").split(",") if k.strip()}
+MAX_TRACKED_INPUTS = int(os.getenv("MOCK_LLM_MAX_TRACKED_INPUTS", "10000"))
+STREAM_CHUNK_CHARS = 20
+
+app = FastAPI(title="Mock LLM Server")
+responder = MockResponder(seed=SEED, max_tracked=MAX_TRACKED_INPUTS)
+_fault_rng = random.Random(SEED)
+stats: Dict[str, Any] = {"requests": 0, "errors": 0, "rate_limited": 0, "quota_exhausted": 0, "by_task": {}}
+
+
+def _error(status: int, message: str, error_type: str, code: str, headers: Dict[str, str] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": code}},
+        headers=headers,
+    )
+
+
+def _prediction_tokens(prediction: Any, content: str) -> Dict[str, int]:
+    """Predicted Outputs 모사: 예측과 일치하는 구간은 accepted, 나머지 예측은 rejected"""
+    predicted = (prediction or {}).get("content") if isinstance(prediction, dict) else None
+    if not predicted:
+        return {"accepted_prediction_tokens": 0, "rejected_prediction_tokens": 0}
+    matched = sum(block.size for block in difflib.SequenceMatcher(None, predicted, content, autojunk=False).get_matching_blocks())
+    accepted = estimate_tokens(predicted[:matched]) if matched else 0
+    return {
+        "accepted_prediction_tokens": accepted,
+        "rejected_prediction_tokens": max(0, estimate_tokens(predicted) - accepted),
+    }
+
+
+def _latency(completion_tokens: int) -> float:
+    """응답 지연(초) = 기본 지연 + 무작위 편차 + 출력 토큰 생성 시간"""
+    seconds = (LATENCY_MS + _fault_rng.uniform(0, LATENCY_JITTER_MS)) / 1000
+    if TOKENS_PER_SEC > 0:
+        seconds += completion_tokens / TOKENS_PER_SEC
+    return seconds
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+
+@app.get("/stats")
+async def get_stats():
+    return {**stats, "tracked_inputs": responder.tracked_inputs}
+
+
+@app.delete("/stats")
+async def reset_stats():
+    stats.update({"requests": 0, "errors": 0, "rate_limited": 0, "quota_exhausted": 0, "by_task": {}})
+    responder.reset()
+    return stats
+
+
+@app.post("/v1/chat/completions")
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    api_key = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    if api_key in EXHAUSTED_KEYS:
+        stats["quota_exhausted"] += 1
+        return _error(429, "You exceeded your current quota (mock)", "insufficient_quota", "insufficient_quota")
+
+    roll = _fault_rng.random()
+    if roll < RATE_LIMIT_RATE:
+        stats["rate_limited"] += 1
+        return _error(429, "Rate limit reached (mock)", "rate_limit_error", "rate_limit_exceeded",
+                      headers={"retry-after": RETRY_AFTER})
+    if roll < RATE_LIMIT_RATE + ERROR_RATE:
+        stats["errors"] += 1
+        return _error(500, "Internal server error (mock)", "server_error", "server_error")
+
+    n = int(body.get("n") or 1)
+    max_tokens = body.get("max_tokens")
+    task_header = request.headers.get("x-llm-task")
+    contents: List[str] = []
+    finish_reasons: List[str] = []
+    task = task_header
+    for i in range(n):
+        task, content = responder.respond(body, task=task_header, index=i)
+        # max_tokens를 넘는 응답은 잘라서 finish_reason="length"로 반환 (실제 API와 동일)
+        if max_tokens and estimate_tokens(content) > max_tokens:
+            content = content[:max_tokens * 4]
+            finish_reasons.append("length")
+        else:
+            finish_reasons.append("stop")
+        contents.append(content)
+    stats["by_task"][task] = stats["by_task"].get(task, 0) + 1
+
+    prompt_tokens = estimate_tokens(json.dumps(body.get("messages", []), ensure_ascii=False))
+    completion_tokens = sum(estimate_tokens(c) for c in contents)
+    prediction_tokens = _prediction_tokens(body.get("prediction"), contents[0])
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens + prediction_tokens["rejected_prediction_tokens"],
+        "total_tokens": prompt_tokens + completion_tokens + prediction_tokens["rejected_prediction_tokens"],
+        "completion_tokens_details": prediction_tokens,
+    }
+    completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = body.get("model", "mock")
+    # 채택된 예측 토큰은 생성 시간이 거의 들지 않는다고 가정
+    delay = _latency(max(0, completion_tokens - prediction_tokens["accepted_prediction_tokens"]))
+
+    if body.get("stream"):
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        content = contents[0]
+        pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)] or [""]
+
+        def _chunk(delta: Dict[str, Any], finish_reason=None, chunk_usage=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if chunk_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if chunk_usage:
+                payload["usage"] = chunk_usage
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        async def _events():
+            yield _chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                await asyncio.sleep(delay / len(pieces))
+                yield _chunk({"content": piece})
+            yield _chunk({}, finish_reason=finish_reasons[0])
+            if include_usage:
+                yield _chunk({}, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_events(), media_type="text/event-stream")
+
+    await asyncio.sleep(delay)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [
+            {
+                "index": i,
+                "message": {"role": "assistant", "content": c},
+                "logprobs": responder.logprobs(body, task, c) if body.get("logprobs") else None,
+                "finish_reason": r,
+            }
+            for i, (c, r) in enumerate(zip(contents, finish_reasons))
+        ],
+        "usage": usage,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI 호환 모의 LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
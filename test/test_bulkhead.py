@@ -0,0 +1,103 @@
+"""bulkhead 테스트: 풀별 동시 호출 제한, 유휴 풀 차용과 reserve, 토큰 정산, 취소 시 용량 반환 확인"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from core.llm.bulkhead import Bulkhead
+
+
+@pytest.fixture
+def bulkhead(monkeypatch):
+    monkeypatch.setattr(settings, "llm_bulkhead_enabled", True)
+    monkeypatch.setattr(settings, "llm_bulkhead_borrow_when_idle", True)
+    monkeypatch.setattr(settings, "llm_bulkhead_recheck_interval", 0.01)
+    monkeypatch.setattr(settings, "llm_bulkhead_default_pool", "interactive")
+    monkeypatch.setattr(settings, "llm_bulkheads", {
+        "interactive": {"max_concurrency": 2, "tokens_per_minute": 0, "reserve": 1},
+        "batch": {"max_concurrency": 1, "tokens_per_minute": 1000, "reserve": 0},
+    })
+    return Bulkhead()
+
+
+async def _hold(bulkhead, pool, entered, release, tokens=10):
+    with bulkhead.pool(pool):
+        async with bulkhead.lease("test", tokens) as lease:
+            entered.append(lease.pool.name)
+            await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_disabled_bulkhead_yields_no_lease(bulkhead, monkeypatch):
+    monkeypatch.setattr(settings, "llm_bulkhead_enabled", False)
+
+    async with bulkhead.lease("test", 10) as lease:
+        assert lease is None
+
+
+@pytest.mark.asyncio
+async def test_full_pool_borrows_from_idle_pool_but_keeps_reserve(bulkhead):
+    release = asyncio.Event()
+    entered = []
+    # batch 풀(1슬롯)을 채운 뒤 두 호출 추가: interactive는 2슬롯 중 reserve 1을 남기고 1슬롯만 빌려준다
+    tasks = [asyncio.create_task(_hold(bulkhead, "batch", entered, release)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+
+    assert entered == ["batch", "interactive"]
+    stats = bulkhead.stats()["pools"]
+    assert stats["batch"]["borrowed"] == 1 and stats["batch"]["waiting"] == 1
+    assert stats["interactive"]["lent"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert len(entered) == 3
+    assert all(pool["in_flight"] == 0 for pool in bulkhead.stats()["pools"].values())
+
+
+@pytest.mark.asyncio
+async def test_busy_pool_does_not_lend(bulkhead):
+    release = asyncio.Event()
+    entered = []
+    # interactive에 대기자가 있으면 batch 호출에 빌려주지 않는다
+    interactive = [asyncio.create_task(_hold(bulkhead, "interactive", entered, release)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    batch = [asyncio.create_task(_hold(bulkhead, "batch", entered, release)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    assert entered.count("interactive") == 2 and entered.count("batch") == 1
+
+    release.set()
+    await asyncio.gather(*interactive, *batch)
+
+
+@pytest.mark.asyncio
+async def test_settle_refunds_unused_estimate(bulkhead):
+    with bulkhead.pool("batch"):
+        async with bulkhead.lease("test", 400) as lease:
+            assert round(lease.pool.tokens) == 600
+            lease.settle(SimpleNamespace(total_tokens=100))
+
+    assert 900 <= bulkhead.stats()["pools"]["batch"]["available_tokens"] <= 901
+
+
+@pytest.mark.asyncio
+async def test_cancel_while_releasing_does_not_leak_capacity(bulkhead):
+    release = asyncio.Event()
+    task = asyncio.create_task(_hold(bulkhead, "batch", [], release))
+    await asyncio.sleep(0.01)
+
+    # 다른 코루틴이 조건 락을 쥔 동안 lease를 빠져나가다 취소되어도 슬롯/토큰은 반환되어야 한다
+    async with bulkhead._condition:
+        release.set()
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.01)
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert bulkhead.stats()["pools"]["batch"]["in_flight"] == 0
+    with bulkhead.pool("batch"):
+        async with bulkhead.lease("test", 10) as lease:
+            assert lease.pool.name == "batch"
@@ -0,0 +1,72 @@
+"""긴 지문 청크 분할 테스트: 분할/이어 붙이기 왕복, 문단 구분 보존, 수정 수 배분 확인"""
+
+import pytest
+
+from core.llm.chunking import allocate_modifications, split_chunks, stitch
+
+SHORT_PARAGRAPH = " ".join(f"Sentence {i} has exactly six words." for i in range(6))  # 6단어 × 6문장, 절 없음
+CLAUSE_PARAGRAPH = " ".join(f"Another line {i} because it was late." for i in range(4))  # 7단어 × 4문장, 모두 절 포함
+TEXT = SHORT_PARAGRAPH + "\n\n" + CLAUSE_PARAGRAPH
+
+
+@pytest.mark.parametrize("max_words", [10, 20, 40, 1000])
+def test_stitch_round_trip(max_words):
+    chunks = split_chunks("  " + TEXT + "\n", max_words)
+
+    assert stitch(chunks, [chunk.text for chunk in chunks]) == TEXT
+    assert sum(chunk.sentence_count for chunk in chunks) == 10
+
+
+def test_long_paragraph_splits_evenly_and_keeps_paragraph_gap():
+    chunks = split_chunks(TEXT, 20)
+
+    assert [chunk.word_count for chunk in chunks] == [18, 18, 14, 14]
+    assert [chunk.gap for chunk in chunks] == [" ", "\n\n", " ", ""]
+    assert all(chunk.word_count <= 20 for chunk in chunks)
+
+
+def test_small_paragraphs_are_packed_together():
+    chunks = split_chunks(TEXT, 1000)
+
+    assert len(chunks) == 1
+    assert chunks[0].text == TEXT
+
+
+def test_stitch_uses_original_gaps_for_rewritten_chunks():
+    chunks = split_chunks(TEXT, 20)
+
+    assert stitch(chunks, [" A. ", "B.\n", "C.", "D."]) == "A. B.\n\nC. D."
+
+
+@pytest.mark.parametrize("total", [1, 2, 3, 5, 7, 11])
+@pytest.mark.parametrize("metric, target", [("avg_sentence_length", (15.0, 20.0)), ("all_embedded_clauses_ratio", (0.3, 0.5))])
+def test_allocation_sums_to_total(total, metric, target):
+    chunks = split_chunks(TEXT, 20)
+
+    counts = allocate_modifications(chunks, metric, "increase", total, None, *target)
+
+    assert sum(counts) == total
+    assert all(count >= 0 for count in counts)
+
+
+def test_allocation_follows_contribution():
+    chunks = split_chunks(TEXT, 20)
+
+    # 내포절 증가: 절이 이미 있는 문단(뒤 두 청크)에는 배분하지 않음
+    assert allocate_modifications(chunks, "all_embedded_clauses_ratio", "increase", 3, None, 0.3, 0.5) == [2, 1, 0, 0]
+    # 평균 문장 길이 증가: 목표와의 차이 × 문장 수 비례, 나머지는 소수부가 큰 청크부터
+    assert allocate_modifications(chunks, "avg_sentence_length", "increase", 5, None, 15.0, 20.0) == [2, 1, 1, 1]
+
+
+def test_allocation_falls_back_to_sentence_count_when_no_chunk_contributes():
+    chunks = split_chunks(TEXT, 20)
+
+    # 모든 청크가 이미 목표보다 길어 증가 방향 기여도가 0 → 문장 수(3, 3, 2, 2) 비례
+    assert allocate_modifications(chunks, "avg_sentence_length", "increase", 10, None, 1.0, 2.0) == [3, 3, 2, 2]
+
+
+def test_allocation_without_modifications():
+    chunks = split_chunks(TEXT, 20)
+
+    assert allocate_modifications(chunks, "avg_sentence_length", "increase", 0, None, 15.0, 20.0) == [0, 0, 0, 0]
+    assert allocate_modifications([], "avg_sentence_length", "increase", 3, None, 15.0, 20.0) == []
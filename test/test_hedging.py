@@ -0,0 +1,179 @@
+"""요청 헤징 테스트: 임계값 워밍업/백분위, 헤지 예산, 먼저 끝난 쪽 사용과 진 시도의 취소/사용량 정산 확인"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from core.llm import client as client_module
+from core.llm.bulkhead import Bulkhead
+from core.llm.client import llm_client
+from core.llm.hedging import HedgePolicy
+from core.llm.usage import usage_tracker
+
+TASK = "hedge_test"
+
+
+@pytest.fixture
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedging_enabled", True)
+    monkeypatch.setattr(settings, "llm_hedge_percentile", 0.95)
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 20)
+    monkeypatch.setattr(settings, "llm_hedge_window", 200)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay", 0.01)
+    monkeypatch.setattr(settings, "llm_hedge_max_fraction", 0.05)
+
+
+def _warm(policy, samples=20, seconds=0.02):
+    for _ in range(samples):
+        policy.record_latency(TASK, seconds)
+
+
+def _delayed(result, delay, cancelled=None, name=None):
+    async def _call():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(name)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return _call
+
+
+def test_threshold_needs_min_samples(hedge_settings):
+    policy = HedgePolicy()
+    _warm(policy, samples=19)
+    assert policy.threshold(TASK) is None
+
+    policy.record_latency(TASK, 0.02)
+    assert policy.threshold(TASK) == 0.02
+
+
+def test_threshold_uses_percentile_and_min_delay(hedge_settings, monkeypatch):
+    policy = HedgePolicy()
+    for i in range(1, 101):
+        policy.record_latency(TASK, i / 100)
+    assert policy.threshold(TASK) == 0.95
+
+    monkeypatch.setattr(settings, "llm_hedge_min_delay", 2.0)
+    assert policy.threshold(TASK) == 2.0
+
+
+def test_hedge_budget_is_a_fraction_of_primary_calls(hedge_settings):
+    policy = HedgePolicy()
+    policy.primary_calls = 19
+    assert not policy._try_acquire_hedge()
+
+    policy.primary_calls = 20
+    assert policy._try_acquire_hedge()
+    assert not policy._try_acquire_hedge()
+    assert policy.hedged_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_during_warm_up(hedge_settings):
+    policy = HedgePolicy()
+    policy.primary_calls = 100
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        return await _delayed("primary", 0.05)()
+
+    assert await policy.run(TASK, factory) == "primary"
+    assert len(calls) == 1 and policy.hedged_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_faster_hedge_wins_and_primary_is_cancelled(hedge_settings):
+    policy = HedgePolicy()
+    _warm(policy)
+    policy.primary_calls = 100
+    cancelled = []
+    attempts = iter([_delayed("primary", 5, cancelled, "primary"), _delayed("hedge", 0.01, cancelled, "hedge")])
+
+    result = await policy.run(TASK, lambda: next(attempts)())
+
+    assert result == "hedge"
+    assert cancelled == ["primary"]
+    assert policy.hedged_calls == 1 and policy.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_result_is_used_when_primary_fails(hedge_settings):
+    policy = HedgePolicy()
+    _warm(policy)
+    policy.primary_calls = 100
+    attempts = iter([_delayed(RuntimeError("primary failed"), 0.05), _delayed("hedge", 0.1)])
+
+    assert await policy.run(TASK, lambda: next(attempts)()) == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_waits_for_primary(hedge_settings):
+    policy = HedgePolicy()
+    _warm(policy)
+    policy.primary_calls = 10
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        return await _delayed("primary", 0.05)()
+
+    assert await policy.run(TASK, factory) == "primary"
+    assert len(calls) == 1 and policy.hedged_calls == 0
+
+
+class _FakeCompletions:
+    """첫 호출은 느리고 두 번째(헤지) 호출은 빠른 chat.completions 대체"""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.cancelled = 0
+
+    async def create(self, **kwargs):
+        delay = self.delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="A short hedged answer."), finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=40, completion_tokens=6, total_tokens=46),
+        )
+
+
+@pytest.mark.asyncio
+async def test_losing_attempt_is_cancelled_and_accounted(hedge_settings, monkeypatch):
+    policy = HedgePolicy()
+    _warm(policy)
+    policy.primary_calls = 100
+    completions = _FakeCompletions([5, 0.01])
+    pools = Bulkhead()
+    monkeypatch.setattr(client_module, "hedge_policy", policy)
+    monkeypatch.setattr(client_module, "bulkhead", pools)
+    monkeypatch.setattr(llm_client, "_client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(settings, "llm_api_key_pool", [])
+    monkeypatch.setattr(settings, "llm_task_client_config", {})
+    monkeypatch.setattr(settings, "llm_bulkhead_enabled", True)
+    monkeypatch.setattr(settings, "llm_bulkheads", {"interactive": {"max_concurrency": 4, "tokens_per_minute": 100000}})
+    monkeypatch.setattr(settings, "llm_bulkhead_default_pool", "interactive")
+
+    messages = [{"role": "user", "content": "Please answer briefly."}]
+    with usage_tracker.request_scope("hedge-test") as usage:
+        response = await llm_client._chat_completion_once(TASK, messages=messages, max_tokens=100)
+
+    assert response.choices[0].message.content == "A short hedged answer."
+    assert completions.cancelled == 1
+    assert policy.hedge_wins == 1
+    # 이긴 시도는 실제 usage, 진 시도는 이긴 출력 길이 기준 추정치로 모두 기록
+    summary = usage.summary()
+    assert summary["calls"] == 2 and summary["aborted_calls"] == 1
+    assert [record.aborted for record in usage.records] == [False, True]
+    pool = pools.stats()["pools"]["interactive"]
+    assert pool["in_flight"] == 0
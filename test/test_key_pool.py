@@ -0,0 +1,143 @@
+"""API 키 풀 테스트: 여유 토큰 기준 선택, 버킷 보충/정산/환급, 휴지 키 제외, 호출 실패 시 다른 키로 재시도 확인"""
+
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from config.settings import settings
+from core.llm import client as client_module
+from core.llm import key_pool as key_pool_module
+from core.llm.client import llm_client
+from core.llm.key_pool import EXHAUSTED, RATE_LIMITED, ApiKeyPool
+from core.llm.tasks import TASK_DEFAULT
+from utils.exceptions import LLMAPIError
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _status_error(cls, status, headers=None, body=None):
+    return cls("error", response=httpx.Response(status, request=REQUEST, headers=headers or {}), body=body)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(key_pool_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def pool(monkeypatch, clock):
+    monkeypatch.setattr(settings, "llm_api_key_pool", [
+        {"name": "a", "api_key": "sk-test-a", "tokens_per_minute": 10000},
+        {"name": "b", "api_key": "sk-test-b", "tokens_per_minute": 6000},
+    ])
+    monkeypatch.setattr(settings, "llm_key_rate_limit_cooldown", 20.0)
+    monkeypatch.setattr(settings, "llm_key_quota_cooldown", 600.0)
+    monkeypatch.setattr(settings, "llm_key_max_wait", 0.0)
+    pool = ApiKeyPool()
+    monkeypatch.setattr(client_module, "key_pool", pool)
+    return pool
+
+
+def _slot(pool, name):
+    return next(s for s in pool.slots if s.name == name)
+
+
+def test_select_prefers_most_headroom_and_charges_estimate(pool):
+    assert pool.select(3000).name == "a"
+    assert _slot(pool, "a").tokens == 7000
+    assert pool.select(3000).name == "a"
+    # a: 4000 < b: 6000
+    assert pool.select(1000).name == "b"
+    assert _slot(pool, "b").tokens == 5000
+
+
+def test_bucket_refills_over_time_up_to_limit(pool, clock):
+    slot = pool.select(6000)
+    assert slot.tokens == 4000
+
+    clock[0] += 30
+    assert slot.headroom() == 9000
+    clock[0] += 60
+    assert slot.headroom() == 10000
+
+
+def test_settle_and_refund(pool):
+    slot = pool.select(4000)
+    pool.settle(slot, 4000, SimpleNamespace(total_tokens=1500))
+    assert slot.tokens == 8500
+
+    pool.settle(slot, 4000, None)
+    assert slot.tokens == 8500
+
+    slot = pool.select(4000)
+    pool.refund(slot, 4000)
+    assert slot.tokens == 8500
+
+
+def test_rate_limited_slot_is_skipped_until_cooldown_ends(pool, clock):
+    slot = _slot(pool, "a")
+    assert pool.report_error(slot, _status_error(openai.RateLimitError, 429, headers={"retry-after": "30"}))
+    assert slot.state == RATE_LIMITED
+
+    assert pool.select(100).name == "b"
+    assert pool.next_recovery_in() == 30
+    clock[0] += 30
+    assert pool.select(100).name == "a"
+
+
+def test_quota_and_auth_errors_exhaust_slot(pool):
+    assert pool.report_error(_slot(pool, "a"), _status_error(openai.RateLimitError, 429, body={"code": "insufficient_quota"}))
+    assert pool.report_error(_slot(pool, "b"), _status_error(openai.AuthenticationError, 401))
+    assert {s.state for s in pool.slots} == {EXHAUSTED}
+    assert pool.select(100) is None
+    assert pool.next_recovery_in() is None
+
+
+def test_bad_request_is_not_retried_on_another_key(pool):
+    assert not pool.report_error(_slot(pool, "a"), _status_error(openai.BadRequestError, 400))
+    assert _slot(pool, "a").state == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_create_with_key_fails_over_and_refunds(pool):
+    used = []
+
+    async def create(client):
+        used.append(client.api_key)
+        if client.api_key == "sk-test-a":
+            raise _status_error(openai.RateLimitError, 429)
+        return "response"
+
+    response, slot = await llm_client._create_with_key(TASK_DEFAULT, 2000, create)
+
+    assert response == "response" and slot.name == "b"
+    assert used == ["sk-test-a", "sk-test-b"]
+    assert _slot(pool, "a").tokens == 10000
+    assert _slot(pool, "a").failovers == 1
+    assert _slot(pool, "b").tokens == 4000
+
+
+@pytest.mark.asyncio
+async def test_create_with_key_refunds_and_raises_on_request_error(pool):
+    async def create(client):
+        raise _status_error(openai.BadRequestError, 400)
+
+    with pytest.raises(openai.BadRequestError):
+        await llm_client._create_with_key(TASK_DEFAULT, 2000, create)
+    assert _slot(pool, "a").tokens == 10000
+
+
+@pytest.mark.asyncio
+async def test_create_with_key_raises_when_all_keys_cool_down(pool):
+    for slot in pool.slots:
+        pool.report_error(slot, _status_error(openai.RateLimitError, 429))
+
+    async def create(client):
+        return "response"
+
+    with pytest.raises(LLMAPIError):
+        await llm_client._create_with_key(TASK_DEFAULT, 2000, create)
@@ -0,0 +1,83 @@
+"""구문 사전 선별 테스트: 목표 범위 안 지문은 탈락하지 않음, 잘림/자리표시자 탈락, near_miss 구분 확인"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from config.settings import settings
+from core.prescreen import syntax_prescreener
+
+CASES = json.loads((Path(__file__).parent / "sample_test_data.json").read_text(encoding="utf-8"))["test_cases"]
+REFERENCE = CASES[0]["input"]["original_text"]
+PASSAGES = [
+    CASES[0]["input"]["original_text"],
+    CASES[0]["input"]["generated_passage"],
+    "Oranges grow on trees. Each orange has many seeds inside. The oranges are picked when they are big and round.\n"
+    "Farmers send the oranges to a place where juice is made. The oranges are washed. Then the oranges are squeezed.\n"
+    "Orange juice is sweet. It is good to drink at breakfast because it tastes fresh. Some people drink it cold.",
+]
+
+
+def _analyzer_values(text, avg_bias=1.15, clause_bias=0.08):
+    """로컬 추정과 일정하게 어긋나는 분석기 값 (비율/차이 보정이 흡수해야 하는 편향)"""
+    estimate = syntax_prescreener.estimate(text)
+    return estimate.avg_sentence_length * avg_bias, estimate.clause_ratio + clause_bias
+
+
+@pytest.fixture(autouse=True)
+def prescreen_settings(monkeypatch):
+    monkeypatch.setattr(settings, "syntax_prescreen_enabled", True)
+    monkeypatch.setattr(settings, "syntax_prescreen_avg_margin", 0.2)
+    monkeypatch.setattr(settings, "syntax_prescreen_clause_margin", 0.15)
+    monkeypatch.setattr(settings, "syntax_prescreen_min_length_ratio", 0.0)
+
+
+def _screen_for(ranges):
+    return syntax_prescreener.screener(ranges, REFERENCE, *_analyzer_values(REFERENCE))
+
+
+@pytest.mark.parametrize("passage", PASSAGES, ids=["alaska", "iceland", "oranges"])
+@pytest.mark.parametrize("edge", ["min", "max", "middle"])
+def test_passages_inside_target_range_are_never_screened(passage, edge):
+    avg, clause = _analyzer_values(passage)
+    if edge == "min":
+        ranges = (avg, avg + 2.0, clause, clause + 0.1)
+    elif edge == "max":
+        ranges = (avg - 2.0, avg, clause - 0.1, clause)
+    else:
+        ranges = (avg - 1.0, avg + 1.0, clause - 0.05, clause + 0.05)
+
+    assert _screen_for(ranges)(passage) is None
+
+
+@pytest.mark.parametrize("passage", PASSAGES, ids=["alaska", "iceland", "oranges"])
+def test_estimation_error_within_margin_is_tolerated(passage):
+    # 분석기 값이 범위 경계에 있고, 로컬 추정이 보정 기준보다 평균 문장 길이 15%, 내포절 비율 0.1만큼 더 어긋나도 통과
+    avg, clause = _analyzer_values(passage, avg_bias=1.15 * 1.15, clause_bias=0.08 + 0.1)
+
+    assert _screen_for((avg, avg + 2.0, clause, clause + 0.1))(passage) is None
+
+
+def test_far_outside_range_is_near_miss():
+    avg, clause = _analyzer_values(PASSAGES[1])
+    reject = _screen_for((avg * 2, avg * 3, clause, clause + 0.1))(PASSAGES[1])
+
+    assert reject is not None and reject.near_miss
+    assert "평균 문장 길이" in str(reject)
+
+
+def test_placeholder_and_truncated_output_are_hard_rejects(monkeypatch):
+    monkeypatch.setattr(settings, "syntax_prescreen_min_length_ratio", 0.7)
+    screen = _screen_for((0.0, 100.0, 0.0, 1.0))
+
+    for candidate in ["", "[생성 실패: timeout]", REFERENCE[:len(REFERENCE) // 3]]:
+        reject = screen(candidate)
+        assert reject is not None and not reject.near_miss
+    assert screen(REFERENCE) is None
+
+
+def test_disabled_prescreen_returns_no_screen(monkeypatch):
+    monkeypatch.setattr(settings, "syntax_prescreen_enabled", False)
+
+    assert _screen_for((0.0, 1.0, 0.0, 1.0)) is None
@@ -0,0 +1,42 @@
+"""PromptCompiler.compile_text 테스트: 코드 블록/치환 변수/목록 기호 보존과 공백 정규화 확인"""
+
+from core.llm.prompt_compiler import PromptCompiler
+
+compiler = PromptCompiler()
+
+
+def test_code_fence_content_is_preserved():
+    text = "Intro\n```json\n{\n\t\"a\": \"**b**\"\n\n\n}\n```\nOutro"
+
+    compiled = compiler.compile_text(text, strip_emphasis=True)
+
+    assert "```json\n{\n\t\"a\": \"**b**\"\n\n\n}\n```" in compiled
+
+
+def test_placeholders_are_preserved():
+    text = "**Text:** {var_text}\n*Count:* {var_num_modifications}"
+
+    compiled = compiler.compile_text(text, strip_emphasis=True)
+
+    assert compiled == "Text: {var_text}\nCount: {var_num_modifications}"
+
+
+def test_list_bullets_are_not_treated_as_italics():
+    text = "* first item\n* second *item*\n\t* nested item"
+
+    compiled = compiler.compile_text(text, strip_emphasis=True)
+
+    assert compiled == "* first item\n* second item\n  * nested item"
+
+
+def test_blank_lines_and_rules_collapse():
+    text = "\n\nFirst   \n\n\n\n---\n\nSecond\n\n"
+
+    assert compiler.compile_text(text, strip_emphasis=False) == "First\n\nSecond"
+
+
+def test_emphasis_is_kept_unless_requested():
+    text = "Change **ONLY** the *marked* sentences."
+
+    assert compiler.compile_text(text, strip_emphasis=False) == text
+    assert compiler.compile_text(text, strip_emphasis=True) == "Change ONLY the marked sentences."
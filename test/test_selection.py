@@ -0,0 +1,84 @@
+"""후보 선택 테스트: 텍스트 응답 선택 번호의 범위 확인과 범위 밖 번호의 선택 실패 처리 확인"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from core.llm.client import llm_client
+from core.llm.selector import CandidateSelector
+from models.internal import SelectionResult
+from utils.exceptions import LLMAPIError
+
+CANDIDATES = ["First candidate text.", "Second candidate text.", "Third candidate text."]
+
+
+def _text_response(content):
+    """logprobs 없이 텍스트만 돌려준 선택 응답"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content), logprobs=None)])
+
+
+@pytest.fixture
+def text_reply(monkeypatch):
+    def _install(content):
+        async def _chat_completion(task, retry_truncated=True, prediction=None, **params):
+            return _text_response(content)
+        monkeypatch.setattr(llm_client, "_chat_completion", _chat_completion)
+        monkeypatch.setattr(llm_client, "_has_client", lambda: True)
+    return _install
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content, expected", [("2", 2), ("Candidate 3", 3), ("1", 1)])
+async def test_text_fallback_accepts_numbers_in_range(text_reply, content, expected):
+    text_reply(content)
+
+    selection = await llm_client.select_with_logprobs("prompt", 3)
+
+    assert selection.selected_index == expected
+    assert selection.mode == "text"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content", ["0", "4", "none of them"])
+async def test_text_fallback_rejects_out_of_range_numbers(text_reply, content):
+    text_reply(content)
+
+    with pytest.raises(LLMAPIError):
+        await llm_client.select_with_logprobs("prompt", 3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index", [0, 4, -1])
+async def test_out_of_range_selection_is_a_selection_failure(monkeypatch, index):
+    monkeypatch.setattr(settings, "selection_mode", "logprobs")
+
+    async def _select(prompt, num_candidates, task=None):
+        return SelectionResult(selected_index=index, mode="text")
+
+    monkeypatch.setattr(llm_client, "select_with_logprobs", _select)
+
+    text, selection = await CandidateSelector().select_best_with_details(CANDIDATES)
+
+    # 선택 실패 처리: 첫 번째 후보, 선택 근거 없음 (candidates[-1] 같은 음수 인덱싱 없음)
+    assert text == CANDIDATES[0]
+    assert selection is None
+
+
+@pytest.mark.asyncio
+async def test_local_first_keeps_heuristic_when_llm_selection_is_out_of_range(monkeypatch):
+    monkeypatch.setattr(settings, "selection_mode", "logprobs")
+    monkeypatch.setattr(settings, "selection_strategy", "local_first")
+    monkeypatch.setattr(settings, "selection_heuristic_margin", 10.0)
+
+    async def _select(prompt, num_candidates, task=None):
+        return SelectionResult(selected_index=0, mode="text")
+
+    monkeypatch.setattr(llm_client, "select_with_logprobs", _select)
+    selector = CandidateSelector()
+    expected_text, _ = selector.select_heuristic_with_details(CANDIDATES, "Original text.")
+
+    text, selection = await selector.select_local_first(CANDIDATES, "Original text.")
+
+    assert text == expected_text
+    assert selection.decided_by == "heuristic"
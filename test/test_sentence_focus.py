@@ -0,0 +1,89 @@
+"""발췌 프롬프트(sentence_focus) 테스트: 대상 문장 선택, 발췌 구성, 발췌 범위 밖 패치 거부 확인"""
+
+import pytest
+
+from config.settings import settings
+from core.llm.sentence_focus import build_focus, select_targets
+from core.llm.sentence_patch import apply_patches, split_sentences
+from utils.exceptions import SentencePatchError
+
+SENTENCES = [
+    "The sun rose.",
+    "Birds sang loudly in the tall green trees near the river.",
+    "We ate.",
+    "The children who lived next door ran to the park because it was warm.",
+    "It rained.",
+    "The old man walked slowly along the quiet road to the village market.",
+    "Cats slept.",
+    "My sister read a long book about a ship that sailed across the ocean.",
+    "Dogs barked.",
+    "The teacher explained the lesson carefully to every student in the class.",
+    "We left.",
+    "Everyone went home early after the long and tiring day at school.",
+]
+TEXT = " ".join(SENTENCES)
+CLAUSE_IDS = {4, 8}
+SHORT_IDS = {3, 5, 7, 9, 11}
+
+
+@pytest.fixture(autouse=True)
+def focus_settings(monkeypatch):
+    monkeypatch.setattr(settings, "syntax_focus_pool_factor", 2)
+    monkeypatch.setattr(settings, "syntax_focus_context", 1)
+    monkeypatch.setattr(settings, "syntax_focus_min_sentences", 12)
+    monkeypatch.setattr(settings, "syntax_focus_max_fraction", 0.7)
+
+
+def test_length_increase_selects_shortest_adjacent_pairs():
+    targets = select_targets(SENTENCES, "increase", None, 1)
+
+    assert targets == [2, 3, 9, 10]
+
+
+def test_length_decrease_prefers_long_sentences_with_clauses():
+    assert select_targets(SENTENCES, "decrease", None, 1) == sorted(CLAUSE_IDS)
+
+
+def test_clause_direction_selects_by_clause_marker():
+    increase = select_targets(SENTENCES, None, "increase", 1)
+    decrease = select_targets(SENTENCES, None, "decrease", 1)
+
+    assert len(increase) == 2 and set(increase) <= SHORT_IDS
+    assert set(decrease) == CLAUSE_IDS
+
+
+def test_no_direction_selects_nothing():
+    assert select_targets(SENTENCES, None, None, 3) == []
+
+
+def test_build_focus_excerpt_includes_context_and_gap_markers():
+    focus = build_focus(TEXT, "decrease", None, 1)
+
+    assert focus.targets == [4, 8]
+    assert focus.visible_ids == {3, 4, 5, 7, 8, 9}
+    assert focus.total_sentences == 12
+    assert focus.excerpt.splitlines() == [
+        f"[3] {SENTENCES[2]}", f"[4] {SENTENCES[3]}", f"[5] {SENTENCES[4]}",
+        "...",
+        f"[7] {SENTENCES[6]}", f"[8] {SENTENCES[7]}", f"[9] {SENTENCES[8]}",
+    ]
+
+
+def test_build_focus_skips_short_or_mostly_visible_passages(monkeypatch):
+    assert build_focus(" ".join(SENTENCES[:11]), "decrease", None, 1) is None
+
+    monkeypatch.setattr(settings, "syntax_focus_max_fraction", 0.4)
+    assert build_focus(TEXT, "decrease", None, 1) is None
+
+
+def test_patches_are_restricted_to_visible_sentences():
+    focus = build_focus(TEXT, "decrease", None, 1)
+
+    patched, touched = apply_patches(
+        TEXT, [{"sentence_ids": [4], "replacement": "The children lived next door. They ran to the park."}], focus.visible_ids
+    )
+    assert touched == [4]
+    assert split_sentences(patched)[0][3:5] == ["The children lived next door.", "They ran to the park."]
+
+    with pytest.raises(SentencePatchError):
+        apply_patches(TEXT, [{"sentence_ids": [6], "replacement": "The old man walked."}], focus.visible_ids)
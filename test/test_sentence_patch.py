@@ -0,0 +1,82 @@
+"""문장 패치 테스트: 문장 분할, 패치 파싱(코드 블록/설명문), 적용과 검증 오류 확인"""
+
+import pytest
+
+from core.llm.sentence_patch import apply_output, apply_patches, number_sentences, parse_patches, split_sentences
+from utils.exceptions import SentencePatchError
+
+TEXT = "Tom woke up. He ate breakfast. He went to school.\nIt was sunny. Birds sang."
+
+
+def test_split_sentences_round_trip_and_paragraph_gap():
+    sentences, gaps = split_sentences(TEXT)
+
+    assert sentences == ["Tom woke up.", "He ate breakfast.", "He went to school.", "It was sunny.", "Birds sang."]
+    assert gaps[2] == "\n"
+    assert "".join(s + g for s, g in zip(sentences, gaps)) == TEXT
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Mr. Smith met Dr. Jones. They talked.", ["Mr. Smith met Dr. Jones.", "They talked."]),
+    ("He joined the U.S. Army in 1990. He left later.", ["He joined the U.S. Army in 1990.", "He left later."]),
+    ("J. K. Rowling wrote it. Many read it.", ["J. K. Rowling wrote it.", "Many read it."]),
+])
+def test_split_sentences_keeps_abbreviations(text, expected):
+    assert split_sentences(text)[0] == expected
+
+
+def test_number_sentences():
+    assert number_sentences("One. Two.") == "[1] One.\n[2] Two."
+
+
+def test_merge_and_split_patches():
+    patched, touched = apply_patches(TEXT, [
+        {"sentence_ids": [1, 2], "replacement": "Tom woke up and ate breakfast."},
+        {"sentence_ids": [4], "replacement": "It was sunny.  The sky was clear."},
+    ])
+
+    assert patched == "Tom woke up and ate breakfast. He went to school.\nIt was sunny. The sky was clear. Birds sang."
+    assert touched == [1, 2, 4]
+
+
+@pytest.mark.parametrize("patches", [
+    [{"sentence_ids": [0], "replacement": "x."}],
+    [{"sentence_ids": [6], "replacement": "x."}],
+    [{"sentence_ids": [1, 3], "replacement": "x."}],
+    [{"sentence_ids": [1, 2], "replacement": "x."}, {"sentence_ids": [2], "replacement": "y."}],
+    [{"sentence_ids": [1], "replacement": "   "}],
+    [{"sentence_ids": [], "replacement": "x."}],
+    [{"sentence_ids": ["1"], "replacement": "x."}],
+    ["not a patch"],
+    [],
+], ids=["below-range", "above-range", "non-contiguous", "overlap", "empty-replacement", "no-ids", "string-ids", "not-dict", "no-patches"])
+def test_invalid_patches_are_rejected(patches):
+    with pytest.raises(SentencePatchError):
+        apply_patches(TEXT, patches)
+
+
+def test_allowed_ids_restrict_patches():
+    patch = [{"sentence_ids": [2, 3], "replacement": "He ate and went to school."}]
+
+    with pytest.raises(SentencePatchError):
+        apply_patches(TEXT, patch, allowed_ids={1, 2})
+    assert apply_patches(TEXT, patch, allowed_ids={2, 3})[1] == [2, 3]
+
+
+@pytest.mark.parametrize("output", [
+    '{"patches": [{"sentence_ids": [5], "replacement": "Birds sang loudly."}]}',
+    '```json\n{"patches": [{"sentence_ids": [5], "replacement": "Birds sang loudly."}]}\n```',
+    'Here are the patches:\n[{"sentence_ids": [5], "replacement": "Birds sang loudly."}]\nDone.',
+    '{"sentence_ids": 5, "replacement": "Birds sang loudly."}',
+], ids=["object", "code-fence", "prose-wrapped", "single-patch"])
+def test_parse_and_apply_output_formats(output):
+    patched, touched = apply_output(TEXT, output)
+
+    assert patched.endswith("It was sunny. Birds sang loudly.")
+    assert touched == [5]
+
+
+@pytest.mark.parametrize("output", ["no json here", "{broken", '{"other": 1}'])
+def test_unparseable_output_is_rejected(output):
+    with pytest.raises(SentencePatchError):
+        parse_patches(output)
@@ -0,0 +1,236 @@
+"""스트리밍 abort 조건 테스트: 각 조건의 발동/미발동, 중단 시 bulkhead/키 풀/사용량이 한 번씩만 정산되는지 확인"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from core.llm import bulkhead as bulkhead_module
+from core.llm import client as client_module
+from core.llm import key_pool as key_pool_module
+from core.llm.bulkhead import Bulkhead
+from core.llm.client import llm_client
+from core.llm.key_pool import ApiKeyPool
+from core.llm.stream_guards import first_abort_reason, json_prefix_guard, max_length_ratio, repetition_guard
+from core.llm.usage import usage_tracker
+from utils.exceptions import LLMStreamAbortedError
+
+TASK = "stream_guard_test"
+TOKENS_PER_MINUTE = 100000
+
+
+def test_max_length_ratio_fires_only_past_limit():
+    guard = max_length_ratio("abcde", 2.0)
+    assert guard("x" * 10) is None
+    assert guard("x" * 11).startswith("output_too_long")
+
+
+def test_max_length_ratio_with_empty_reference_allows_one_char():
+    guard = max_length_ratio("", 1.6)
+    assert guard("x") is None
+    assert guard("xy") is not None
+
+
+def test_repetition_guard_fires_on_repeated_tail():
+    guard = repetition_guard()
+    reason = guard("the cat sat on the mat again and " * 4)
+    assert reason.startswith("degenerate_repetition (4x")
+
+
+def test_repetition_guard_ignores_normal_and_short_text():
+    guard = repetition_guard(ngram=2, min_repeats=3)
+    assert guard("a b a b") is None  # 판단에 필요한 단어 수 미달
+    assert guard("a b c d a b e f") is None  # 마지막 2-gram이 2번뿐
+    assert guard("a b a b a b") is not None
+
+
+def test_repetition_guard_only_looks_at_window():
+    guard = repetition_guard(ngram=2, min_repeats=3, window_words=6)
+    # 앞쪽 반복은 창 밖이므로 무시
+    assert guard("x y x y x y " + "a b c d e f") is None
+
+
+def test_json_prefix_guard_accepts_valid_prefixes():
+    guard = json_prefix_guard()
+    assert guard("") is None
+    assert guard("```json\n{\"a\": [1, 2") is None
+    assert guard("{\"a\": \"]} inside string\", \"b\": \"\\\"]\"") is None
+    # 최상위 JSON이 닫힌 뒤는 파서가 처리
+    assert guard("{\"a\": 1} ]") is None
+
+
+def test_json_prefix_guard_fires_on_unbalanced_bracket():
+    guard = json_prefix_guard()
+    assert guard("{\"a\": [1, 2}") == "invalid_json_prefix (unbalanced bracket)"
+    assert guard("[1, 2]]") is None  # 최상위 배열이 닫힌 뒤
+
+
+def test_json_prefix_guard_fires_on_missing_or_late_start():
+    guard = json_prefix_guard(max_preamble_chars=20)
+    assert guard("Sure, here it is:") is None
+    assert guard("x" * 21).startswith("no_json_start")
+    assert guard("x" * 21 + "{").startswith("json_start_too_late")
+
+
+def test_first_abort_reason_returns_first_match():
+    predicates = [lambda s: None, lambda s: "first", lambda s: "second"]
+    assert first_abort_reason("text", predicates) == "first"
+    assert first_abort_reason("text", [lambda s: None]) is None
+
+
+class _FakeStream:
+    """청크를 차례로 내보내는 스트림 (close 호출 수 기록)"""
+
+    def __init__(self, deltas, usage=None, hang=False):
+        self.hang = hang
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d), finish_reason=None)], usage=None)
+            for d in deltas
+        ]
+        if usage is not None:
+            self.chunks.append(SimpleNamespace(choices=[], usage=usage))
+        self.sent = 0
+        self.closed = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent >= len(self.chunks):
+            if self.hang:
+                await asyncio.Event().wait()
+            raise StopAsyncIteration
+        self.sent += 1
+        return self.chunks[self.sent - 1]
+
+    async def close(self):
+        self.closed += 1
+
+
+class _Calls:
+    def __init__(self):
+        self.calls = []
+
+    def wrap(self, name, fn):
+        def _wrapped(*args):
+            self.calls.append(name)
+            return fn(*args)
+        return _wrapped
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    monkeypatch.setattr(settings, "llm_streaming_enabled", True)
+    monkeypatch.setattr(settings, "llm_stream_check_interval_chars", 20)
+    monkeypatch.setattr(settings, "llm_predicted_outputs_enabled", False)
+    monkeypatch.setattr(settings, "llm_task_client_config", {})
+    monkeypatch.setattr(settings, "llm_bulkhead_enabled", True)
+    monkeypatch.setattr(settings, "llm_bulkhead_default_pool", "interactive")
+    monkeypatch.setattr(settings, "llm_bulkheads", {"interactive": {"max_concurrency": 4, "tokens_per_minute": TOKENS_PER_MINUTE}})
+    monkeypatch.setattr(settings, "llm_api_key_pool", [{"name": "a", "api_key": "sk-test-a", "tokens_per_minute": TOKENS_PER_MINUTE}])
+    # 버킷 보충으로 정산 결과가 흔들리지 않도록 시간 고정
+    clock = SimpleNamespace(monotonic=lambda: 1000.0)
+    monkeypatch.setattr(key_pool_module, "time", clock)
+    monkeypatch.setattr(bulkhead_module, "time", clock)
+
+    pools = Bulkhead()
+    keys = ApiKeyPool()
+    calls = _Calls()
+    monkeypatch.setattr(keys, "settle", calls.wrap("settle", keys.settle))
+    monkeypatch.setattr(keys, "refund", calls.wrap("refund", keys.refund))
+    monkeypatch.setattr(client_module, "bulkhead", pools)
+    monkeypatch.setattr(client_module, "key_pool", keys)
+
+    def _serve(stream):
+        async def create(**kwargs):
+            return stream
+        keys.slots[0].client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        return SimpleNamespace(bulkhead=pools, slot=keys.slots[0], calls=calls.calls)
+
+    return _serve
+
+
+async def _generate(abort_predicates):
+    messages = [{"role": "user", "content": "Fix the grammar of this passage."}]
+    with usage_tracker.request_scope("stream-guard-test") as usage:
+        with pytest.raises(LLMStreamAbortedError) as error:
+            await llm_client.generate_messages(messages, task=TASK, max_tokens=200, abort_predicates=abort_predicates)
+    return usage, str(error.value)
+
+
+@pytest.mark.asyncio
+async def test_mid_stream_abort_settles_everything_once(streaming):
+    stream = _FakeStream(["again and again "] * 50)
+    env = streaming(stream)
+
+    usage, reason = await _generate([repetition_guard(ngram=2, min_repeats=4)])
+
+    assert reason.startswith("degenerate_repetition")
+    # 중단 즉시 스트림을 닫고 나머지 청크는 받지 않음
+    assert stream.closed == 1 and stream.sent < len(stream.chunks)
+    # usage 청크가 없으므로 받은 부분만 추정치로 한 번 기록
+    assert len(usage.records) == 1 and usage.records[0].aborted
+    record = usage.records[0]
+    assert env.calls == ["settle"]
+    assert env.slot.tokens == TOKENS_PER_MINUTE - record.total_tokens
+    pool = env.bulkhead.stats()["pools"]["interactive"]
+    assert pool["in_flight"] == 0
+    assert pool["available_tokens"] == TOKENS_PER_MINUTE - record.total_tokens
+
+
+@pytest.mark.asyncio
+async def test_final_check_abort_uses_reported_usage(streaming):
+    reported = SimpleNamespace(prompt_tokens=30, completion_tokens=12, total_tokens=42)
+    # 검사 주기(20자)에 닿지 않는 짧은 출력: 스트림 종료 후 최종 검사에서 중단
+    stream = _FakeStream(["Not JSON at all."], usage=reported)
+    env = streaming(stream)
+
+    usage, reason = await _generate([json_prefix_guard(max_preamble_chars=5)])
+
+    assert reason.startswith("no_json_start")
+    assert stream.closed == 1
+    assert [(r.total_tokens, r.aborted) for r in usage.records] == [(42, True)]
+    assert env.calls == ["settle"]
+    assert env.slot.tokens == TOKENS_PER_MINUTE - 42
+    pool = env.bulkhead.stats()["pools"]["interactive"]
+    assert pool["in_flight"] == 0
+    assert pool["available_tokens"] == TOKENS_PER_MINUTE - 42
+
+
+@pytest.mark.asyncio
+async def test_length_guard_aborts_runaway_output(streaming):
+    stream = _FakeStream(["word " * 10] * 20)
+    env = streaming(stream)
+
+    usage, reason = await _generate([max_length_ratio("short reference text", 1.6)])
+
+    assert reason.startswith("output_too_long")
+    assert stream.sent == 1
+    assert len(usage.records) == 1 and usage.records[0].aborted
+    assert env.calls == ["settle"]
+    assert env.bulkhead.stats()["pools"]["interactive"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_stream_settles_everything_once(streaming):
+    stream = _FakeStream(["partial output "] * 2, hang=True)
+    env = streaming(stream)
+    messages = [{"role": "user", "content": "Fix the grammar of this passage."}]
+    before = usage_tracker.cancellation_stats()["by_task"].get(TASK, {}).get("cancelled_calls", 0)
+
+    with usage_tracker.request_scope("stream-guard-cancel") as usage:
+        task = asyncio.create_task(
+            llm_client.generate_messages(messages, task=TASK, max_tokens=200, abort_predicates=[repetition_guard()])
+        )
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert stream.closed == 1
+    assert len(usage.records) == 1 and usage.records[0].aborted
+    assert env.calls == ["settle"]
+    assert env.slot.tokens == TOKENS_PER_MINUTE - usage.records[0].total_tokens
+    assert env.bulkhead.stats()["pools"]["interactive"]["in_flight"] == 0
+    assert usage_tracker.cancellation_stats()["by_task"][TASK]["cancelled_calls"] == before + 1
@@ -0,0 +1,208 @@
+"""구문 후보 경쟁(_race_candidates) 테스트: LLM/분석기를 대체하여 통과 k개 확보 시 취소, 진행 통계, 사전 선별 재분석, 어휘 선호 선택 확인"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from core.llm import syntax_fixer as syntax_fixer_module
+from core.llm.syntax_fixer import syntax_fixer
+from core.prescreen import ScreenReject
+
+TEXT = "The cat sat on the mat. The dog ran to the park. The bird sang in the tree."
+RANGES = (5.0, 15.0, 0.0, 1.0)
+PROMPT = [{"role": "system", "content": "system"}, {"role": "user", "content": TEXT}]
+
+
+class StubLLM:
+    """후보 번호별 출력과 지연을 정해 두는 generate_messages 대체"""
+
+    def __init__(self, outputs, delays):
+        self.outputs = outputs
+        self.delays = delays
+        self.calls = 0
+        self.cancelled = []
+
+    async def generate_messages(self, messages, **kwargs):
+        self.calls += 1
+        number = self.calls
+        try:
+            await asyncio.sleep(self.delays[number - 1])
+        except asyncio.CancelledError:
+            self.cancelled.append(number)
+            raise
+        return self.outputs[number - 1]
+
+
+async def _passing_analysis(candidate, *ranges):
+    metrics = SimpleNamespace(AVG_SENTENCE_LENGTH=10.0, All_Embedded_Clauses_Ratio=0.5, CEFR_NVJD_A1A2_lemma_ratio=0.5)
+    return metrics, SimpleNamespace(syntax_pass="PASS")
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    def _install(outputs, delays):
+        stub = StubLLM(outputs, delays)
+        monkeypatch.setattr(syntax_fixer_module.llm_client, "generate_messages", stub.generate_messages)
+        monkeypatch.setattr(syntax_fixer, "_analyze_candidate_with_ranges", _passing_analysis)
+        return stub
+    monkeypatch.setattr(settings, "syntax_stop_after_passing", 2)
+    monkeypatch.setattr(settings, "syntax_dedup_enabled", True)
+    return _install
+
+
+@pytest.mark.asyncio
+async def test_stop_after_passing_cancels_pending_candidates(stub_llm):
+    stub = stub_llm(
+        outputs=[f"Candidate {n} rewrote the first sentence. The rest is new text number {n}." for n in range(1, 5)],
+        delays=[0, 0, 10, 10],
+    )
+    plan = [(0.2, 1), (0.2, 2), (0.3, 1), (0.3, 2)]
+
+    valid, judged, race = await syntax_fixer._race_candidates(PROMPT, TEXT, plan, [], RANGES)
+
+    assert [item['index'] for item in valid] == [1, 2]
+    assert len(judged) == 2
+    assert sorted(stub.cancelled) == [3, 4]
+    assert race["planned"] == 4
+    assert race["generated"] == 2
+    assert race["analyzed"] == 2
+    assert race["cancelled"] == 2
+    assert race["duplicates"] == 0
+    assert race["screened"] == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_not_analyzed(stub_llm):
+    output = "A completely different passage about the weather. It rained all day long."
+    stub_llm(outputs=[output, output, TEXT], delays=[0, 0.01, 0.02])
+    plan = [(0.2, 1), (0.2, 2), (0.3, 1)]
+
+    valid, judged, race = await syntax_fixer._race_candidates(PROMPT, TEXT, plan, [], RANGES)
+
+    assert [item['index'] for item in valid] == [1]
+    assert judged[0]['duplicates'] == [2]
+    assert race["generated"] == 3
+    assert race["duplicates"] == 2
+    assert race["analyzed"] == 1
+    assert race["unchanged"] == [3]
+    assert race["cancelled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_recorded_as_bandit_failures(stub_llm, monkeypatch):
+    output = "A completely different passage about the weather. It rained all day long."
+    stub_llm(outputs=[output, output], delays=[0, 0.01])
+    records = []
+    monkeypatch.setattr(
+        syntax_fixer_module.candidate_bandit, "record",
+        lambda key, temperature, passed, tokens: records.append((temperature, passed, tokens)),
+    )
+
+    await syntax_fixer._race_candidates(PROMPT, TEXT, [(0.2, 1), (0.3, 1)], [], RANGES, bandit_key="syntax|test")
+
+    assert [(temperature, passed) for temperature, passed, _ in records] == [(0.2, True), (0.3, False)]
+    assert all(tokens > 0 for _, _, tokens in records)
+
+
+@pytest.mark.asyncio
+async def test_near_miss_screened_candidates_are_analyzed_when_none_pass(stub_llm):
+    stub_llm(outputs=[f"Rewritten passage number {n}. It has new sentences." for n in range(1, 4)], delays=[0, 0, 0])
+    screen = lambda candidate: ScreenReject("평균 문장 길이 추정 범위 밖", near_miss=True)
+
+    valid, judged, race = await syntax_fixer._race_candidates(
+        PROMPT, TEXT, [(0.2, 1), (0.2, 2), (0.3, 1)], [], RANGES, screen=screen
+    )
+
+    assert [item['index'] for item in valid] == [1, 2, 3]
+    assert len(judged) == 3
+    assert race["screened"] == 3
+    assert race["revisited"] == 3
+    assert race["analyzed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_screened_candidates_are_not_revisited_when_one_passes(stub_llm):
+    stub_llm(outputs=[f"Rewritten passage number {n}. It has new sentences." for n in range(1, 4)], delays=[0, 0, 0])
+    screen = lambda candidate: None if "number 1" in candidate else ScreenReject("내포절 비율 추정 범위 밖", near_miss=True)
+
+    valid, judged, race = await syntax_fixer._race_candidates(
+        PROMPT, TEXT, [(0.2, 1), (0.2, 2), (0.3, 1)], [], RANGES, screen=screen
+    )
+
+    assert [item['index'] for item in valid] == [1]
+    assert race["screened"] == 2
+    assert race["revisited"] == 0
+    assert race["analyzed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hard_rejects_are_never_revisited(stub_llm):
+    stub_llm(outputs=["Rewritten passage number 1. It has new sentences."], delays=[0])
+    screen = lambda candidate: ScreenReject("출력 잘림 의심")
+
+    valid, judged, race = await syntax_fixer._race_candidates(PROMPT, TEXT, [(0.2, 1)], [], RANGES, screen=screen)
+
+    assert valid == [] and judged == []
+    assert race["revisited"] == 0
+
+
+def _metrics(lexical_ratio):
+    return SimpleNamespace(
+        AVG_SENTENCE_LENGTH=10.0, All_Embedded_Clauses_Ratio=0.5, CEFR_NVJD_A1A2_lemma_ratio=lexical_ratio
+    )
+
+
+@pytest.mark.asyncio
+async def test_lexical_range_early_stop_counts_lexical_passes(stub_llm, monkeypatch):
+    ratios = [0.9, 0.9, 0.5, 0.55, 0.5]
+    stub = stub_llm(
+        outputs=[f"Candidate {n} rewrote the passage. Lexical profile number {n}." for n in range(1, 6)],
+        delays=[0, 0, 0.01, 0.02, 10],
+    )
+
+    async def _analysis(candidate, *ranges):
+        number = int(candidate.split()[1])
+        return _metrics(ratios[number - 1]), SimpleNamespace(syntax_pass="PASS")
+
+    monkeypatch.setattr(syntax_fixer, "_analyze_candidate_with_ranges", _analysis)
+    plan = [(0.2, 1), (0.2, 2), (0.3, 1), (0.3, 2), (0.3, 3)]
+
+    valid, _, race = await syntax_fixer._race_candidates(PROMPT, TEXT, plan, [], RANGES, lexical_range=(0.4, 0.6))
+
+    assert [item['index'] for item in valid] == [1, 2, 3, 4]
+    assert race["lexical_passing"] == 2
+    assert stub.cancelled == [5]
+
+    pool, preference = syntax_fixer._prefer_lexical(valid, (0.4, 0.6))
+    assert [item['index'] for item in pool] == [3, 4]
+    assert preference["lexical_passing"] == [3, 4]
+
+
+def test_prefer_lexical_keeps_in_range_candidates():
+    candidates = [{'index': i, 'metrics': _metrics(ratio)} for i, ratio in enumerate([0.3, 0.45, 0.7, 0.5], start=1)]
+
+    pool, preference = syntax_fixer._prefer_lexical(candidates, (0.4, 0.6))
+
+    assert [item['index'] for item in pool] == [2, 4]
+    assert preference["distances"] == {1: 0.1, 2: 0.0, 3: 0.1, 4: 0.0}
+
+
+def test_prefer_lexical_falls_back_to_closest_within_margin(monkeypatch):
+    monkeypatch.setattr(settings, "selection_lexical_closest_margin", 0.01)
+    candidates = [{'index': i, 'metrics': _metrics(ratio)} for i, ratio in enumerate([0.3, 0.38, 0.68, 0.385], start=1)]
+
+    pool, preference = syntax_fixer._prefer_lexical(candidates, (0.4, 0.6))
+
+    assert [item['index'] for item in pool] == [2, 4]
+    assert preference["lexical_passing"] == []
+
+
+def test_prefer_lexical_without_lexical_metrics_keeps_all():
+    candidates = [{'index': i, 'metrics': SimpleNamespace()} for i in (1, 2)]
+
+    pool, preference = syntax_fixer._prefer_lexical(candidates, (0.4, 0.6))
+
+    assert [item['index'] for item in pool] == [1, 2]
+    assert preference["distances"] == {1: None, 2: None}
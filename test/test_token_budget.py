@@ -0,0 +1,99 @@
+"""토큰 예산 테스트: 태스크별 출력 예산, 잘림 재시도 예산, 후보 번호 logit_bias, 인코딩 미리 로드 확인"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from core.llm import token_budget as token_budget_module
+from core.llm.token_budget import TokenBudgeter
+
+
+class _FakeEncoding:
+    """공백 단위 토큰화, "10"은 두 토큰"""
+
+    def encode(self, text, disallowed_special=()):
+        return [ord(c) for c in text] if text == "10" else [hash(w) % 1000 for w in text.split()]
+
+
+@pytest.fixture
+def budgeter(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_output_tokens", 4096)
+    monkeypatch.setattr(settings, "llm_truncation_budget_multiplier", 2.0)
+    monkeypatch.setattr(settings, "llm_output_budgets", {
+        "fixed_task": {"fixed": 4},
+        "huge_fixed": {"fixed": 100000},
+        "ratio_task": {"ratio": 1.5, "min": 10},
+    })
+    budgeter = TokenBudgeter()
+    budgeter._tokenizer_unavailable = False
+    budgeter._encodings[settings.openai_model] = _FakeEncoding()
+    return budgeter
+
+
+def test_output_budget_by_task_config(budgeter):
+    text = " ".join(["word"] * 40)
+
+    assert budgeter.output_budget("fixed_task", text) == 4
+    assert budgeter.output_budget("huge_fixed") == 4096
+    assert budgeter.output_budget("ratio_task", text) == 60
+    assert budgeter.output_budget("ratio_task", "two words") == 10
+    assert budgeter.output_budget("ratio_task") == 10
+    assert budgeter.output_budget("unknown_task", text) == 4096
+
+
+def test_next_budget_grows_until_cap(budgeter):
+    assert budgeter.next_budget("ratio_task", 100) == 200
+    assert budgeter.next_budget("ratio_task", 3000) == 4096
+    assert budgeter.next_budget("ratio_task", 4096) is None
+    assert budgeter.truncation_retries == 2
+
+
+def test_logit_bias_for_single_token_numbers(budgeter):
+    bias = budgeter.logit_bias_for(["1", "2", "3"])
+
+    assert len(bias) == 3 and set(bias.values()) == {100}
+    assert budgeter.logit_bias_for(["1", "10"]) is None
+
+
+def test_heuristic_fallback_without_tokenizer(budgeter):
+    budgeter._tokenizer_unavailable = True
+
+    assert budgeter.logit_bias_for(["1", "2"]) is None
+    assert budgeter.count_tokens("abcdefgh") == 2
+
+
+def test_warm_up_loads_configured_models(monkeypatch):
+    loaded = []
+
+    def encoding_for_model(model):
+        if model.startswith("unknown"):
+            raise KeyError(model)
+        loaded.append(model)
+        return _FakeEncoding()
+
+    def get_encoding(name):
+        loaded.append(name)
+        return _FakeEncoding()
+
+    monkeypatch.setattr(token_budget_module, "tiktoken", SimpleNamespace(encoding_for_model=encoding_for_model, get_encoding=get_encoding))
+    monkeypatch.setattr(settings, "openai_model", "gpt-4.1")
+    monkeypatch.setattr(settings, "llm_task_models", {"select": ["gpt-4.1-mini", "gpt-4.1"], "profile": ["unknown-model"]})
+    budgeter = TokenBudgeter()
+
+    assert budgeter.warm_up() == ["gpt-4.1", "gpt-4.1-mini", "unknown-model"]
+    assert loaded == ["gpt-4.1", "gpt-4.1-mini", "o200k_base"]
+    # 이미 로드한 모델은 다시 로드하지 않음
+    budgeter.count_tokens("hello", "gpt-4.1-mini")
+    assert loaded == ["gpt-4.1", "gpt-4.1-mini", "o200k_base"]
+
+
+def test_warm_up_failure_switches_to_estimates(monkeypatch):
+    def fail(_):
+        raise OSError("no network")
+
+    monkeypatch.setattr(token_budget_module, "tiktoken", SimpleNamespace(encoding_for_model=fail, get_encoding=fail))
+    budgeter = TokenBudgeter()
+
+    assert budgeter.warm_up(["gpt-4.1"]) == []
+    assert budgeter.stats()["tokenizer"] == "heuristic"
@@ -0,0 +1,105 @@
+"""사용량 집계 테스트: 요청 범위 격리, 비용 계산(접두어 매칭, 배수), 예측 출력/조기 중단/추정 기록, 취소 통계 확인"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from core.llm.usage import UsageTracker, estimate_tokens
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setattr(settings, "llm_model_pricing", {
+        "gpt-4.1": {"input": 2.00, "output": 8.00},
+        "gpt-4.1-mini": {"input": 0.40, "output": 1.60},
+    })
+    return UsageTracker()
+
+
+def _usage(prompt, completion, accepted=0, rejected=0):
+    details = SimpleNamespace(accepted_prediction_tokens=accepted, rejected_prediction_tokens=rejected)
+    return SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion, completion_tokens_details=details)
+
+
+@pytest.mark.asyncio
+async def test_request_scopes_are_isolated_across_concurrent_tasks(tracker):
+    async def _request(request_id, calls):
+        with tracker.request_scope(request_id) as usage:
+            # 요청 안에서 만든 태스크의 호출도 같은 요청으로 묶임
+            async def _call(i):
+                await asyncio.sleep(0.001 * (calls - i))
+                tracker.record("syntax", "gpt-4.1", _usage(100, 10))
+            await asyncio.gather(*(asyncio.create_task(_call(i)) for i in range(calls)))
+            return usage
+
+    first, second = await asyncio.gather(_request("req-1", 3), _request("req-2", 5))
+
+    assert [r.request_id for r in first.records] == ["req-1"] * 3
+    assert [r.request_id for r in second.records] == ["req-2"] * 5
+    assert tracker.current() is None
+
+
+def test_cost_uses_longest_prefix_and_multiplier(tracker):
+    full = tracker.record("syntax", "gpt-4.1-2025-04-14", _usage(1_000_000, 1_000_000))
+    mini = tracker.record("select", "gpt-4.1-mini", _usage(1_000_000, 0))
+    batch = tracker.record("syntax", "gpt-4.1", _usage(1_000_000, 1_000_000), cost_multiplier=0.5)
+    unknown = tracker.record("syntax", "other-model", _usage(1000, 1000))
+
+    assert full.cost_usd == pytest.approx(10.0)
+    assert mini.cost_usd == pytest.approx(0.4)
+    assert batch.cost_usd == pytest.approx(5.0)
+    assert unknown.cost_usd == 0.0
+
+
+def test_summary_counts_prediction_and_aborted_calls(tracker):
+    with tracker.request_scope("req") as usage:
+        tracker.record("syntax", "gpt-4.1", _usage(200, 50, accepted=30, rejected=5))
+        mark = usage.mark()
+        tracker.record("lexical", "gpt-4.1-mini", _usage(100, 20), aborted=True)
+
+    summary = usage.summary()
+    assert summary["calls"] == 2 and summary["aborted_calls"] == 1
+    assert summary["total_tokens"] == 370
+    assert summary["accepted_prediction_tokens"] == 30 and summary["rejected_prediction_tokens"] == 5
+    assert summary["models"] == ["gpt-4.1", "gpt-4.1-mini"]
+    assert set(summary["by_task"]) == {"syntax", "lexical"}
+
+    since = usage.summary(since=mark)
+    assert since["calls"] == 1 and since["by_task"]["lexical"]["aborted_calls"] == 1
+
+
+def test_missing_usage_is_ignored(tracker):
+    with tracker.request_scope("req") as usage:
+        assert tracker.record("syntax", "gpt-4.1", None) is None
+    assert usage.records == []
+
+
+def test_record_estimated_uses_character_estimate(tracker):
+    messages = [{"role": "system", "content": "a" * 40}, {"role": "user", "content": "b" * 40}]
+
+    record = tracker.record_estimated("syntax", "gpt-4.1", messages, "c" * 21)
+
+    assert record.prompt_tokens == estimate_tokens("a" * 80) == 20
+    assert record.completion_tokens == 6
+    assert record.aborted
+    assert not tracker.record_estimated("syntax", "gpt-4.1", messages, "", aborted=False).aborted
+
+
+def test_snapshot_accumulates_outside_request_scope(tracker):
+    tracker.record("syntax", "gpt-4.1", _usage(10, 5))
+    tracker.record("syntax", "gpt-4.1", _usage(10, 5), aborted=True)
+
+    [row] = tracker.snapshot()
+    assert row["task"] == "syntax" and row["calls"] == 2 and row["aborted_calls"] == 1 and row["total_tokens"] == 30
+
+
+def test_cancellation_stats(tracker):
+    tracker.record_cancelled("syntax", sent=False, saved_prompt_tokens=100, saved_completion_tokens=50)
+    tracker.record_cancelled("syntax", sent=True, saved_prompt_tokens=0, saved_completion_tokens=30)
+
+    stats = tracker.cancellation_stats()
+    assert stats["cancelled_calls"] == 2 and stats["cancelled_before_send"] == 1
+    assert stats["saved_tokens"] == 180
+    assert stats["by_task"]["syntax"]["saved_completion_tokens"] == 80
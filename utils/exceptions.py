@@ -16,6 +16,21 @@ class LLMAPIError(PipelineError):
     pass
 
 
+class LLMStreamAbortedError(LLMAPIError):
+    """스트리밍 생성이 abort 조건에 의해 조기 중단된 경우"""
+    pass
+
+
+class SentencePatchError(LLMAPIError):
+    """문장 패치 출력이 형식에 맞지 않거나 지문에 적용할 수 없는 경우"""
+    pass
+
+
+class RequestCancelledError(PipelineError):
+    """클라이언트 연결 종료로 요청 처리가 취소된 경우"""
+    pass
+
+
 class MetricsExtractionError(PipelineError):
     """지표 추출 실패 예외"""
     pass
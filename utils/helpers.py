@@ -1,7 +1,8 @@
 """유틸리티 헬퍼 함수들"""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 import asyncio
+from utils.exceptions import RequestCancelledError
 from utils.logging import logger
 
 
@@ -161,4 +162,70 @@ def sanitize_text(text: str) -> str:
         return cleaned
         
     except Exception:
-        return text or "" 
\ No newline at end of file
+        return text or "" 
+
+
+async def gather_in_task_group(*aws: Awaitable[Any], return_exceptions: bool = False) -> List[Any]:
+    """
+    asyncio.gather와 같은 순서로 결과를 반환하되, TaskGroup으로 실행하여
+    상위 태스크가 취소되면 모든 하위 태스크를 취소하고 정리가 끝날 때까지 기다립니다.
+
+    Args:
+        *aws: 실행할 코루틴들
+        return_exceptions: True면 하위 작업의 예외를 결과 리스트에 담아 반환
+            (False면 첫 예외 발생 시 나머지를 취소하고 그 예외를 그대로 발생)
+
+    Returns:
+        결과 리스트 (입력 순서)
+    """
+    async def _capture(aw: Awaitable[Any]) -> Any:
+        try:
+            return await aw
+        except Exception as e:
+            return e
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(_capture(aw) if return_exceptions else aw) for aw in aws]
+    except ExceptionGroup as eg:
+        # 기존 gather 호출부의 except Exception 처리와 호환되도록 첫 예외를 그대로 발생
+        raise eg.exceptions[0]
+    return [task.result() for task in tasks]
+
+
+async def run_until_disconnected(
+    aw: Awaitable[Any],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    poll_interval: float = 1.0,
+) -> Any:
+    """
+    요청 처리 코루틴을 실행하면서 클라이언트 연결 종료를 주기적으로 확인하고,
+    연결이 끊기면 처리 태스크(및 그 하위 태스크 전체)를 취소합니다.
+
+    Args:
+        aw: 요청 처리 코루틴
+        is_disconnected: 연결 종료 여부 확인 함수 (예: starlette Request.is_disconnected)
+        poll_interval: 확인 주기 (초)
+
+    Returns:
+        처리 결과
+
+    Raises:
+        RequestCancelledError: 클라이언트 연결 종료로 취소된 경우
+    """
+    work = asyncio.ensure_future(aw)
+    try:
+        while True:
+            done, _ = await asyncio.wait({work}, timeout=poll_interval)
+            if done:
+                return work.result()
+            if await is_disconnected() and not work.done():
+                work.cancel()
+                try:
+                    await work
+                except asyncio.CancelledError:
+                    pass
+                raise RequestCancelledError("클라이언트 연결 종료로 요청 처리를 취소했습니다")
+    finally:
+        if not work.done():
+            work.cancel()